@@ -11,11 +11,16 @@ created by PlannerAgent.
 
 from __future__ import annotations
 
-from typing import Dict, List
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 
-from services.ai_client import AIClient
+from services.ai_client import AIClient, TokenUsage
+
+logger = logging.getLogger(__name__)
 
 
 class SubjectOutline(BaseModel):
@@ -32,10 +37,339 @@ class ContentAgent:
     def __init__(self, ai_client: AIClient | None = None) -> None:
         self.ai = ai_client or AIClient()
 
-    def generate_outline(self, subject: str) -> SubjectOutline:
-        """Generate a concept/practice outline for a single subject."""
+    # Defaults for the async fan-out path
+    DEFAULT_CONCURRENCY = 4
+    DEFAULT_TIMEOUT_SECONDS = 20.0
+
+    # Outline modes: one call per subject, or one call for all subjects
+    MODE_PER_SUBJECT = "per_subject"
+    MODE_BATCHED = "batched"
+    MODES = (MODE_PER_SUBJECT, MODE_BATCHED)
+
+    # Completion budget of a batched call: per subject, capped by the model
+    BATCH_TOKENS_PER_SUBJECT = 700
+    MAX_BATCH_TOKENS = 6000
+
+    def generate_outline(
+        self, subject: str, usage: Optional[TokenUsage] = None, retry: bool = False
+    ) -> SubjectOutline:
+        """Generate a concept/practice outline for a single subject.
+
+        Only a reply that validates is cached. ``retry`` (a subject a
+        batched reply got wrong) skips the cache and asks again.
+        """
+
+        raw = self.ai.generate_text(
+            self._build_outline_prompt(subject),
+            usage=usage,
+            validate=self._is_valid_outline,
+            bypass_cache=retry,
+        )
+        return SubjectOutline.model_validate_json(raw)
+
+    def generate_outlines(
+        self,
+        subjects: List[str],
+        mode: str = MODE_PER_SUBJECT,
+        usage: Optional[TokenUsage] = None,
+    ) -> Dict[str, SubjectOutline]:
+        """Generate outlines for multiple subjects.
+
+        In ``MODE_BATCHED`` all subjects share one call; only the subjects
+        missing from or invalid in its response are retried one by one.
+        """
+
+        cleaned = self._clean_subjects(subjects)
+        outlines: Dict[str, SubjectOutline] = {}
+        pending = cleaned
+        retry = False
+        if self._check_mode(mode) == self.MODE_BATCHED and cleaned:
+            match = self._batch_matcher(cleaned)
+            try:
+                raw = self.ai.generate_text(
+                    self._build_batch_outline_prompt(cleaned),
+                    max_tokens=self._batch_max_tokens(len(cleaned)),
+                    usage=usage,
+                    validate=lambda raw: self._batch_is_complete(match(raw), cleaned),
+                )
+            except Exception as e:
+                logger.warning(f"Batched outline call failed, falling back per subject: {e}")
+            else:
+                outlines, pending = self._split_batch_outlines(match(raw), cleaned)
+                retry = True
+
+        for ss in pending:
+            outlines[ss] = self.generate_outline(ss, usage, retry)
+        return {ss: outlines[ss] for ss in cleaned}
+
+    async def agenerate_outline(
+        self, subject: str, usage: Optional[TokenUsage] = None, retry: bool = False
+    ) -> SubjectOutline:
+        """Async counterpart of ``generate_outline``."""
+
+        raw = await self.ai.agenerate_text(
+            self._build_outline_prompt(subject),
+            usage=usage,
+            validate=self._is_valid_outline,
+            bypass_cache=retry,
+        )
+        return SubjectOutline.model_validate_json(raw)
+
+    async def agenerate_outlines(
+        self,
+        subjects: List[str],
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        mode: str = MODE_PER_SUBJECT,
+        usage: Optional[TokenUsage] = None,
+    ) -> Dict[str, SubjectOutline]:
+        """Generate outlines for multiple subjects concurrently.
+
+        All prompts are sent at once, bounded by ``concurrency``, so wall-clock
+        time tracks the slowest subject rather than the sum. Each subject has
+        its own ``timeout``; a subject that fails or times out is logged and
+        left out of the result instead of failing the whole batch.
+
+        Args:
+            subjects: Subjects to generate outlines for
+            concurrency: Max in-flight LLM calls (default: DEFAULT_CONCURRENCY)
+            timeout: Per-subject timeout in seconds (default: DEFAULT_TIMEOUT_SECONDS)
+            mode: MODE_PER_SUBJECT or MODE_BATCHED (see ``aiter_outlines``)
+            usage: Accumulates the calls and tokens spent
+
+        Returns:
+            Outlines for the subjects that succeeded, in input order
+        """
+        outlines: Dict[str, SubjectOutline] = {}
+        async for ss, result in self.aiter_outlines(subjects, concurrency, timeout, mode, usage):
+            if isinstance(result, BaseException):
+                logger.warning(
+                    f"Outline generation failed for {ss!r}: "
+                    f"{type(result).__name__}: {result}"
+                )
+                continue
+            outlines[ss] = result
+
+        # Completion order is arbitrary; hand results back in input order
+        return {ss: outlines[ss] for ss in self._clean_subjects(subjects) if ss in outlines}
+
+    async def aiter_outlines(
+        self,
+        subjects: List[str],
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        mode: str = MODE_PER_SUBJECT,
+        usage: Optional[TokenUsage] = None,
+    ) -> AsyncIterator[Tuple[str, Union[SubjectOutline, BaseException]]]:
+        """Yield (subject, outline-or-exception) pairs as each one finishes.
+
+        Same fan-out, concurrency and timeout rules as ``agenerate_outlines``.
+        Failures are yielded rather than raised so callers can stream partial
+        results. Pending calls are cancelled if the consumer stops early.
+
+        In ``MODE_BATCHED`` one call (bounded by ``timeout``) asks for every
+        subject; its valid outlines are yielded together, then the subjects
+        it missed or got wrong go through the per-subject fan-out.
+        """
+        cleaned = self._clean_subjects(subjects)
+        per_subject_timeout = timeout if timeout is not None else self.DEFAULT_TIMEOUT_SECONDS
+        pending = cleaned
+        retry = False
+
+        if self._check_mode(mode) == self.MODE_BATCHED and cleaned:
+            match = self._batch_matcher(cleaned)
+            try:
+                raw = await asyncio.wait_for(
+                    self.ai.agenerate_text(
+                        self._build_batch_outline_prompt(cleaned),
+                        max_tokens=self._batch_max_tokens(len(cleaned)),
+                        usage=usage,
+                        validate=lambda raw: self._batch_is_complete(match(raw), cleaned),
+                    ),
+                    timeout=per_subject_timeout,
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Batched outline call failed, falling back per subject: "
+                    f"{type(e).__name__}: {e}"
+                )
+            else:
+                outlines, pending = self._split_batch_outlines(match(raw), cleaned)
+                retry = True
+                for ss, outline in outlines.items():
+                    yield ss, outline
+
+        async for item in self._aiter_per_subject(
+            pending, concurrency, per_subject_timeout, usage, retry
+        ):
+            yield item
+
+    async def _aiter_per_subject(
+        self,
+        subjects: List[str],
+        concurrency: Optional[int],
+        timeout: float,
+        usage: Optional[TokenUsage],
+        retry: bool = False,
+    ) -> AsyncIterator[Tuple[str, Union[SubjectOutline, BaseException]]]:
+        """One bounded call per subject, yielded in completion order.
+
+        ``retry`` marks subjects a batched reply got wrong; their calls
+        skip the cache.
+        """
+        limit = concurrency or self.DEFAULT_CONCURRENCY
+        semaphore = asyncio.Semaphore(max(1, limit))
+
+        async def _bounded(subject: str) -> Tuple[str, Union[SubjectOutline, BaseException]]:
+            async with semaphore:
+                try:
+                    outline = await asyncio.wait_for(
+                        self.agenerate_outline(subject, usage, retry), timeout=timeout
+                    )
+                except Exception as e:
+                    return subject, e
+                return subject, outline
+
+        tasks = [asyncio.ensure_future(_bounded(ss)) for ss in subjects]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @classmethod
+    def _check_mode(cls, mode: str) -> str:
+        if mode not in cls.MODES:
+            raise ValueError(f"Unknown outline mode: {mode!r} (expected one of {cls.MODES})")
+        return mode
+
+    @classmethod
+    def _batch_max_tokens(cls, count: int) -> int:
+        return min(cls.MAX_BATCH_TOKENS, cls.BATCH_TOKENS_PER_SUBJECT * count)
+
+    @staticmethod
+    def _iter_json_array(raw: str) -> Iterator[Any]:
+        """Yield the elements of a JSON array one by one.
+
+        Stops quietly at the first element that does not parse, so a
+        response cut off by the token limit still yields every complete
+        element before the cut.
+        """
+
+        start = raw.find("[")
+        if start < 0:
+            return
+        decoder = json.JSONDecoder()
+        pos = start + 1
+        while True:
+            while pos < len(raw) and raw[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(raw) or raw[pos] == "]":
+                return
+            try:
+                element, pos = decoder.raw_decode(raw, pos)
+            except json.JSONDecodeError:
+                return
+            yield element
+
+    @staticmethod
+    def _is_valid_outline(raw: str) -> bool:
+        """Whether a single-subject reply parses as a SubjectOutline."""
+
+        try:
+            SubjectOutline.model_validate_json(raw)
+        except ValidationError:
+            return False
+        return True
 
-        prompt = f"""
+    @staticmethod
+    def _batch_is_complete(outlines: Dict[str, SubjectOutline], subjects: List[str]) -> bool:
+        """Whether matched batch outlines cover every subject.
+
+        Only complete replies are cached; a partial one is still used for
+        this request, but asking again later may do better.
+        """
+
+        return len(outlines) == len(subjects)
+
+    def _batch_matcher(
+        self, subjects: List[str]
+    ) -> Callable[[str], Dict[str, SubjectOutline]]:
+        """``_match_batch_outlines`` for one batched call, remembering the
+        last reply so the text validated by the client is not parsed again
+        when it is split."""
+
+        last: List[Any] = [None, {}]
+
+        def match(raw: str) -> Dict[str, SubjectOutline]:
+            if raw != last[0]:
+                last[:] = [raw, self._match_batch_outlines(raw, subjects)]
+            return last[1]
+
+        return match
+
+    def _split_batch_outlines(
+        self, outlines: Dict[str, SubjectOutline], subjects: List[str]
+    ) -> Tuple[Dict[str, SubjectOutline], List[str]]:
+        """Split matched batch outlines from the subjects they missed.
+
+        Returns:
+            Tuple of (valid outlines by subject, subjects to retry)
+        """
+
+        retry = [ss for ss in subjects if ss not in outlines]
+        if retry:
+            logger.info(f"Batched outlines: {len(outlines)} valid, retrying {retry}")
+        return outlines, retry
+
+    def _match_batch_outlines(
+        self, raw: str, subjects: List[str]
+    ) -> Dict[str, SubjectOutline]:
+        """Valid outlines of a batched response, by subject, in input order.
+
+        Elements are matched by their ``subject`` field (case-insensitive).
+        Only once every named match is known are the remaining elements
+        matched by position, to subjects that are still missing, so an
+        unnamed element never takes a slot a later element names.
+        """
+
+        by_name = {ss.casefold(): ss for ss in subjects}
+        outlines: Dict[str, SubjectOutline] = {}
+        unmatched: List[Tuple[int, SubjectOutline]] = []
+        for index, element in enumerate(self._iter_json_array(raw)):
+            try:
+                outline = SubjectOutline.model_validate(element)
+            except ValidationError as e:
+                logger.debug(f"Invalid outline at index {index} of batched response: {e}")
+                continue
+            ss = by_name.get(outline.subject.strip().casefold())
+            if ss is None:
+                unmatched.append((index, outline))
+            elif ss not in outlines:
+                outlines[ss] = outline
+
+        for index, outline in unmatched:
+            if index < len(subjects) and subjects[index] not in outlines:
+                outlines[subjects[index]] = outline
+        return {ss: outlines[ss] for ss in subjects if ss in outlines}
+
+    @staticmethod
+    def _clean_subjects(subjects: List[str]) -> List[str]:
+        """Strip subjects, drop blanks and duplicates, keep input order."""
+
+        cleaned: List[str] = []
+        for s in subjects:
+            ss = (s or "").strip()
+            if ss and ss not in cleaned:
+                cleaned.append(ss)
+        return cleaned
+
+    @staticmethod
+    def _build_outline_prompt(subject: str) -> str:
+        """Build the outline prompt for a single subject."""
+
+        return f"""
 You are generating a weekly study plan outline for the subject: "{subject}".
 
 Return STRICT VALID JSON ONLY (no markdown, no commentary) with this schema:
@@ -52,16 +386,25 @@ Rules:
 - Keep each string <= 80 characters.
 """.strip()
 
-        raw = self.ai.generate_text(prompt)
-        return SubjectOutline.model_validate_json(raw)
+    @staticmethod
+    def _build_batch_outline_prompt(subjects: List[str]) -> str:
+        """Build one outline prompt covering every subject."""
 
-    def generate_outlines(self, subjects: List[str]) -> Dict[str, SubjectOutline]:
-        """Generate outlines for multiple subjects."""
+        return f"""
+You are generating weekly study plan outlines for these subjects (JSON array):
+{json.dumps(subjects, ensure_ascii=False)}
 
-        outlines: Dict[str, SubjectOutline] = {}
-        for s in subjects:
-            ss = (s or "").strip()
-            if not ss:
-                continue
-            outlines[ss] = self.generate_outline(ss)
-        return outlines
+Return STRICT VALID JSON ONLY (no markdown, no commentary): a JSON array with
+one object per subject, in the same order, each with this schema:
+{{
+  "subject": string,
+  "concepts": string[],
+  "practice_tasks": string[]
+}}
+
+Rules:
+- concepts: 12-20 items, ordered from beginner -> advanced, each item short.
+- practice_tasks: 12-20 items, each is a concrete task/problem type.
+- Avoid URLs.
+- Keep each string <= 80 characters.
+""".strip()
@@ -0,0 +1,407 @@
+"""Plan Optimizer Module.
+
+Improves the weekly session allocation of the planner. A layout is a
+grid of days x blocks holding subject indices; its phases follow from
+each subject's occurrence order exactly as in the cycle planner. A cost
+function scores balance, spacing and phase progression, and a seeded
+local search (swap two blocks / reassign one block) improves it for a
+fixed number of iterations, always keeping the best layout found. The
+budget is counted in iterations rather than time, so a given input and
+seed always give the same layout.
+"""
+
+from collections import Counter
+from math import ceil
+from typing import Dict, List, Sequence, Tuple
+import logging
+import random
+
+from agents.planner_agent import PlannerAgent, SessionKey, SessionType
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_CONCEPT, _PRACTICE, _REVISION = 0, 1, 2
+_PHASE_TYPES = (SessionType.CONCEPT, SessionType.PRACTICE, SessionType.REVISION)
+_PHASE_INDEX = {t: i for i, t in enumerate(_PHASE_TYPES)}
+
+
+class PlanOptimizer:
+    """Budgeted local search over the weekly session allocation."""
+
+    # A fixed amount of work, not a time limit (benchmarks.planner_modes
+    # reports the time it takes); small inputs stall sooner
+    DEFAULT_MAX_ITERATIONS = 1_000
+    # Stop early after this many iterations (per block) without a new best
+    STALL_ITERATIONS_PER_BLOCK = 40
+
+    # Cost weights
+    BALANCE_WEIGHT = 4.0        # per squared hour of deviation from an even share
+    ADJACENT_WEIGHT = 3.0       # per back-to-back repeat of a subject
+    CONCENTRATION_WEIGHT = 2.0  # per block of a subject beyond its fair share of a day
+    GAP_WEIGHT = 1.0            # per squared day of uneven spacing between study days
+    REVISION_WEIGHT = 2.0       # per pair of same-subject revisions under 2 days apart
+    MISSING_PHASE_WEIGHT = 2.0  # per phase a subject with 3+ sessions never reaches
+
+    # Phase blend, as in the weekly cycle planner
+    SUBJECT_WEIGHT = 0.7
+    PROGRESS_WEIGHT = 0.3
+
+    @staticmethod
+    def optimize_layout(
+        subjects: List[str],
+        daily_hours: float,
+        days_per_week: int,
+        max_iterations: int = DEFAULT_MAX_ITERATIONS,
+        seed: int = 0,
+    ) -> List[List[SessionKey]]:
+        """Return an optimized weekly layout of session keys.
+
+        The search starts from the better of the cycle planner's
+        allocation and a plain subject rotation, so it is never worse
+        than the cycle planner by this cost. It stops after
+        ``max_iterations`` or once it stalls. It never looks at the
+        clock, so the layout depends only on the inputs and ``seed``
+        (which lets cached plans carry a strong ETag). Repeated subjects
+        are planned once, at their first position.
+
+        Args:
+            subjects: Subjects to plan for
+            daily_hours: Study hours per day
+            days_per_week: Study days per week
+            max_iterations: Iteration budget for the search
+            seed: Random seed for move selection
+
+        Returns:
+            One list of (subject, phase, duration) keys per day
+
+        Raises:
+            ValueError: If subjects are empty
+        """
+        if not subjects:
+            raise ValueError("Subjects required")
+
+        subjects = list(dict.fromkeys(subjects))
+        index = {subject: i for i, subject in enumerate(subjects)}
+        blocks = PlannerAgent._split_day(daily_hours)
+        problem = _Problem(len(subjects), days_per_week, blocks)
+
+        cycle_cells = [
+            index[subject]
+            for day in PlannerAgent._allocate_slots(
+                PlannerAgent._build_subject_pool(subjects, daily_hours * days_per_week),
+                len(blocks),
+                days_per_week,
+            )
+            for subject, _ in day
+        ]
+        rotation_cells = [i % len(subjects) for i in range(problem.size)]
+        cells = min((cycle_cells, rotation_cells), key=problem.cost)
+
+        best, best_cost, iterations = PlanOptimizer._search(
+            problem, cells, max_iterations, seed
+        )
+        logger.debug(
+            f"Optimizer: cost {best_cost:.3f} after {iterations} iterations"
+        )
+        return problem.layout(best, subjects)
+
+    @staticmethod
+    def _search(
+        problem: "_Problem",
+        cells: List[int],
+        max_iterations: int,
+        seed: int,
+    ) -> Tuple[List[int], float, int]:
+        """Hill climbing with sideways moves; returns (best, cost, iterations).
+
+        The cost is a sum of per-subject and per-day terms, so a move is
+        scored by re-evaluating only the (at most two) subjects and days
+        it touches.
+        """
+        rng = random.Random(seed)
+        size = problem.size
+        subjects = problem.subjects
+        day_of = problem.day_of
+        current = list(cells)
+        subject_costs = [problem.subject_cost(current, s) for s in range(subjects)]
+        day_costs = [problem.day_cost(current, d) for d in range(problem.days)]
+        current_cost = sum(subject_costs) + sum(day_costs)
+        best, best_cost = list(current), current_cost
+        if subjects < 2 or size == 0:
+            return best, best_cost, 0
+
+        stall = 0
+        stall_limit = max(200, PlanOptimizer.STALL_ITERATIONS_PER_BLOCK * size)
+        iteration = 0
+        for iteration in range(1, max_iterations + 1):
+            i = rng.randrange(size)
+            a = current[i]
+            if size < 2 or rng.random() < 0.2:
+                # Reassign one block to another subject (changes the balance)
+                j = i
+                b = (a + rng.randrange(1, subjects)) % subjects
+                current[i] = b
+            else:
+                j = rng.randrange(size)
+                b = current[j]
+                if a == b:
+                    stall += 1
+                    continue
+                current[i], current[j] = b, a
+
+            new_a = problem.subject_cost(current, a)
+            new_b = problem.subject_cost(current, b)
+            di, dj = day_of[i], day_of[j]
+            new_di = problem.day_cost(current, di)
+            new_dj = problem.day_cost(current, dj) if dj != di else 0.0
+            delta = (
+                new_a - subject_costs[a] + new_b - subject_costs[b]
+                + new_di - day_costs[di]
+                + (new_dj - day_costs[dj] if dj != di else 0.0)
+            )
+            if delta <= 1e-12:
+                subject_costs[a], subject_costs[b] = new_a, new_b
+                day_costs[di] = new_di
+                if dj != di:
+                    day_costs[dj] = new_dj
+                current_cost += delta
+            else:
+                current[i] = a
+                if j != i:
+                    current[j] = b
+
+            if current_cost < best_cost - 1e-9:
+                best, best_cost = list(current), current_cost
+                stall = 0
+            else:
+                stall += 1
+                if stall >= stall_limit:
+                    break
+        return best, best_cost, iteration
+
+    @staticmethod
+    def score_layout(
+        layout: Sequence[Sequence[SessionKey]],
+        subjects: List[str],
+    ) -> Dict[str, float]:
+        """Score any weekly layout (e.g. from the cycle planner) as-is.
+
+        Returns:
+            The cost breakdown (see ``_Problem.components``) with the
+            weighted ``cost`` total
+        """
+        subjects = list(dict.fromkeys(subjects))
+        blocks = [duration for _, _, duration in max(layout, key=len)] if layout else []
+        problem = _Problem(len(subjects), len(layout), blocks)
+        index = {subject: i for i, subject in enumerate(subjects)}
+        cells = [index[subject] for day in layout for subject, _, _ in day]
+        phases = [_PHASE_INDEX[phase] for day in layout for _, phase, _ in day]
+        return problem.components(cells, phases)
+
+
+class _Problem:
+    """Fixed dimensions of one optimization problem and its cost function."""
+
+    def __init__(self, subjects: int, days: int, blocks: List[float]) -> None:
+        self.subjects = subjects
+        self.days = days
+        self.blocks = blocks
+        self.size = days * len(blocks)
+        self.target = sum(blocks) * days / subjects
+        self.day_cap = ceil(len(blocks) / subjects)
+        self.day_progress = [
+            d / max(days - 1, 1) * PlanOptimizer.PROGRESS_WEIGHT for d in range(days)
+        ]
+        self.day_of = [p // len(blocks) for p in range(self.size)] if blocks else []
+        self.duration_of = blocks * days
+
+    def cost(self, cells: List[int]) -> float:
+        """Weighted cost; equals ``components(cells, phases(cells))["cost"]``."""
+        return (
+            sum(self.subject_cost(cells, s) for s in range(self.subjects))
+            + sum(self.day_cost(cells, d) for d in range(self.days))
+        )
+
+    def subject_cost(self, cells: List[int], subject: int) -> float:
+        """Balance, spacing and phase terms of one subject."""
+        day_of = self.day_of
+        duration_of = self.duration_of
+        day_progress = self.day_progress
+        concept_until = PlannerAgent.CONCEPT_UNTIL
+        practice_until = PlannerAgent.PRACTICE_UNTIL
+
+        positions = [p for p, c in enumerate(cells) if c == subject]
+        total = len(positions)
+        step = PlanOptimizer.SUBJECT_WEIGHT / max(total - 1, 1)
+        hours = 0.0
+        study_days: List[int] = []
+        revision_days: List[int] = []
+        reached = 0
+        for occurrence, position in enumerate(positions):
+            hours += duration_of[position]
+            day = day_of[position]
+            if not study_days or study_days[-1] != day:
+                study_days.append(day)
+            combined = occurrence * step + day_progress[day]
+            if combined < concept_until:
+                reached |= 1
+            elif combined < practice_until:
+                reached |= 2
+            else:
+                reached |= 4
+                revision_days.append(day)
+
+        cost = PlanOptimizer.BALANCE_WEIGHT * (hours - self.target) ** 2
+        if len(study_days) > 1:
+            ideal = self.days / len(study_days)
+            cost += PlanOptimizer.GAP_WEIGHT * sum(
+                (b - a - ideal) ** 2 for a, b in zip(study_days, study_days[1:])
+            )
+        if len(revision_days) > 1:
+            cost += PlanOptimizer.REVISION_WEIGHT * sum(
+                1 for a, b in zip(revision_days, revision_days[1:]) if b - a < 2
+            )
+        if total >= 3:
+            cost += PlanOptimizer.MISSING_PHASE_WEIGHT * (3 - bin(reached).count("1"))
+        return cost
+
+    def day_cost(self, cells: List[int], day: int) -> float:
+        """Back-to-back and concentration terms of one day."""
+        per_day = len(self.blocks)
+        day_cap = self.day_cap
+        counts = [0] * self.subjects
+        adjacent = 0
+        concentration = 0
+        previous = -1
+        for position in range(day * per_day, (day + 1) * per_day):
+            subject = cells[position]
+            if subject == previous:
+                adjacent += 1
+            previous = subject
+            counts[subject] += 1
+            if counts[subject] > day_cap:
+                concentration += 1
+        return (
+            PlanOptimizer.ADJACENT_WEIGHT * adjacent
+            + PlanOptimizer.CONCENTRATION_WEIGHT * concentration
+        )
+
+    def phases(self, cells: List[int]) -> List[int]:
+        """Phase of every cell, from each subject's occurrence order."""
+        totals = Counter(cells)
+        seen = [0] * self.subjects
+        per_day = len(self.blocks)
+        concept_until = PlannerAgent.CONCEPT_UNTIL
+        practice_until = PlannerAgent.PRACTICE_UNTIL
+        subject_weight = PlanOptimizer.SUBJECT_WEIGHT
+        phases: List[int] = []
+        for position, subject in enumerate(cells):
+            occurrence = seen[subject]
+            seen[subject] = occurrence + 1
+            combined = (
+                occurrence / max(totals[subject] - 1, 1) * subject_weight
+                + self.day_progress[position // per_day]
+            )
+            if combined < concept_until:
+                phases.append(_CONCEPT)
+            elif combined < practice_until:
+                phases.append(_PRACTICE)
+            else:
+                phases.append(_REVISION)
+        return phases
+
+    def components(self, cells: List[int], phases: List[int]) -> Dict[str, float]:
+        """Cost breakdown of a layout.
+
+        Keys: ``balance`` (sum of squared hour deviations from an even
+        share), ``adjacent`` (back-to-back repeats), ``concentration``
+        (blocks beyond a subject's fair share of a day), ``gaps``
+        (squared deviation of the spacing between a subject's study
+        days), ``revision_clusters`` (same-subject revisions under 2
+        days apart), ``missing_phases`` and the weighted ``cost``.
+        """
+        subjects = self.subjects
+        per_day = len(self.blocks)
+        hours = [0.0] * subjects
+        study_days: List[List[int]] = [[] for _ in range(subjects)]
+        revision_days: List[List[int]] = [[] for _ in range(subjects)]
+        reached = [0] * subjects
+        adjacent = 0
+        concentration = 0
+
+        position = 0
+        for day in range(self.days):
+            day_counts = [0] * subjects
+            previous = -1
+            for block in range(per_day):
+                if position >= len(cells):
+                    break
+                subject = cells[position]
+                phase = phases[position]
+                position += 1
+                hours[subject] += self.blocks[block]
+                if subject == previous:
+                    adjacent += 1
+                previous = subject
+                count = day_counts[subject] + 1
+                day_counts[subject] = count
+                if count == 1:
+                    study_days[subject].append(day)
+                elif count > self.day_cap:
+                    concentration += 1
+                reached[subject] |= 1 << phase
+                if phase == _REVISION:
+                    revision_days[subject].append(day)
+
+        balance = sum((h - self.target) ** 2 for h in hours)
+
+        gaps = 0.0
+        for days in study_days:
+            if len(days) > 1:
+                ideal = self.days / len(days)
+                gaps += sum((b - a - ideal) ** 2 for a, b in zip(days, days[1:]))
+
+        revision_clusters = 0
+        for days in revision_days:
+            revision_clusters += sum(1 for a, b in zip(days, days[1:]) if b - a < 2)
+
+        missing_phases = 0
+        totals = Counter(cells)
+        for subject in range(subjects):
+            if totals[subject] >= 3:
+                missing_phases += 3 - bin(reached[subject]).count("1")
+
+        weighted = (
+            PlanOptimizer.BALANCE_WEIGHT * balance
+            + PlanOptimizer.ADJACENT_WEIGHT * adjacent
+            + PlanOptimizer.CONCENTRATION_WEIGHT * concentration
+            + PlanOptimizer.GAP_WEIGHT * gaps
+            + PlanOptimizer.REVISION_WEIGHT * revision_clusters
+            + PlanOptimizer.MISSING_PHASE_WEIGHT * missing_phases
+        )
+        return {
+            "balance": balance,
+            "adjacent": float(adjacent),
+            "concentration": float(concentration),
+            "gaps": gaps,
+            "revision_clusters": float(revision_clusters),
+            "missing_phases": float(missing_phases),
+            "cost": weighted,
+        }
+
+    def layout(self, cells: List[int], names: List[str]) -> List[List[SessionKey]]:
+        """Turn cells into per-day session keys."""
+        phases = self.phases(cells)
+        per_day = len(self.blocks)
+        return [
+            [
+                (
+                    names[cells[day * per_day + block]],
+                    _PHASE_TYPES[phases[day * per_day + block]],
+                    duration,
+                )
+                for block, duration in enumerate(self.blocks)
+            ]
+            for day in range(self.days)
+        ]
@@ -1,8 +1,8 @@
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+from collections import Counter
+from datetime import date, timedelta
 from enum import Enum
 from pydantic import BaseModel, Field
-import math
-import itertools
 
 
 class SessionType(str, Enum):
@@ -24,112 +24,458 @@ class DailyPlan(BaseModel):
     sessions: List[StudySession]
 
 
+class CalendarDailyPlan(DailyPlan):
+    date: date
+    week: int
+
+
+# Timed variants, emitted only by services.timetable (the plain models
+# keep /plan's schema free of time slots)
+class TimedStudySession(StudySession):
+    # "HH:MM-HH:MM"; None when the session did not fit the availability
+    time_slot: Optional[str] = None
+
+
+class TimedDailyPlan(DailyPlan):
+    sessions: List[TimedStudySession]
+
+
+class TimedCalendarDailyPlan(CalendarDailyPlan):
+    sessions: List[TimedStudySession]
+
+
+# (subject, phase, duration) of one session; notes follow from the first two
+SessionKey = Tuple[str, SessionType, float]
+
+
 class PlannerAgent:
     DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    MAX_WEEKS = 52
+    # Blended progress below which a session is concept, then practice
+    CONCEPT_UNTIL = 0.35
+    PRACTICE_UNTIL = 0.75
+
+    # Weekly allocation modes: the subject-pool cycle, or the budgeted
+    # local search in agents.plan_optimizer
+    MODE_CYCLE = "cycle"
+    MODE_OPTIMIZED = "optimized"
+    MODES = (MODE_CYCLE, MODE_OPTIMIZED)
 
     @staticmethod
     def generate_study_plan(
         subjects: List[str],
         daily_hours: float,
-        days_per_week: int
+        days_per_week: int,
+        mode: str = MODE_CYCLE
     ) -> List[DailyPlan]:
+        return list(
+            PlannerAgent.iter_study_plan(subjects, daily_hours, days_per_week, mode)
+        )
+
+    @staticmethod
+    def iter_study_plan(
+        subjects: List[str],
+        daily_hours: float,
+        days_per_week: int,
+        mode: str = MODE_CYCLE
+    ) -> Iterator[DailyPlan]:
+        """Yield each DailyPlan as soon as it is built."""
+
+        layout = PlannerAgent._weekly_layout(subjects, daily_hours, days_per_week, mode)
+        notes = PlannerAgent._phase_notes(subjects)
+        session_cache: Dict[SessionKey, StudySession] = {}
+
+        for day_index, day_keys in enumerate(layout):
+            yield DailyPlan.model_construct(
+                day=PlannerAgent.DAYS[day_index],
+                total_hours=float(daily_hours),
+                sessions=PlannerAgent._sessions_from_keys(day_keys, notes, session_cache),
+            )
+
+    @staticmethod
+    def update_study_plan(
+        previous: Sequence[DailyPlan],
+        subjects: List[str],
+        daily_hours: float,
+        days_per_week: int,
+        mode: str = MODE_CYCLE
+    ) -> Tuple[List[DailyPlan], List[int]]:
+        """Rebuild a weekly plan for new inputs, reusing unchanged days.
+
+        The result equals ``generate_study_plan`` for the new inputs. Only
+        the cheap per-day session layout is recomputed in full; a day whose
+        layout matches the previous plan's day reuses that DailyPlan, so
+        model construction is proportional to the days that changed.
+
+        Args:
+            previous: The plan being edited
+            subjects: New subjects
+            daily_hours: New daily study hours
+            days_per_week: New days per week
+            mode: Allocation mode (see ``MODES``)
+
+        Returns:
+            Tuple of (new plan, indices of the days that were rebuilt)
+        """
+
+        layout = PlannerAgent._weekly_layout(subjects, daily_hours, days_per_week, mode)
+        notes = PlannerAgent._phase_notes(subjects)
+        session_cache: Dict[SessionKey, StudySession] = {}
+        total_hours = float(daily_hours)
+
+        plan: List[DailyPlan] = []
+        rebuilt: List[int] = []
+        for day_index, day_keys in enumerate(layout):
+            day_name = PlannerAgent.DAYS[day_index]
+            old = previous[day_index] if day_index < len(previous) else None
+            if (
+                old is not None
+                and old.day == day_name
+                and old.total_hours == total_hours
+                and PlannerAgent._same_sessions(old.sessions, day_keys, notes)
+            ):
+                plan.append(old)
+                continue
+            plan.append(
+                DailyPlan.model_construct(
+                    day=day_name,
+                    total_hours=total_hours,
+                    sessions=PlannerAgent._sessions_from_keys(day_keys, notes, session_cache),
+                )
+            )
+            rebuilt.append(day_index)
+        return plan, rebuilt
+
+    @staticmethod
+    def _weekly_layout(
+        subjects: List[str],
+        daily_hours: float,
+        days_per_week: int,
+        mode: str = MODE_CYCLE
+    ) -> Iterable[List[SessionKey]]:
+        """Session keys of every day of a weekly plan, without building models.
+
+        Inputs are checked up front. The cycle layout is then produced one
+        day at a time, so callers building models from it only ever hold
+        one day of keys.
+        """
 
         if not subjects:
             raise ValueError("Subjects required")
+        if mode == PlannerAgent.MODE_OPTIMIZED:
+            # Imported lazily: the optimizer builds on this module
+            from agents.plan_optimizer import PlanOptimizer
+
+            return PlanOptimizer.optimize_layout(subjects, daily_hours, days_per_week)
+        if mode != PlannerAgent.MODE_CYCLE:
+            raise ValueError(f"Unknown planner mode: {mode}")
+        return PlannerAgent._iter_cycle_layout(subjects, daily_hours, days_per_week)
+
+    @staticmethod
+    def _iter_cycle_layout(
+        subjects: List[str],
+        daily_hours: float,
+        days_per_week: int
+    ) -> Iterator[List[SessionKey]]:
+        """Yield each day's session keys of the subject-pool cycle layout."""
 
         total_hours = daily_hours * days_per_week
+        subject_pool = PlannerAgent._build_subject_pool(subjects, total_hours)
+        day_blocks = PlannerAgent._split_day(daily_hours)
+
+        # Pre-calc expected total occurrences for each subject across the week
+        # We'll approximate by distributing total_hours proportionally in 1-hour blocks
+        proportion = 1 / len(subjects)
+        approx_blocks = max(1, int(round(proportion * total_hours)))
+        approx_total_blocks = {s: approx_blocks for s in subjects}
+
+        slots = PlannerAgent._allocate_slots(subject_pool, len(day_blocks), days_per_week)
+
+        # Build week schedule
+        for day_index in range(days_per_week):
+            # Day-level progress (0 early -> 1 late)
+            day_progress = day_index / max(days_per_week - 1, 1)
+            yield PlannerAgent._session_keys(
+                slots[day_index],
+                day_blocks,
+                approx_total_blocks,
+                day_progress,
+                subject_weight=0.7,
+                progress_weight=0.3,
+            )
+
+    @staticmethod
+    def generate_semester_plan(
+        subjects: List[str],
+        daily_hours: float,
+        days_per_week: int,
+        weeks: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> List[CalendarDailyPlan]:
+        """Generate a multi-week plan with real calendar dates.
+
+        Subjects are interleaved (weighted round-robin) so each one is
+        studied throughout the horizon, and each session's phase (concept
+        -> practice -> revision) follows that subject's own position
+        across the whole horizon rather than a single week. Each 7-day
+        block starting at ``start_date`` gets ``days_per_week`` study days.
+
+        Args:
+            subjects: Subjects to plan for
+            daily_hours: Study hours per study day
+            days_per_week: Study days in each 7-day block
+            weeks: Horizon length in weeks (ignored when end_date is given)
+            start_date: First day of the plan (default: today)
+            end_date: Last day of the plan, inclusive
+
+        Returns:
+            One CalendarDailyPlan per study day, in date order
+
+        Raises:
+            ValueError: If the horizon is missing or invalid
+        """
+        if not subjects:
+            raise ValueError("Subjects required")
+
+        start = start_date or date.today()
+        if end_date is not None:
+            if end_date < start:
+                raise ValueError("end_date must not be before start_date")
+            weeks = (end_date - start).days // 7 + 1
+        if weeks is None:
+            raise ValueError("Either weeks or end_date is required")
+        if not (1 <= weeks <= PlannerAgent.MAX_WEEKS):
+            raise ValueError(f"weeks must be between 1 and {PlannerAgent.MAX_WEEKS}")
+
+        # Resolve the study dates up front so the allocation knows its size
+        study_dates = [
+            (week, start + timedelta(days=week * 7 + offset))
+            for week in range(weeks)
+            for offset in range(days_per_week)
+        ]
+        if end_date is not None:
+            study_dates = [(w, d) for w, d in study_dates if d <= end_date]
+
+        total_days = len(study_dates)
+        total_hours = daily_hours * total_days
+        subject_pool = PlannerAgent._interleave_pool(
+            PlannerAgent._build_subject_pool(subjects, total_hours)
+        )
+        day_blocks = PlannerAgent._split_day(daily_hours)
+        slots = PlannerAgent._allocate_slots(subject_pool, len(day_blocks), total_days)
+
+        # Exact occurrence totals are known from the allocation
+        total_occurrences = Counter(s for day in slots for s, _ in day)
+        notes = PlannerAgent._phase_notes(subjects)
+        session_cache: Dict[SessionKey, StudySession] = {}
+
+        plans: List[CalendarDailyPlan] = []
+        for day_index, (week, day_date) in enumerate(study_dates):
+            horizon_progress = day_index / max(total_days - 1, 1)
+            sessions = PlannerAgent._build_sessions(
+                slots[day_index],
+                day_blocks,
+                total_occurrences,
+                horizon_progress,
+                notes,
+                session_cache,
+                subject_weight=1.0,
+                progress_weight=0.0,
+            )
+            plans.append(
+                CalendarDailyPlan.model_construct(
+                    day=PlannerAgent.DAYS[day_date.weekday()],
+                    total_hours=float(daily_hours),
+                    sessions=sessions,
+                    date=day_date,
+                    week=week + 1,
+                )
+            )
+
+        return plans
+
+    @staticmethod
+    def _build_subject_pool(subjects: List[str], total_hours: float) -> List[str]:
+        """Flatten subjects into a rotation biased by their block share."""
+
         hours_per_subject = total_hours / len(subjects)
         # Determine how many 1-hour blocks each subject should approximately receive
         blocks_per_subject = {
             s: max(1, int(round(hours_per_subject))) for s in subjects
         }
 
-        # Track how many times a subject has been scheduled so far
-        subject_scheduled_counts = {s: 0 for s in subjects}
-
-        # Create a rotating subject iterator biased by blocks_per_subject
-        subject_pool = []
+        subject_pool: List[str] = []
         for s, count in blocks_per_subject.items():
             subject_pool.extend([s] * count)
 
         # If pool is empty for any reason, fallback to subjects list
-        if not subject_pool:
-            subject_pool = list(subjects)
+        return subject_pool or list(subjects)
 
-        subject_cycle = itertools.cycle(subject_pool)
+    @staticmethod
+    def _interleave_pool(subject_pool: List[str]) -> List[str]:
+        """Reorder a pool of ``[s] * count`` runs as a weighted round-robin.
 
-        plans: List[DailyPlan] = []
+        The j-th of a subject's k blocks is placed at fraction (j + 0.5) / k
+        of the pool, so a subject holding k of n blocks recurs about every
+        n/k blocks instead of in one contiguous run. Ties keep the order
+        the subjects were listed in.
+        """
 
-        # Helper to pick a session type & note based on per-subject progress
-        def subject_progress_session(subject: str, occurrence_index: int, total_occurrences: int, day_progress: float):
-            # Calculate fraction of progress for this subject across its scheduled occurrences
-            denom = max(total_occurrences - 1, 1)
-            frac = occurrence_index / denom if denom > 0 else 0.0
+        counts = Counter(subject_pool)
+        keyed = sorted(
+            ((j + 0.5) / count, order, subject)
+            for order, (subject, count) in enumerate(counts.items())
+            for j in range(count)
+        )
+        return [subject for _, _, subject in keyed]
 
-            # Blend overall day progress and per-subject fraction to decide phase
-            combined = (frac * 0.7) + (day_progress * 0.3)
+    @staticmethod
+    def _split_day(daily_hours: float) -> List[float]:
+        """Split a study day into 1-hour blocks plus a trailing partial block."""
 
-            if combined < 0.35:
-                st = SessionType.CONCEPT
-                note = (
-                    f"Foundations for {subject}: focus on core concepts, terminology and basic syntax."
-                )
-            elif combined < 0.75:
-                st = SessionType.PRACTICE
-                note = (
-                    f"Practice & implement: write small programs, exercises and strengthen syntax usage for {subject}."
-                )
-            else:
-                st = SessionType.REVISION
-                note = (
-                    f"Deepen & review: consolidate knowledge, tackle integrated projects and revise tricky topics in {subject}."
-                )
+        blocks: List[float] = []
+        remaining_hours = daily_hours
+        while remaining_hours > 0:
+            block = 1.0 if remaining_hours >= 1 else remaining_hours
+            blocks.append(block)
+            remaining_hours -= block
+        return blocks
 
-            return st, note
+    @staticmethod
+    def _allocate_slots(
+        subject_pool: List[str],
+        blocks_per_day: int,
+        total_days: int
+    ) -> List[List[Tuple[str, int]]]:
+        """Assign (subject, occurrence index) to every block of every day.
 
-        # Pre-calc expected total occurrences for each subject across the week
-        # We'll approximate by distributing total_hours proportionally in 1-hour blocks
-        approx_total_blocks = {}
-        for s in subjects:
-            # total blocks = proportion * total_hours rounded to nearest int (at least 1)
-            proportion = 1 / len(subjects)
-            approx_blocks = max(1, int(round(proportion * total_hours)))
-            approx_total_blocks[s] = approx_blocks
+        Equivalent to drawing from ``itertools.cycle(subject_pool)`` block by
+        block, but computed in one linear pass over the sessions.
+        """
 
-        # Build week schedule
-        for day_index in range(days_per_week):
-            day_name = PlannerAgent.DAYS[day_index]
-            sessions: List[StudySession] = []
-            remaining_hours = daily_hours
+        pool_size = len(subject_pool)
+        counts: Dict[str, int] = {}
+        slots: List[List[Tuple[str, int]]] = []
+        position = 0
+        for _ in range(total_days):
+            day: List[Tuple[str, int]] = []
+            for _ in range(blocks_per_day):
+                subject = subject_pool[position % pool_size]
+                occ_idx = counts.get(subject, 0)
+                counts[subject] = occ_idx + 1
+                day.append((subject, occ_idx))
+                position += 1
+            slots.append(day)
+        return slots
 
-            while remaining_hours > 0:
-                block = 1.0 if remaining_hours >= 1 else remaining_hours
-                subject = next(subject_cycle)
+    @staticmethod
+    def _phase_notes(subjects: List[str]) -> Dict[Tuple[str, SessionType], str]:
+        """Pre-render the session note for every (subject, phase) pair."""
 
-                # occurrence index for this subject (0-based)
-                occ_idx = subject_scheduled_counts.get(subject, 0)
-                total_occ = approx_total_blocks.get(subject, 1)
+        notes: Dict[Tuple[str, SessionType], str] = {}
+        for subject in subjects:
+            notes[(subject, SessionType.CONCEPT)] = (
+                f"Foundations for {subject}: focus on core concepts, terminology and basic syntax."
+            )
+            notes[(subject, SessionType.PRACTICE)] = (
+                f"Practice & implement: write small programs, exercises and strengthen syntax usage for {subject}."
+            )
+            notes[(subject, SessionType.REVISION)] = (
+                f"Deepen & review: consolidate knowledge, tackle integrated projects and revise tricky topics in {subject}."
+            )
+        return notes
 
-                # Day-level progress (0 early -> 1 late)
-                day_progress = day_index / max(days_per_week - 1, 1)
+    @staticmethod
+    def _build_sessions(
+        day_slots: List[Tuple[str, int]],
+        day_blocks: List[float],
+        total_occurrences: Mapping[str, int],
+        progress: float,
+        notes: Dict[Tuple[str, SessionType], str],
+        session_cache: Dict[SessionKey, StudySession],
+        subject_weight: float,
+        progress_weight: float,
+    ) -> List[StudySession]:
+        """Build one day's sessions from its precomputed slots."""
 
-                session_type, notes = subject_progress_session(subject, occ_idx, total_occ, day_progress)
+        keys = PlannerAgent._session_keys(
+            day_slots, day_blocks, total_occurrences, progress, subject_weight, progress_weight
+        )
+        return PlannerAgent._sessions_from_keys(keys, notes, session_cache)
 
-                sessions.append(
-                    StudySession(
-                        subject=subject,
-                        session_type=session_type,
-                        duration_hours=block,
-                        notes=notes,
-                    )
-                )
+    @staticmethod
+    def _session_keys(
+        day_slots: List[Tuple[str, int]],
+        day_blocks: List[float],
+        total_occurrences: Mapping[str, int],
+        progress: float,
+        subject_weight: float,
+        progress_weight: float,
+    ) -> List[SessionKey]:
+        """Decide the phase of each of one day's slots.
 
-                # increment scheduled count for the subject
-                subject_scheduled_counts[subject] = occ_idx + 1
-                remaining_hours -= block
+        The phase blends the subject's own progress (occurrence index over
+        its total occurrences) with overall progress through the plan.
+        """
 
-            plans.append(
-                DailyPlan(day=day_name, total_hours=daily_hours, sessions=sessions)
-            )
+        keys: List[SessionKey] = []
+        progress_part = progress * progress_weight
+        for (subject, occ_idx), block in zip(day_slots, day_blocks):
+            # Calculate fraction of progress for this subject across its scheduled occurrences
+            denom = max(total_occurrences.get(subject, 1) - 1, 1)
+            combined = (occ_idx / denom) * subject_weight + progress_part
 
-        return plans
+            if combined < PlannerAgent.CONCEPT_UNTIL:
+                session_type = SessionType.CONCEPT
+            elif combined < PlannerAgent.PRACTICE_UNTIL:
+                session_type = SessionType.PRACTICE
+            else:
+                session_type = SessionType.REVISION
+
+            keys.append((subject, session_type, block))
+        return keys
+
+    @staticmethod
+    def _sessions_from_keys(
+        keys: List[SessionKey],
+        notes: Dict[Tuple[str, SessionType], str],
+        session_cache: Dict[SessionKey, StudySession],
+    ) -> List[StudySession]:
+        """Build sessions for ``keys``; identical sessions are built once
+        per plan and shared through ``session_cache``."""
+
+        sessions: List[StudySession] = []
+        for key in keys:
+            session = session_cache.get(key)
+            if session is None:
+                subject, session_type, block = key
+                session = StudySession.model_construct(
+                    subject=subject,
+                    session_type=session_type,
+                    duration_hours=block,
+                    notes=notes[(subject, session_type)],
+                )
+                session_cache[key] = session
+            sessions.append(session)
+        return sessions
+
+    @staticmethod
+    def _same_sessions(
+        sessions: Sequence[StudySession],
+        keys: List[SessionKey],
+        notes: Dict[Tuple[str, SessionType], str],
+    ) -> bool:
+        """Whether existing ``sessions`` are exactly what ``keys`` would build."""
+
+        if len(sessions) != len(keys):
+            return False
+        for session, (subject, session_type, block) in zip(sessions, keys):
+            if (
+                session.subject != subject
+                or session.session_type != session_type
+                or session.duration_hours != block
+                or session.notes != notes[(subject, session_type)]
+            ):
+                return False
+        return True
@@ -4,10 +4,12 @@ Responsible for curating and providing learning resources for each subject.
 Gathers URLs for videos, notes, interactive courses, and other learning materials.
 """
 
-from typing import Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from pydantic import BaseModel, Field
 from urllib.parse import urlencode
 
+from services.resource_catalog import ResourceCatalog, get_catalog
+
 
 class ResourceLink(BaseModel):
     """Represents a single learning resource.
@@ -31,12 +33,15 @@ class SubjectResources(BaseModel):
         pdf_search: URL for PDF notes search
         freecodecamp: URL for FreeCodeCamp learning path
         description: Brief description of available resources
+        links: Curated links from the resource catalog (empty when the
+            subject is not in the catalog)
     """
     subject: str = Field(..., min_length=1, max_length=100)
     youtube_search: str = Field(..., min_length=10)
     pdf_search: str = Field(..., min_length=10)
     freecodecamp: str = Field(..., min_length=10)
     description: str = Field(default="", max_length=500)
+    links: List[ResourceLink] = Field(default_factory=list)
 
 
 class ResourceAgent:
@@ -51,6 +56,11 @@ class ResourceAgent:
     GOOGLE_BASE = "https://www.google.com/search"
     FREECODECAMP_BASE = "https://www.freecodecamp.org/learn/"
 
+    # Built resources per subject for the current catalog version
+    MAX_CACHED_SUBJECTS = 4096
+    _cache_catalog: Optional[ResourceCatalog] = None
+    _cache: Dict[str, SubjectResources] = {}
+
     @staticmethod
     def generate_resources(subjects: List[str]) -> Dict[str, SubjectResources]:
         """Generate curated resources for each subject.
@@ -64,47 +74,100 @@ class ResourceAgent:
         Returns:
             Dictionary mapping subject names to their resources
             
+        Raises:
+            ValueError: If subjects list is empty
+        """
+        return dict(ResourceAgent.iter_resources(subjects))
+
+    @staticmethod
+    def iter_resources(subjects: List[str]) -> Iterator[Tuple[str, SubjectResources]]:
+        """Yield (subject, resources) pairs one subject at a time.
+        
+        Args:
+            subjects: List of subject names
+            
+        Yields:
+            Tuples of subject name and its SubjectResources
+            
         Raises:
             ValueError: If subjects list is empty
         """
         if not subjects:
             raise ValueError("At least one subject is required")
 
-        resources_dict = {}
-
         for subject in subjects:
             if not subject or not isinstance(subject, str):
                 continue
 
-            resources_dict[subject] = ResourceAgent._create_subject_resources(subject)
-
-        return resources_dict
+            yield subject, ResourceAgent._create_subject_resources(subject)
 
     @staticmethod
     def _create_subject_resources(subject: str) -> SubjectResources:
         """Create resource links for a specific subject.
         
+        Subjects found in the resource catalog (exactly, by alias or
+        fuzzily) get its curated links; others get search links only.
+        Results are cached until the catalog is reloaded and are shared,
+        so they must not be mutated.
+        
         Args:
             subject: Subject name
             
         Returns:
             SubjectResources object with curated links
         """
+        catalog = get_catalog()
+        if ResourceAgent._cache_catalog is not catalog:
+            ResourceAgent._cache = {}
+            ResourceAgent._cache_catalog = catalog
+
+        cache = ResourceAgent._cache
+        resources = cache.get(subject)
+        if resources is None:
+            resources = ResourceAgent._build_subject_resources(subject, catalog.lookup(subject))
+            if len(cache) >= ResourceAgent.MAX_CACHED_SUBJECTS:
+                cache.clear()
+            cache[subject] = resources
+        return resources
+
+    @staticmethod
+    def _build_subject_resources(
+        subject: str, entry: Optional[Dict[str, Any]]
+    ) -> SubjectResources:
+        """Build SubjectResources from a catalog entry (or None)."""
+        # Searches use the catalog's canonical name, e.g. "DSA" -> full name
+        name = entry["name"] if entry else subject
+
         # Generate YouTube course search URL
-        youtube_url = ResourceAgent._build_youtube_search_url(subject)
+        youtube_url = ResourceAgent._build_youtube_search_url(name)
         
         # Generate PDF notes search URL
-        pdf_url = ResourceAgent._build_pdf_search_url(subject)
+        pdf_url = ResourceAgent._build_pdf_search_url(name)
         
-        # FreeCodeCamp main learning path
-        freecodecamp_url = ResourceAgent.FREECODECAMP_BASE
+        if entry is None:
+            return SubjectResources(
+                subject=subject,
+                youtube_search=youtube_url,
+                pdf_search=pdf_url,
+                # FreeCodeCamp main learning path
+                freecodecamp=ResourceAgent.FREECODECAMP_BASE,
+                description=f"Learning resources for {subject}"
+            )
 
         return SubjectResources(
             subject=subject,
             youtube_search=youtube_url,
             pdf_search=pdf_url,
-            freecodecamp=freecodecamp_url,
-            description=f"Learning resources for {subject}"
+            freecodecamp=entry.get("course") or ResourceAgent.FREECODECAMP_BASE,
+            description=entry.get("description") or f"Curated learning resources for {name}",
+            links=[
+                ResourceLink(
+                    title=link["title"],
+                    url=link["url"],
+                    resource_type=link.get("resource_type", "reference"),
+                )
+                for link in entry["links"]
+            ],
         )
 
     @staticmethod
@@ -1,25 +1,18 @@
 # backend/ai_groq_client.py
-from groq import Groq
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+from services.env import load_env
+from services.llm_backend import LLMBackend, LLMRequest, get_backend
 
 class GroqClient:
-    def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise RuntimeError("GROQ_API_KEY not set")
-        self.client = Groq(api_key=api_key)
+    SYSTEM_PROMPT = "You are a helpful assistant that outputs JSON when requested."
+
+    def __init__(self, backend: LLMBackend | None = None):
+        load_env()
+        # The Groq backend checks GROQ_API_KEY; record/replay may run without it
+        self.backend = backend or get_backend()
         self.model = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
 
     def generate_text(self, prompt: str, temperature: float = 0.2) -> str:
-        resp = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that outputs JSON when requested."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=temperature,
-        )
-        return resp.choices[0].message.content.strip()
+        request = LLMRequest(self.model, self.SYSTEM_PROMPT, prompt, temperature)
+        return self.backend.complete(request).text
@@ -0,0 +1 @@
+"""Micro-benchmarks for the planning agents, workflow and API."""
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+"""Local fake of the Groq chat completions API.
+
+Serves ``POST /openai/v1/chat/completions`` with canned JSON responses,
+injecting latency and 429s so the LLM scheduler's rate limiting, retry
+and priority behaviour can be exercised without the real API. Point the
+backend at it with ``GROQ_BASE_URL=http://127.0.0.1:<port>``.
+
+Usage (from backend/):
+    python -m benchmarks.fake_groq --port 8089 --latency-ms 200 --rate-limit-every 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+class FakeGroqServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the fault-injection settings.
+
+    Attributes:
+        latency_ms: Mean response latency
+        jitter_ms: Uniform +/- jitter around the mean
+        rate_limit_every: Answer every Nth request with a 429 (0: never)
+        retry_after: ``retry-after`` header value sent with 429s (None: omit)
+        requests_per_minute: Also 429 once more than this many requests
+            arrive within a rolling minute (0: no limit)
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Any,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 0.0,
+        rate_limit_every: int = 0,
+        retry_after: Optional[float] = 1.0,
+        requests_per_minute: int = 0,
+    ) -> None:
+        super().__init__(address, _Handler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.requests_per_minute = requests_per_minute
+        self.lock = threading.Lock()
+        self.count = 0
+        self.rate_limited = 0
+        self.connections = 0
+        self.prompts: List[str] = []
+        self._window: List[float] = []
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> threading.Thread:
+        """Serve from a daemon thread."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def _admit(self) -> bool:
+        """Count a request; False when it should be rate limited."""
+        now = time.monotonic()
+        with self.lock:
+            self.count += 1
+            limited = self.rate_limit_every > 0 and self.count % self.rate_limit_every == 0
+            if self.requests_per_minute > 0:
+                self._window = [t for t in self._window if now - t < 60.0]
+                if len(self._window) >= self.requests_per_minute:
+                    limited = True
+                else:
+                    self._window.append(now)
+            if limited:
+                self.rate_limited += 1
+            return not limited
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is visible
+    server: FakeGroqServer
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("content-length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        delay = self.server.latency_ms + random.uniform(-1, 1) * self.server.jitter_ms
+        time.sleep(max(0.0, delay) / 1000.0)
+
+        if not self.path.endswith("/chat/completions"):
+            self._send(404, {"error": {"message": "not found", "type": "not_found"}})
+            return
+
+        if not self.server._admit():
+            headers = {}
+            if self.server.retry_after is not None:
+                headers["retry-after"] = f"{self.server.retry_after:g}"
+            self._send(
+                429,
+                {"error": {"message": "Rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}},
+                headers,
+            )
+            return
+
+        messages = body.get("messages") or [{}]
+        prompt = messages[-1].get("content", "")
+        with self.server.lock:
+            self.server.prompts.append(prompt)
+        self._send(200, _completion(body.get("model", "fake"), prompt))
+
+    def _send(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _completion(model: str, prompt: str) -> Dict[str, Any]:
+    content = json.dumps({"echo": prompt[:80]})
+    prompt_tokens = max(1, len(prompt) // 4)
+    completion_tokens = max(1, len(content) // 4)
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.fake_groq")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--requests-per-minute", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = FakeGroqServer(
+        (args.host, args.port),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit_every=args.rate_limit_every,
+        retry_after=args.retry_after,
+        requests_per_minute=args.requests_per_minute,
+    )
+    print(f"Fake Groq API on {server.base_url} (GROQ_BASE_URL)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""Check backend import time against a budget (``python -X importtime``).
+
+Each target module is imported in a fresh interpreter with
+``-X importtime`` (best of ``--runs``). The check fails (exit status 1)
+when:
+
+* the backend's own modules (main, cli, agents.*, services.*,
+  workflows.*) take longer than ``--budget-ms`` to import (self time,
+  so framework imports such as fastapi are not counted), or
+* the whole import takes longer than ``--total-budget-ms``, if set, or
+* a module that is meant to load lazily was imported (groq/httpx for
+  the API, requests and the LLM stack for the CLI).
+
+Usage (from backend/):
+    python -m benchmarks.import_budget [--budget-ms 250 --total-budget-ms 0 --runs 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIRST_PARTY = {"main", "cli", "ai_groq_client", "agents", "services", "workflows"}
+
+# Module to import -> top-level packages it must not pull in
+TARGETS: Dict[str, Tuple[str, ...]] = {
+    "main": ("groq", "httpx", "requests"),
+    "cli": ("requests", "groq", "httpx", "dotenv", "fastapi"),
+}
+
+DEFAULT_BUDGET_MS = 250.0
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int]]:
+    """Parse ``-X importtime`` stderr into (module, self_us, cumulative_us)."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        rows.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return rows
+
+
+def measure(module: str) -> Tuple[float, float, List[Tuple[str, int, int]]]:
+    """Import ``module`` once in a fresh interpreter.
+
+    Returns:
+        (first-party ms, total ms, parsed rows)
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = parse_importtime(completed.stderr)
+    own = sum(self_us for name, self_us, _ in rows if name.split(".")[0] in FIRST_PARTY)
+    total = next((cumulative for name, _, cumulative in rows if name == module), 0)
+    return own / 1000, total / 1000, rows
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.import_budget")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(os.getenv("IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS)),
+        help="Max import time of the backend's own modules (env IMPORT_BUDGET_MS)",
+    )
+    parser.add_argument(
+        "--total-budget-ms",
+        type=float,
+        default=float(os.getenv("IMPORT_TOTAL_BUDGET_MS", "0")),
+        help="Max total import time, 0 to skip (env IMPORT_TOTAL_BUDGET_MS)",
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Slowest own modules to list")
+    parser.add_argument("targets", nargs="*", default=list(TARGETS))
+    args = parser.parse_args(argv)
+
+    failures = []
+    for module in args.targets:
+        runs = [measure(module) for _ in range(args.runs)]
+        own = min(run[0] for run in runs)
+        total = min(run[1] for run in runs)
+        rows = min(runs, key=lambda run: run[0])[2]
+
+        print(f"{module}: own {own:.1f}ms (budget {args.budget_ms:g}ms), total {total:.1f}ms")
+        slowest = sorted(
+            (row for row in rows if row[0].split(".")[0] in FIRST_PARTY),
+            key=lambda row: row[1],
+            reverse=True,
+        )
+        for name, self_us, cumulative_us in slowest[:args.top]:
+            print(f"  {name:<32} self {self_us / 1000:6.1f}ms  cumulative {cumulative_us / 1000:7.1f}ms")
+
+        if own > args.budget_ms:
+            failures.append(f"{module}: own import time {own:.1f}ms > {args.budget_ms:g}ms")
+        if args.total_budget_ms and total > args.total_budget_ms:
+            failures.append(f"{module}: total import time {total:.1f}ms > {args.total_budget_ms:g}ms")
+        imported = {name.split(".")[0] for name, _, _ in rows}
+        for package in TARGETS.get(module, ()):
+            if package in imported:
+                failures.append(f"{module}: imports {package} eagerly")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+"""Offline load test of /plan with content generation.
+
+Record LLM outlines once (or synthesize them), then replay them with a
+synthetic latency distribution to measure orchestration overhead and
+concurrency behaviour without network access or API cost.
+
+Usage (from backend/):
+    python -m benchmarks.llm_replay record --path rec.jsonl.gz      # real Groq, needs GROQ_API_KEY
+    python -m benchmarks.llm_replay synth --path rec.jsonl.gz       # fabricated outlines, no network
+    python -m benchmarks.llm_replay replay --path rec.jsonl.gz \\
+        --latency lognormal:400,0.5 --requests 200 --concurrency 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from typing import List, Optional
+
+from agents.content_agent import ContentAgent
+from benchmarks.run import make_subjects
+from services.ai_client import AIClient
+from services.llm_backend import (
+    GroqBackend,
+    LatencyModel,
+    LLMBackend,
+    LLMRequest,
+    LLMResponse,
+    RecordingBackend,
+    ReplayBackend,
+    set_backend,
+)
+from services.llm_cache import ResponseCache
+from workflows.agent_workflow import AgentOrchestrator
+
+
+class SyntheticOutlines(LLMBackend):
+    """Answers outline prompts (single or batched) with fabricated,
+    schema-valid outlines. Token counts use ~4 characters per token.
+
+    Subjects listed in ``invalid`` come back malformed in batched
+    responses, to exercise the per-subject retry.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, invalid: Optional[List[str]] = None) -> None:
+        self.invalid = set(invalid or ())
+
+    @staticmethod
+    def _outline(subject: str) -> dict:
+        return {
+            "subject": subject,
+            "concepts": [f"{subject} concept {i}" for i in range(1, 16)],
+            "practice_tasks": [f"{subject} exercise {i}" for i in range(1, 13)],
+        }
+
+    def complete(self, request: LLMRequest, priority=None) -> LLMResponse:
+        prompt = request.prompt
+        if "(JSON array):" in prompt:
+            subjects = json.loads(prompt.split("(JSON array):", 1)[1].strip().splitlines()[0])
+            payload = [
+                {"subject": ss, "concepts": "oops"} if ss in self.invalid else self._outline(ss)
+                for ss in subjects
+            ]
+        else:
+            payload = self._outline(prompt.split('subject: "', 1)[-1].split('"', 1)[0])
+        text = json.dumps(payload)
+        return LLMResponse(text, (len(request.system_prompt) + len(prompt)) // 4, len(text) // 4)
+
+    async def acomplete(self, request: LLMRequest, priority=None) -> LLMResponse:
+        return self.complete(request, priority)
+
+
+def _record(path: str, subjects: List[str], inner: LLMBackend) -> int:
+    recorder = RecordingBackend(inner, path)
+    agent = ContentAgent(AIClient(cache=ResponseCache(enabled=False), backend=recorder))
+    try:
+        outlines = agent.generate_outlines(subjects)
+    finally:
+        recorder.close()
+    print(f"recorded {len(outlines)} outlines to {path}")
+    return 0
+
+
+async def _replay(subjects: List[str], requests: int, concurrency: int) -> List[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            result = await AgentOrchestrator.arun_workflow(
+                subjects, 3.0, 5, include_outlines=True
+            )
+            latencies.append(time.perf_counter() - started)
+            missing = set(subjects) - set(result.get("outlines") or {})
+            if missing:
+                raise RuntimeError(f"no replayed outline for {sorted(missing)}; record them first")
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.llm_replay")
+    parser.add_argument("mode", choices=["record", "synth", "replay"])
+    parser.add_argument("--path", required=True, help="recording file (.jsonl or .jsonl.gz)")
+    parser.add_argument("--subjects", type=int, default=4)
+    parser.add_argument("--latency", default="recorded", help="LatencyModel spec for replay")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    subjects = make_subjects(args.subjects)
+
+    if args.mode == "record":
+        return _record(args.path, subjects, GroqBackend())
+    if args.mode == "synth":
+        return _record(args.path, subjects, SyntheticOutlines())
+
+    backend = ReplayBackend(args.path, LatencyModel(args.latency, seed=args.seed))
+    set_backend(backend)
+    # Every call must reach the replayer, not the response cache
+    os.environ["LLM_CACHE_ENABLED"] = "0"
+
+    started = time.perf_counter()
+    latencies = asyncio.run(_replay(subjects, args.requests, args.concurrency))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{args.requests} plans x {len(subjects)} outlines, concurrency {args.concurrency}, "
+        f"latency {args.latency} ({len(backend)} recorded responses)"
+    )
+    print(f"throughput: {args.requests / elapsed:8.1f} plans/s ({elapsed:.2f}s)")
+    print(
+        f"latency:    mean {statistics.fmean(ordered) * 1000:7.1f}ms  "
+        f"p95 {p95 * 1000:7.1f}ms  max {ordered[-1] * 1000:7.1f}ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""Drive the LLM scheduler against the fake Groq server.
+
+Starts ``benchmarks.fake_groq`` in-process, then fires a burst of batch
+calls followed by interactive calls through ``AIClient`` with the
+response cache disabled. Reports per-lane latency, 429s seen and
+retried, and how many TCP connections the pooled client opened.
+
+Usage (from backend/):
+    python -m benchmarks.llm_scheduler [--batch 40 --interactive 10 --rate-limit-every 7]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.fake_groq import FakeGroqServer
+from services.ai_client import AIClient
+from services.llm_backend import GroqBackend
+from services.llm_cache import ResponseCache
+from services.llm_scheduler import LLMScheduler, Priority
+
+
+def _summary(latencies: List[float]) -> str:
+    if not latencies:
+        return "n=0"
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"n={len(ordered)} mean={statistics.fmean(ordered) * 1000:7.1f}ms "
+        f"p95={p95 * 1000:7.1f}ms max={ordered[-1] * 1000:7.1f}ms"
+    )
+
+
+async def _drive(client: AIClient, batch: int, interactive: int) -> Dict[str, List[float]]:
+    latencies: Dict[str, List[float]] = {"batch": [], "interactive": []}
+
+    async def one(lane: str, prompt: str, priority: Priority) -> None:
+        started = time.perf_counter()
+        await client.agenerate_text(prompt, priority=priority)
+        latencies[lane].append(time.perf_counter() - started)
+
+    tasks = [
+        asyncio.ensure_future(one("batch", f"batch prompt {i}", Priority.BATCH))
+        for i in range(batch)
+    ]
+    # Interactive calls arrive after the batch has queued up
+    await asyncio.sleep(0.05)
+    tasks += [
+        asyncio.ensure_future(one("interactive", f"interactive prompt {i}", Priority.INTERACTIVE))
+        for i in range(interactive)
+    ]
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.llm_scheduler")
+    parser.add_argument("--batch", type=int, default=40)
+    parser.add_argument("--interactive", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rpm", type=float, default=600.0, help="scheduler requests/minute")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--rate-limit-every", type=int, default=7)
+    parser.add_argument("--retry-after", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+
+    server = FakeGroqServer(
+        ("127.0.0.1", 0),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit_every=args.rate_limit_every,
+        retry_after=args.retry_after,
+    )
+    server.start()
+
+    scheduler = LLMScheduler(
+        max_concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=0,
+        backoff_base=0.05,
+        base_url=server.base_url,
+        api_key="fake",
+    )
+    client = AIClient(cache=ResponseCache(enabled=False), backend=GroqBackend(scheduler))
+
+    started = time.perf_counter()
+    latencies = asyncio.run(_drive(client, args.batch, args.interactive))
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    stats = scheduler.stats()
+    total = args.batch + args.interactive
+    print(f"{total} calls in {elapsed:.2f}s ({total / elapsed:.1f} calls/s)")
+    print(f"interactive: {_summary(latencies['interactive'])}")
+    print(f"batch:       {_summary(latencies['batch'])}")
+    print(
+        f"server: {server.count} requests, {server.rate_limited} answered 429, "
+        f"{server.connections} TCP connections"
+    )
+    print(f"scheduler: {stats['retries']:.0f} retries, {stats['failed']:.0f} failed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
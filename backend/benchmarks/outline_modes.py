@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""Compare per-subject and batched outline generation.
+
+Runs ``ContentAgent.agenerate_outlines`` in both modes and reports
+round trips and tokens. By default it uses the synthetic outline backend
+(no network, ~4 characters per token); ``--live`` uses the configured
+LLM backend instead.
+
+Usage (from backend/):
+    python -m benchmarks.outline_modes [--subjects 8 --invalid 1 --live]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from typing import List, Optional
+
+from agents.content_agent import ContentAgent
+from benchmarks.llm_replay import SyntheticOutlines
+from benchmarks.run import make_subjects
+from services.ai_client import AIClient, TokenUsage
+from services.llm_cache import ResponseCache
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.outline_modes")
+    parser.add_argument("--subjects", type=int, default=8)
+    parser.add_argument(
+        "--invalid", type=int, default=0,
+        help="subjects the synthetic backend answers malformed in batched mode",
+    )
+    parser.add_argument("--live", action="store_true", help="use the configured LLM backend")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    subjects = make_subjects(args.subjects)
+    backend = None if args.live else SyntheticOutlines(invalid=subjects[:args.invalid])
+    agent = ContentAgent(AIClient(cache=ResponseCache(enabled=False), backend=backend))
+
+    print(f"{'mode':<12} {'outlines':>8} {'calls':>6} {'prompt':>8} {'completion':>11} {'total':>8} {'ms':>8}")
+    for mode in ContentAgent.MODES:
+        usage = TokenUsage()
+        started = time.perf_counter()
+        outlines = asyncio.run(agent.agenerate_outlines(subjects, mode=mode, usage=usage))
+        elapsed = (time.perf_counter() - started) * 1000
+        print(
+            f"{mode:<12} {len(outlines):>8} {usage.calls:>6} {usage.prompt_tokens:>8} "
+            f"{usage.completion_tokens:>11} {usage.total_tokens:>8} {elapsed:>8.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
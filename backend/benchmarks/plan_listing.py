@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+"""Page latency of the plan listing at increasing depth.
+
+Fills a SQLite store with ``--plans`` synthetic plans (several per
+second, so created_at ties are common), then times one page at several
+depths three ways: ``PlanStore.list_plans`` by keyset, the same query
+with a subject filter, and the LIMIT/OFFSET query it replaces. Keyset
+pages are checked against the offset pages.
+
+Usage (from backend/):
+    python -m benchmarks.plan_listing [--plans 200000 --limit 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from benchmarks.run import make_subjects
+from services.persistence import SQLitePlanStore
+
+DEPTHS = [0.0, 0.1, 0.5, 0.9, 0.999]
+
+OFFSET_QUERY = (
+    "SELECT p.plan_id, p.subjects, p.hours_per_week, p.days_per_week, p.created_at, "
+    "pp.total_sessions, pp.completed_sessions FROM study_plans p "
+    "LEFT JOIN plan_progress pp ON pp.plan_id = p.plan_id "
+    "ORDER BY p.created_at DESC, p.plan_id DESC LIMIT ? OFFSET ?"
+)
+
+
+def _fill(store: SQLitePlanStore, plans: int, rng: random.Random) -> None:
+    names = make_subjects(8)
+    started_at = datetime(2025, 1, 1)
+    rows = []
+    for index in range(plans):
+        subjects = rng.sample(names, rng.randint(1, 4))
+        document = {"plan": [{"day": "Monday", "sessions": []}], "resources": {}}
+        created = started_at + timedelta(seconds=index // 4)
+        rows.append((
+            json.dumps(subjects), 18.0, 6, json.dumps(document),
+            created.strftime("%Y-%m-%d %H:%M:%S"),
+        ))
+    with store._conn:
+        store._conn.executemany(
+            "INSERT INTO study_plans "
+            "(subjects, hours_per_week, days_per_week, plan_data, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+
+
+def _median_ms(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.plan_listing")
+    parser.add_argument("--plans", type=int, default=200_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLitePlanStore(os.path.join(tmp, "plans.db"))
+        started = time.perf_counter()
+        _fill(store, args.plans, rng)
+        print(f"inserted {args.plans} plans in {time.perf_counter() - started:.1f}s")
+
+        # Keyset position of each depth: the row just before the page
+        order = [
+            (row[0], row[1])
+            for row in store._conn.execute(
+                "SELECT created_at, plan_id FROM study_plans "
+                "ORDER BY created_at DESC, plan_id DESC"
+            )
+        ]
+        subject = make_subjects(1)[0]
+        subject_order = [
+            (row[0], row[1])
+            for row in store._conn.execute(
+                "SELECT created_at, plan_id FROM plan_subjects WHERE subject_key = lower(?) "
+                "ORDER BY created_at DESC, plan_id DESC",
+                (subject,),
+            )
+        ]
+
+        print(f"{'depth':>8} {'offset':>9} {'keyset_ms':>10} {'subject_ms':>11} {'offset_ms':>10}")
+        mismatches = 0
+        for depth in DEPTHS:
+            offset = int(depth * (len(order) - args.limit))
+            after = order[offset - 1] if offset else None
+            subject_offset = int(depth * (len(subject_order) - args.limit))
+            subject_after = subject_order[subject_offset - 1] if subject_offset else None
+
+            keyset_ids = [r["plan_id"] for r in store.list_plans(args.limit, after)]
+            offset_ids = [
+                row[0] for row in store._conn.execute(OFFSET_QUERY, (args.limit, offset))
+            ]
+            mismatches += keyset_ids != offset_ids
+
+            keyset_ms = _median_ms(lambda: store.list_plans(args.limit, after), args.repeats)
+            subject_ms = _median_ms(
+                lambda: store.list_plans(args.limit, subject_after, subject), args.repeats
+            )
+            offset_ms = _median_ms(
+                lambda: store._conn.execute(OFFSET_QUERY, (args.limit, offset)).fetchall(),
+                args.repeats,
+            )
+            print(f"{depth:8.3f} {offset:9d} {keyset_ms:10.2f} {subject_ms:11.2f} {offset_ms:10.2f}")
+
+        print(f"keyset/offset page mismatches: {mismatches}")
+        store.close()
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
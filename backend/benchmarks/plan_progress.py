@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""Compare progress reads from plan_progress with the old GROUP BY view.
+
+Fills a SQLite store with ``--plans`` stored plans, marks a share of
+their sessions complete in bulk calls, then times a dashboard read of
+``--dashboard`` plans two ways: ``PlanStore.get_progress`` (one counter
+lookup per plan) and the aggregate the ``plan_summary`` view used to
+run (COUNT/GROUP BY over study_sessions). Both must agree.
+
+Usage (from backend/):
+    python -m benchmarks.plan_progress [--plans 5000 --dashboard 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+from benchmarks.run import make_subjects
+from services.persistence import SQLitePlanStore
+from workflows.agent_workflow import AgentOrchestrator
+
+# The plan_summary view before plan_progress existed
+GROUP_BY_SUMMARY = """
+SELECT p.plan_id,
+       COUNT(DISTINCT ss.session_id) AS total_sessions,
+       COUNT(CASE WHEN ss.completed THEN 1 END) AS completed_sessions
+FROM study_plans p
+LEFT JOIN study_sessions ss ON p.plan_id = ss.plan_id
+GROUP BY p.plan_id
+"""
+
+
+def _median_ms(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.plan_progress")
+    parser.add_argument("--plans", type=int, default=5000)
+    parser.add_argument("--dashboard", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLitePlanStore(os.path.join(tmp, "plans.db"))
+        results = {
+            n: AgentOrchestrator.run_workflow(make_subjects(n), 3.0, 6) for n in range(1, 6)
+        }
+
+        started = time.perf_counter()
+        plan_ids = []
+        for _ in range(args.plans):
+            n = rng.randint(1, 5)
+            plan_ids.append(store.save_plan(make_subjects(n), 3.0, 6, results[n]))
+        print(f"stored {args.plans} plans in {time.perf_counter() - started:.1f}s")
+
+        completion_ms = []
+        for plan_id in plan_ids:
+            session_ids = [s["session_id"] for s in store.get_sessions(plan_id)]
+            done = rng.sample(session_ids, rng.randint(0, len(session_ids)))
+            if done:
+                started = time.perf_counter()
+                store.set_sessions_completed(plan_id, done)
+                completion_ms.append((time.perf_counter() - started) * 1000)
+        print(
+            f"bulk completion: {len(completion_ms)} calls, "
+            f"median {statistics.median(completion_ms):.3f}ms per call"
+        )
+
+        dashboard = rng.sample(plan_ids, min(args.dashboard, len(plan_ids)))
+        counters = store.get_progress(dashboard)
+        wanted = set(dashboard)
+
+        def group_by():
+            return {
+                row[0]: row[1:]
+                for row in store._conn.execute(GROUP_BY_SUMMARY)
+                if row[0] in wanted
+            }
+
+        aggregated = group_by()
+        mismatches = sum(
+            (counters[pid]["total_sessions"], counters[pid]["completed_sessions"])
+            != tuple(aggregated[pid])
+            for pid in dashboard
+        )
+        counter_ms = _median_ms(lambda: store.get_progress(dashboard), args.repeats)
+        group_by_ms = _median_ms(group_by, args.repeats)
+        print(
+            f"dashboard of {len(dashboard)} plans: counters {counter_ms:.2f}ms, "
+            f"GROUP BY view {group_by_ms:.2f}ms ({group_by_ms / counter_ms:.0f}x), "
+            f"mismatches {mismatches}"
+        )
+        store.close()
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
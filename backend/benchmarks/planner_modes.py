@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""Compare the cycle planner with the budgeted optimizer.
+
+For a grid of (subjects, daily hours, days per week) both planner modes
+build the weekly layout; each layout is scored with the optimizer's cost
+breakdown (balance, back-to-back repeats, daily concentration, spacing
+gaps, clustered revisions, missing phases) and timed.
+
+Usage (from backend/):
+    python -m benchmarks.planner_modes [--max-iterations 1000 --repeats 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+from agents.plan_optimizer import PlanOptimizer
+from agents.planner_agent import PlannerAgent
+from benchmarks.run import make_subjects
+
+GRID = [
+    (2, 2.0, 5),
+    (3, 3.0, 6),
+    (4, 4.5, 5),
+    (5, 6.0, 7),
+    (6, 3.0, 4),
+    (8, 8.0, 7),
+    (8, 12.0, 7),
+]
+
+METRICS = ["balance", "adjacent", "concentration", "gaps", "revision_clusters", "missing_phases"]
+
+
+def _time_ms(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.planner_modes")
+    parser.add_argument(
+        "--max-iterations", type=int, default=PlanOptimizer.DEFAULT_MAX_ITERATIONS
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+
+    header = "case                 mode       time_ms    cost  " + "  ".join(
+        f"{m[:8]:>8}" for m in METRICS
+    )
+    print(header)
+    print("-" * len(header))
+
+    totals: Dict[str, List[float]] = {"cycle": [], "optimized": []}
+    for n, hours, days in GRID:
+        subjects = make_subjects(n)
+        layouts = {
+            "cycle": lambda: list(PlannerAgent._weekly_layout(subjects, hours, days)),
+            "optimized": lambda: PlanOptimizer.optimize_layout(
+                subjects, hours, days, max_iterations=args.max_iterations, seed=args.seed
+            ),
+        }
+        label = f"{n}s x {hours:g}h x {days}d"
+        for mode, build in layouts.items():
+            elapsed = _time_ms(build, args.repeats)
+            score = PlanOptimizer.score_layout(build(), subjects)
+            totals[mode].append(score["cost"])
+            print(
+                f"{label:<20} {mode:<10} {elapsed:7.2f} {score['cost']:7.1f}  "
+                + "  ".join(f"{score[m]:8.2f}" for m in METRICS)
+            )
+
+    cycle, optimized = sum(totals["cycle"]), sum(totals["optimized"])
+    print(
+        f"\ntotal cost: cycle {cycle:.1f}, optimized {optimized:.1f} "
+        f"({(1 - optimized / cycle) * 100:.0f}% lower)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""Benchmark the resource catalog index at scale.
+
+Writes a synthetic catalog with ``--entries`` subjects (the shipped
+catalog's entries plus generated ones, each with aliases), then measures
+load/index time, exact, alias, fuzzy and token lookups (uncached and
+cached), ``ResourceAgent.generate_resources`` per subject, and a hot
+reload after the file changes.
+
+Usage (from backend/):
+    python -m benchmarks.resource_catalog [--entries 5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, List, Optional
+
+from agents.resource_agent import ResourceAgent
+from services import resource_catalog
+from services.resource_catalog import DEFAULT_CATALOG_PATH, ResourceCatalog
+
+# Common subject words; the rest of the vocabulary is generated so that
+# names overlap the way a real catalog's do rather than all sharing words
+COMMON_WORDS = [
+    "applied", "advanced", "computational", "quantum", "statistical", "modern",
+    "digital", "molecular", "financial", "industrial", "cognitive", "urban",
+    "systems", "theory", "methods", "design", "analysis", "engineering",
+    "networks", "learning", "chemistry", "physics", "biology", "economics",
+    "algorithms", "security", "robotics", "linguistics", "geometry", "optics",
+]
+SYLLABLES = [c + v for c in "bcdfghklmnprstvz" for v in "aeiou"] + ["ph", "th", "st", "ng", "x"]
+
+
+def _vocabulary(rng: random.Random, size: int) -> List[str]:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def _synthetic_catalog(entries: int, seed: int) -> dict:
+    with open(DEFAULT_CATALOG_PATH, "r", encoding="utf-8") as handle:
+        subjects = json.load(handle)["subjects"]
+    rng = random.Random(seed)
+    vocabulary = _vocabulary(rng, max(200, entries // 2))
+    seen = {s["name"].casefold() for s in subjects}
+    while len(subjects) < entries:
+        words = rng.sample(vocabulary, rng.randint(1, 2)) + [rng.choice(COMMON_WORDS)]
+        name = " ".join(w.capitalize() for w in words)
+        if name.casefold() in seen:
+            continue
+        seen.add(name.casefold())
+        slug = name.replace(" ", "_")
+        subjects.append({
+            "name": name,
+            "aliases": ["".join(w[0] for w in words) + str(len(subjects))],
+            "links": [
+                {"title": f"{name} notes", "url": f"https://example.org/{slug}", "resource_type": "notes"}
+            ],
+        })
+    return {"version": 1, "subjects": subjects}
+
+
+def _per_call_us(fn: Callable[[str], object], queries: List[str]) -> float:
+    started = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - started) / len(queries) * 1e6
+
+
+def _typo(name: str, rng: random.Random) -> str:
+    position = rng.randrange(1, len(name) - 1)
+    return name[:position] + name[position + 1:]
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.resource_catalog")
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    rng = random.Random(args.seed)
+    document = _synthetic_catalog(args.entries, args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.json")
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(document, handle)
+
+        started = time.perf_counter()
+        catalog = ResourceCatalog.load(path)
+        load_ms = (time.perf_counter() - started) * 1000
+        print(f"catalog: {len(catalog)} subjects, {catalog.key_count} keys, loaded+indexed in {load_ms:.1f}ms")
+
+        subjects = document["subjects"]
+        sample = [rng.choice(subjects) for _ in range(args.queries)]
+        cases = {
+            "exact": [s["name"] for s in sample],
+            "alias": [rng.choice(s["aliases"]) for s in sample if s.get("aliases")],
+            "fuzzy": [_typo(s["name"], rng) for s in sample if len(s["name"]) > 5],
+            "token": [f"Intro to {s['name']}" for s in sample],
+        }
+        for kind, queries in cases.items():
+            fresh = ResourceCatalog.load(path)
+            uncached = _per_call_us(fresh.lookup, queries)
+            cached = _per_call_us(fresh.lookup, queries)
+            found = sum(fresh.lookup(q) is not None for q in queries)
+            print(
+                f"{kind:<6} lookup: {uncached:8.1f}us uncached  {cached:6.2f}us cached  "
+                f"({found}/{len(queries)} matched)"
+            )
+
+        os.environ["RESOURCE_CATALOG_PATH"] = path
+        os.environ["RESOURCE_CATALOG_CHECK_SECONDS"] = "0"
+        resource_catalog.reload_catalog()
+        names = [s["name"] for s in sample[:8]]
+        ResourceAgent.generate_resources(names)
+        loops = 5000
+        started = time.perf_counter()
+        for _ in range(loops):
+            ResourceAgent.generate_resources(names)
+        per_subject = (time.perf_counter() - started) / (loops * len(names)) * 1e6
+        print(f"generate_resources: {per_subject:.2f}us per subject (cached build)")
+
+        # Hot reload: change the file and let get_catalog notice it
+        document["subjects"].append({"name": "Hot Reloaded Subject", "links": []})
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(document, handle)
+        started = time.perf_counter()
+        reloaded = resource_catalog.get_catalog()
+        reload_ms = (time.perf_counter() - started) * 1000
+        print(
+            f"hot reload: {reload_ms:.1f}ms, {len(reloaded)} subjects, "
+            f"new entry found: {reloaded.lookup('hot reloaded subject') is not None}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
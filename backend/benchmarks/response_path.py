@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""Compare the validated and fast /plan response paths.
+
+The validated path is what FastAPI does for ``return StudyPlanResponse(**result)``
+with ``response_model=StudyPlanResponse``: build and validate the model,
+dump, re-validate against the response field, serialize and json.dumps.
+The fast path is ``main.render_plan_response``. Both must produce the
+same bytes.
+
+Usage (from backend/):
+    python -m benchmarks.response_path [--subjects 8 --hours 12 --days 7]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+import main
+from benchmarks.run import make_subjects
+from workflows.agent_workflow import AgentOrchestrator
+
+
+def _plan_route() -> APIRoute:
+    for route in main.app.routes:
+        if isinstance(route, APIRoute) and route.path == "/plan":
+            return route
+    raise RuntimeError("/plan route not found")
+
+
+async def validated_path(result: Dict[str, Any]) -> bytes:
+    route = _plan_route()
+    content = await serialize_response(
+        field=route.secure_cloned_response_field,
+        response_content=main.StudyPlanResponse(**result),
+        is_coroutine=False,
+    )
+    return JSONResponse(content).body
+
+
+async def fast_path(result: Dict[str, Any]) -> bytes:
+    return main.render_plan_response(result)
+
+
+def bench(
+    fn: Callable[[Dict[str, Any]], Awaitable[bytes]],
+    result: Dict[str, Any],
+    loops: int,
+    repeats: int = 5,
+) -> float:
+    """Return the best mean seconds per call over ``repeats`` runs."""
+
+    async def _run() -> float:
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(loops):
+                await fn(result)
+            best = min(best, (time.perf_counter() - start) / loops)
+        return best
+
+    return asyncio.run(_run())
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.response_path")
+    parser.add_argument("--subjects", type=int, default=8)
+    parser.add_argument("--hours", type=float, default=12.0)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--loops", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+
+    result = AgentOrchestrator.run_workflow(make_subjects(args.subjects), args.hours, args.days)
+
+    slow_body = asyncio.run(validated_path(result))
+    fast_body = asyncio.run(fast_path(result))
+    if slow_body != fast_body:
+        print("MISMATCH: fast path output differs from the validated path")
+        return 1
+
+    slow = bench(validated_path, result, args.loops)
+    fast = bench(fast_path, result, args.loops)
+    print(
+        f"plan: {args.subjects} subjects x {args.hours}h x {args.days} days "
+        f"({len(fast_body)} bytes, identical output)"
+    )
+    print(f"validated path: {slow * 1e6:9.1f} us/response")
+    print(f"fast path:      {fast * 1e6:9.1f} us/response")
+    print(f"speedup:        {slow / fast:9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
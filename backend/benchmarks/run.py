@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+"""Benchmark suite for the study planner backend.
+
+Sweeps subjects (1-8), daily hours (0.5-12) and days per week (1-7) over
+the planner, resource agent, time slot builder, timetable engine,
+workflow and the /plan endpoint, measuring calls/sec, allocations and peak memory. Results are
+written as a JSON report and compared against a stored baseline.
+
+Usage (from backend/):
+    python -m benchmarks.run                      # quick grid, compare to baseline
+    python -m benchmarks.run --full -o report.json
+    python -m benchmarks.run --update-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from agents.planner_agent import PlannerAgent
+from agents.resource_agent import ResourceAgent
+from services.time_utils import build_time_slots
+from services.timetable import TimetableEngine
+from workflows.agent_workflow import AgentOrchestrator
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+QUICK_SUBJECTS = [1, 2, 4, 8]
+QUICK_HOURS = [0.5, 3.0, 6.0, 12.0]
+QUICK_DAYS = [1, 4, 7]
+
+FULL_SUBJECTS = list(range(1, 9))
+FULL_HOURS = [0.5, 1.0, 2.0, 3.0, 4.5, 6.0, 8.0, 10.0, 12.0]
+FULL_DAYS = list(range(1, 8))
+
+# Fractional change allowed before a case counts as a regression
+DEFAULT_THRESHOLD = 0.25
+
+Case = Tuple[str, Dict[str, Any], Callable[[], Any]]
+
+
+def make_subjects(count: int) -> List[str]:
+    """Build ``count`` distinct, realistic subject names."""
+    names = [
+        "Python", "Data Structures", "Web Development", "Algorithms",
+        "Databases", "Operating Systems", "Machine Learning", "Networking",
+    ]
+    return names[:count]
+
+
+def measure(fn: Callable[[], Any], min_time: float, repeats: int = 5) -> Dict[str, float]:
+    """Measure throughput, allocations and peak memory of ``fn``.
+
+    Throughput is the best of ``repeats`` timed runs (the least disturbed
+    by other load on the machine). It is timed without tracemalloc (it slows allocation-heavy
+    code several times over); allocations and peak are taken from a
+    separate traced call. ``allocated_blocks`` counts the memory blocks
+    still alive when the call returns, i.e. its result plus anything cached.
+    """
+    fn()  # warm up caches and lazy imports
+
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * 1.1 * min_time / max(elapsed, 1e-9)))
+
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    result = fn()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    allocations = sum(
+        max(stat.count_diff, 0) for stat in after.compare_to(before, "lineno")
+    )
+    return {
+        "calls_per_sec": loops / elapsed,
+        "mean_us": elapsed / loops * 1e6,
+        "allocated_blocks": allocations,
+        "peak_kib": peak / 1024,
+    }
+
+
+def build_cases(full: bool, include_api: bool) -> List[Case]:
+    """Build the (target, params, callable) list for the sweep."""
+    subjects_grid = FULL_SUBJECTS if full else QUICK_SUBJECTS
+    hours_grid = FULL_HOURS if full else QUICK_HOURS
+    days_grid = FULL_DAYS if full else QUICK_DAYS
+
+    cases: List[Case] = []
+
+    for n in subjects_grid:
+        subjects = make_subjects(n)
+        cases.append((
+            "resource_agent",
+            {"subjects": n},
+            lambda subjects=subjects: ResourceAgent.generate_resources(subjects),
+        ))
+
+    for hours in hours_grid:
+        cases.append((
+            "time_slots",
+            {"hours": hours},
+            lambda hours=hours: build_time_slots("07:00", hours),
+        ))
+
+    # Classes on weekday mornings/afternoons plus nightly sleep
+    engine = TimetableEngine(
+        day_start="06:00",
+        day_end="24:00",
+        blocked=[
+            (day, start, end)
+            for day in PlannerAgent.DAYS[:5]
+            for start, end in (("09:00", "10:30"), ("11:00", "12:30"), ("14:00", "15:30"))
+        ] + [(day, "23:00", "06:30") for day in PlannerAgent.DAYS],
+    )
+    for hours in hours_grid:
+        plan = PlannerAgent.generate_study_plan(make_subjects(max(subjects_grid)), hours, 7)
+        cases.append((
+            "timetable",
+            {"hours": hours},
+            lambda plan=plan: engine.place(plan),
+        ))
+
+    for n in subjects_grid:
+        subjects = make_subjects(n)
+        for hours in hours_grid:
+            for days in days_grid:
+                params = {"subjects": n, "hours": hours, "days": days}
+                cases.append((
+                    "planner",
+                    params,
+                    lambda s=subjects, h=hours, d=days: PlannerAgent.generate_study_plan(s, h, d),
+                ))
+                cases.append((
+                    "workflow",
+                    params,
+                    lambda s=subjects, h=hours, d=days: AgentOrchestrator.run_workflow(s, h, d),
+                ))
+
+    if include_api:
+        cases.extend(build_api_cases(subjects_grid, hours_grid, days_grid))
+
+    return cases
+
+
+def build_api_cases(
+    subjects_grid: Iterable[int],
+    hours_grid: Iterable[float],
+    days_grid: Iterable[int],
+) -> List[Case]:
+    """End-to-end /plan cases through FastAPI's TestClient.
+
+    ``api_plan`` clears the workflow memo before each call so it measures
+    the full path; ``api_plan_cached`` measures repeat requests.
+    """
+    from fastapi.testclient import TestClient
+
+    import main
+    from workflows.workflow_cache import workflow_memo
+
+    client = TestClient(main.app)
+    cases: List[Case] = []
+
+    def post(payload: Dict[str, Any], clear: bool) -> None:
+        if clear:
+            workflow_memo.clear()
+        response = client.post("/plan", json=payload)
+        response.raise_for_status()
+
+    # The API sweep is heavier per call, so use the grid corners only
+    subjects_grid = sorted(set(subjects_grid))
+    hours_grid = sorted(set(hours_grid))
+    days_grid = sorted(set(days_grid))
+    for n in (subjects_grid[0], subjects_grid[-1]):
+        for hours in (hours_grid[0], hours_grid[-1]):
+            for days in (days_grid[0], days_grid[-1]):
+                payload = {"subjects": make_subjects(n), "hours": hours, "days_per_week": days}
+                params = {"subjects": n, "hours": hours, "days": days}
+                cases.append(("api_plan", params, lambda p=payload: post(p, True)))
+                cases.append(("api_plan_cached", params, lambda p=payload: post(p, False)))
+    return cases
+
+
+def case_id(target: str, params: Dict[str, Any]) -> str:
+    """Stable identifier used to match cases against the baseline."""
+    return target + "[" + ",".join(f"{k}={params[k]}" for k in sorted(params)) + "]"
+
+
+def run_suite(full: bool, include_api: bool, min_time: float) -> Dict[str, Any]:
+    """Run every case and return the report document."""
+    results: Dict[str, Dict[str, Any]] = {}
+    cases = build_cases(full, include_api)
+    for index, (target, params, fn) in enumerate(cases, 1):
+        cid = case_id(target, params)
+        metrics = measure(fn, min_time)
+        results[cid] = {"target": target, "params": params, **metrics}
+        print(
+            f"[{index:>3}/{len(cases)}] {cid:<55} "
+            f"{metrics['calls_per_sec']:>12.1f} calls/s "
+            f"{metrics['allocated_blocks']:>7} allocs "
+            f"{metrics['peak_kib']:>9.1f} KiB peak",
+            flush=True,
+        )
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mode": "full" if full else "quick",
+        "results": results,
+    }
+
+
+def compare(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float,
+) -> List[str]:
+    """Return a description of every case that regressed past ``threshold``.
+
+    A case regresses when its throughput drops, or its peak memory or
+    allocation count grows, by more than ``threshold`` (a fraction).
+    """
+    regressions: List[str] = []
+    base_results = baseline.get("results", {})
+    for cid, current in report["results"].items():
+        base = base_results.get(cid)
+        if base is None:
+            continue
+
+        if current["calls_per_sec"] < base["calls_per_sec"] * (1 - threshold):
+            regressions.append(
+                f"{cid}: throughput {current['calls_per_sec']:.1f}/s "
+                f"vs baseline {base['calls_per_sec']:.1f}/s"
+            )
+        # Small absolute values are noise-dominated, so give them slack
+        if current["peak_kib"] > base["peak_kib"] * (1 + threshold) + 4:
+            regressions.append(
+                f"{cid}: peak memory {current['peak_kib']:.1f} KiB "
+                f"vs baseline {base['peak_kib']:.1f} KiB"
+            )
+        if current["allocated_blocks"] > base["allocated_blocks"] * (1 + threshold) + 16:
+            regressions.append(
+                f"{cid}: allocations {current['allocated_blocks']} "
+                f"vs baseline {base['allocated_blocks']}"
+            )
+    return regressions
+
+
+def _create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Benchmark the planner, resource agent, workflow and /plan",
+    )
+    parser.add_argument("--full", action="store_true", help="Run the full parameter sweep")
+    parser.add_argument("--no-api", action="store_true", help="Skip the /plan TestClient cases")
+    parser.add_argument(
+        "--min-time", type=float, default=0.02,
+        help="Minimum seconds per timed run (default: 0.02)",
+    )
+    parser.add_argument("-o", "--output", help="Write the JSON report to FILE", metavar="FILE")
+    parser.add_argument(
+        "--baseline", default=DEFAULT_BASELINE,
+        help="Baseline report to compare against (default: benchmarks/baseline.json)",
+        metavar="FILE",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help=f"Allowed regression as a fraction (default: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true",
+        help="Overwrite the baseline with this run instead of comparing",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point; returns a non-zero exit code on regressions."""
+    args = _create_parser().parse_args(argv)
+
+    # Request logging would dominate the API timings
+    logging.disable(logging.INFO)
+
+    report = run_suite(full=args.full, include_api=not args.no_api, min_time=args.min_time)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = compare(report, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+
+    print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""Check that semester plans spread every subject over the whole horizon.
+
+Generates semester plans over a grid of subjects, daily hours, study days
+and horizon lengths. The check fails (exit status 1) when a subject:
+
+* is first studied later than one rotation after the start, or last
+  studied earlier than one rotation before the end (a rotation is the
+  number of study days needed to visit every subject once), or
+* does not open in the concept phase, does not close in the revision
+  phase (when it has more than one session), or ever moves back to an
+  earlier phase.
+
+Usage (from backend/):
+    python -m benchmarks.semester_spread
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+from datetime import date
+from typing import Dict, List, Optional
+
+from agents.planner_agent import PlannerAgent, SessionType
+from benchmarks.run import make_subjects
+
+SUBJECTS = list(range(1, 9))
+HOURS = [0.5, 1.0, 3.0, 6.0, 12.0]
+DAYS = [1, 3, 5, 7]
+WEEKS = [1, 4, 16, 52]
+
+PHASE_ORDER = {SessionType.CONCEPT: 0, SessionType.PRACTICE: 1, SessionType.REVISION: 2}
+
+
+def check_plan(subjects: List[str], hours: float, days: int, weeks: int) -> List[str]:
+    """Return a description of every spread or phase violation of one plan."""
+    plan = PlannerAgent.generate_semester_plan(
+        subjects, hours, days, weeks=weeks, start_date=date(2026, 10, 12)
+    )
+    blocks_per_day = len(PlannerAgent._split_day(hours))
+    if blocks_per_day * len(plan) < len(subjects):
+        return []  # too few sessions to visit every subject at all
+    rotation = math.ceil(len(subjects) / blocks_per_day)
+
+    seen: Dict[str, List[tuple]] = {}
+    for day_index, day in enumerate(plan):
+        for session in day.sessions:
+            seen.setdefault(session.subject, []).append((day_index, session.session_type))
+
+    label = f"subjects={len(subjects)} hours={hours} days={days} weeks={weeks}"
+    failures = []
+    for subject in subjects:
+        sessions = seen.get(subject)
+        if not sessions:
+            failures.append(f"{label}: {subject} is never studied")
+            continue
+        first, last = sessions[0][0], sessions[-1][0]
+        if first >= rotation or last < len(plan) - rotation:
+            failures.append(
+                f"{label}: {subject} only spans study days {first}-{last} of {len(plan)}"
+            )
+        phases = [PHASE_ORDER[phase] for _, phase in sessions]
+        if phases[0] != 0 or (len(phases) > 1 and phases[-1] != 2):
+            failures.append(f"{label}: {subject} runs {phases[0]}..{phases[-1]}, not concept..revision")
+        if any(b < a for a, b in zip(phases, phases[1:])):
+            failures.append(f"{label}: {subject} moves back to an earlier phase")
+    return failures
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.semester_spread")
+    parser.parse_args(argv)
+
+    failures = []
+    plans = 0
+    for n in SUBJECTS:
+        for hours in HOURS:
+            for days in DAYS:
+                for weeks in WEEKS:
+                    failures.extend(check_plan(make_subjects(n), hours, days, weeks))
+                    plans += 1
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if not failures:
+        print(f"OK ({plans} semester plans)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -4,15 +4,347 @@ AI Study Planner CLI Tool
 
 A command-line interface to generate personalized study plans using the FastAPI backend.
 Calls the /plan endpoint and displays formatted weekly study schedules.
+
+Bulk mode (``--input``) reads many plan requests from a JSONL or CSV file,
+posts them concurrently over one pooled keep-alive session and streams
+each result to an output JSONL as it finishes. With ``--local`` the same
+file is generated in-process instead, across a pool of worker processes,
+and results are written in input order.
 """
 
 import argparse
+import csv
+import os
+import random
+import re
+import signal
 import sys
-from typing import List
-import requests
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import date
+from itertools import islice
+from typing import (
+    Any, BinaryIO, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+)
 import json
 from urllib.parse import urljoin
 
+# Responses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 20.0
+
+
+class PlanJob(NamedTuple):
+    """One plan request read from a bulk input file."""
+
+    index: int
+    id: Any
+    payload: Optional[Dict[str, Any]]
+    error: Optional[str] = None
+
+
+class PlanResult(NamedTuple):
+    """Outcome of one bulk plan request."""
+
+    ok: bool
+    status_code: Optional[int]
+    body: bytes
+    attempts: int
+    latency_ms: float
+
+
+def _parse_job(
+    index: int, record: Any, default_hours: float, default_days: int
+) -> PlanJob:
+    """Turn one input record into a /plan payload, or a job with an error."""
+    if not isinstance(record, dict):
+        return PlanJob(index, None, None, "Record must be an object")
+
+    record_id = record.get("id")
+    subjects = record.get("subjects")
+    if isinstance(subjects, str):
+        subjects = [s.strip() for s in re.split(r"[,;]", subjects) if s.strip()]
+    if not isinstance(subjects, list) or not subjects:
+        return PlanJob(index, record_id, None, "At least one subject is required")
+
+    try:
+        hours = float(record.get("hours") or default_hours)
+        days = int(record.get("days_per_week") or record.get("days") or default_days)
+    except (TypeError, ValueError):
+        return PlanJob(index, record_id, None, "hours and days_per_week must be numbers")
+
+    payload = {"subjects": subjects, "hours": hours, "days_per_week": days}
+    return PlanJob(index, record_id, payload)
+
+
+def iter_plan_jobs(
+    path: str, default_hours: float = 3, default_days: int = 6
+) -> Iterator[PlanJob]:
+    """
+    Read plan requests from a JSONL or CSV file (``.csv``), one at a time.
+
+    Each record has ``subjects`` (a list, or a comma/semicolon separated
+    string), ``hours`` and ``days_per_week`` (or ``days``); missing
+    numbers fall back to the defaults. An optional ``id`` is copied to
+    the output. Records that cannot be read become jobs with an error
+    instead of stopping the run.
+
+    Args:
+        path: Input file
+        default_hours: Daily hours for records without ``hours``
+        default_days: Days per week for records without them
+
+    Yields:
+        PlanJob per record, in file order
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            for index, row in enumerate(csv.DictReader(f)):
+                yield _parse_job(index, row, default_hours, default_days)
+            return
+
+        index = 0
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield PlanJob(index, None, None, f"Invalid JSON: {e}")
+            else:
+                yield _parse_job(index, record, default_hours, default_days)
+            index += 1
+
+
+def encode_result(job: PlanJob, result: PlanResult) -> bytes:
+    """
+    Encode one bulk result as a JSONL line.
+
+    A successful response body is spliced in as ``plan`` without being
+    decoded and re-encoded.
+    """
+    head: Dict[str, Any] = {
+        "index": job.index,
+        "id": job.id,
+        "ok": result.ok,
+        "status_code": result.status_code,
+        "attempts": result.attempts,
+        "latency_ms": round(result.latency_ms, 2),
+    }
+    if result.ok:
+        return (
+            json.dumps(head, separators=(",", ":"))[:-1].encode("utf-8")
+            + b',"plan":' + result.body + b"}\n"
+        )
+    head["error"] = result.body.decode("utf-8", "replace")
+    return json.dumps(head, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class BulkStats:
+    """Counters and latency percentiles of a bulk run."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+        self._latencies: List[float] = []
+
+    def record(self, result: PlanResult) -> None:
+        self.add(result.ok, result.latency_ms, result.attempts)
+
+    def add(self, ok: bool, latency_ms: float, attempts: int = 1) -> None:
+        if ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        self.retries += max(0, attempts - 1)
+        if attempts:
+            self._latencies.append(latency_ms)
+
+    @property
+    def done(self) -> int:
+        return self.succeeded + self.failed
+
+    def percentile(self, q: float) -> float:
+        """Nearest-rank percentile of request latency, in ms."""
+        if not self._latencies:
+            return 0.0
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, max(0, int(q / 100 * len(ordered) + 0.5) - 1))]
+
+    def throughput(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def progress_line(self) -> str:
+        return (
+            f"⏳ {self.done} done ({self.failed} failed, {self.retries} retries) "
+            f"| {self.throughput():.1f} plans/s"
+        )
+
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        return (
+            f"✅ {self.succeeded} succeeded, ❌ {self.failed} failed, "
+            f"{self.retries} retries in {elapsed:.1f}s ({self.throughput():.1f} plans/s)\n"
+            f"   Latency ms: p50 {self.percentile(50):.1f} | p95 {self.percentile(95):.1f} "
+            f"| p99 {self.percentile(99):.1f} | max {max(self._latencies, default=0.0):.1f}"
+        )
+
+
+class BulkPlanClient:
+    """Posts plan requests over one pooled keep-alive session, with retries."""
+
+    def __init__(
+        self,
+        plan_endpoint: str,
+        concurrency: int = 8,
+        retries: int = 3,
+        timeout: float = 30.0,
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            plan_endpoint: URL of the /plan endpoint
+            concurrency: Number of pooled connections (one per worker)
+            retries: Retries per request on connection errors, timeouts
+                and 429/5xx responses
+            timeout: Per-attempt timeout in seconds
+        """
+        # Imported lazily: requests costs ~0.15s, which --help/--version never need
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.plan_endpoint = plan_endpoint
+        self.retries = retries
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def post(self, payload: Dict[str, Any]) -> PlanResult:
+        """
+        POST one plan request, retrying transient failures.
+
+        Backoff is jittered exponential, or the server's ``Retry-After``
+        when it sends one.
+
+        Returns:
+            PlanResult with the response body, or the error text
+        """
+        import requests
+
+        started = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                response = self.session.post(
+                    self.plan_endpoint, json=payload, timeout=self.timeout
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                status_code = None
+                body = f"{type(e).__name__}: {e}".encode("utf-8")
+            else:
+                status_code = response.status_code
+                body = response.content
+                if status_code < 400:
+                    return PlanResult(
+                        True, status_code, body, attempt + 1,
+                        (time.perf_counter() - started) * 1000,
+                    )
+                if status_code not in RETRYABLE_STATUS:
+                    break
+                retry_after = _retry_after_seconds(response.headers.get("Retry-After"))
+
+            if attempt < self.retries:
+                # Full jitter keeps the workers from retrying in lockstep
+                delay = random.uniform(
+                    0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))
+                )
+                if retry_after is not None:
+                    delay = min(BACKOFF_MAX_SECONDS, retry_after) + random.uniform(
+                        0, BACKOFF_BASE_SECONDS
+                    )
+                time.sleep(delay)
+
+        return PlanResult(
+            False, status_code, body, attempt + 1, (time.perf_counter() - started) * 1000
+        )
+
+    def close(self) -> None:
+        self.session.close()
+
+
+# (ok, latency_ms, encoded JSONL line) of one locally generated plan
+LocalResult = Tuple[bool, float, bytes]
+
+
+def _chunked(jobs: Iterable[PlanJob], size: int) -> Iterator[List[PlanJob]]:
+    iterator = iter(jobs)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _init_local_worker() -> None:
+    """Process pool initializer: leave Ctrl-C to the parent process."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def generate_chunk(jobs: List[PlanJob]) -> List[LocalResult]:
+    """
+    Run the planning workflow for a chunk of jobs (in a worker process).
+
+    Results are encoded here, so the workers also do the JSON work and
+    only finished lines travel back to the parent.
+
+    Returns:
+        One LocalResult per job, in chunk order
+    """
+    # Imported lazily: only the in-process mode loads the agents
+    from services.persistence import serialize_result
+    from workflows.agent_workflow import run_workflow
+
+    results: List[LocalResult] = []
+    for job in jobs:
+        if job.error is not None:
+            result = PlanResult(False, None, job.error.encode("utf-8"), 0, 0.0)
+            results.append((False, 0.0, encode_result(job, result)))
+            continue
+
+        started = time.perf_counter()
+        try:
+            plan = run_workflow(
+                job.payload["subjects"], job.payload["hours"], job.payload["days_per_week"]
+            )
+            body = json.dumps(serialize_result(plan), separators=(",", ":")).encode("utf-8")
+            ok = True
+        except ValueError as e:
+            body = f"Invalid input: {e}".encode("utf-8")
+            ok = False
+        except Exception as e:
+            body = f"{type(e).__name__}: {e}".encode("utf-8")
+            ok = False
+        latency_ms = (time.perf_counter() - started) * 1000
+        result = PlanResult(ok, None, body, 1, latency_ms)
+        results.append((ok, latency_ms, encode_result(job, result)))
+    return results
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a delta-seconds ``Retry-After`` header."""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
 
 class StudyPlannerCLI:
     """CLI tool for generating and displaying study plans."""
@@ -43,6 +375,9 @@ class StudyPlannerCLI:
             requests.RequestException: If API call fails
             ValueError: If response is invalid
         """
+        # Imported lazily: requests costs ~0.15s, which --help/--version never need
+        import requests
+
         payload = {
             "subjects": subjects,
             "hours": hours,
@@ -128,6 +463,21 @@ class StudyPlannerCLI:
         """Execute the CLI with parsed arguments."""
         parser = self._create_parser()
         args = parser.parse_args()
+        self.api_url = args.api_url
+        self.plan_endpoint = urljoin(args.api_url, "/plan")
+
+        if args.local and not args.input:
+            parser.error("--local needs --input")
+        if args.local:
+            if args.workers < 1 or args.chunksize < 1:
+                parser.error("--workers and --chunksize must be at least 1")
+            sys.exit(self.run_local(args))
+        if args.input:
+            if args.concurrency < 1 or args.retries < 0:
+                parser.error("--concurrency must be at least 1 and --retries at least 0")
+            if args.format != "json":
+                parser.error("--format applies to single plans; bulk output is JSONL")
+            sys.exit(self.run_bulk(args))
 
         try:
             # Validate subjects
@@ -135,18 +485,27 @@ class StudyPlannerCLI:
             if not subjects:
                 parser.error("At least one subject is required")
 
-            print(f"📋 Fetching study plan for: {', '.join(subjects)}")
-            print(f"   Daily hours: {args.hours} | Days/week: {args.days}\n")
+            # An export written to stdout must not be mixed with messages
+            to_stdout = args.format != "json" and not args.output
+            status_stream = sys.stderr if to_stdout else sys.stdout
+            print(f"📋 Fetching study plan for: {', '.join(subjects)}", file=status_stream)
+            print(
+                f"   Daily hours: {args.hours} | Days/week: {args.days}\n",
+                file=status_stream,
+            )
 
             # Fetch plan from API
             plan_data = self.fetch_plan(subjects, args.hours, args.days)
 
-            # Print formatted plan
-            self.print_study_plan(plan_data)
+            if args.format == "json":
+                # Print formatted plan
+                self.print_study_plan(plan_data)
 
-            # Optionally save to file
-            if args.output:
-                self._save_to_file(plan_data, args.output)
+                # Optionally save to file
+                if args.output:
+                    self._save_to_file(plan_data, args.output)
+            else:
+                self._export(plan_data, args.format, args.output, args.start_date, args.weeks)
 
         except (ConnectionError, TimeoutError, ValueError) as e:
             print(f"\n{str(e)}\n")
@@ -155,6 +514,220 @@ class StudyPlannerCLI:
             print(f"\n❌ Unexpected error: {str(e)}\n")
             sys.exit(1)
 
+    def run_bulk(self, args: argparse.Namespace) -> int:
+        """
+        Generate plans for every request in ``args.input``.
+
+        At most ``2 * concurrency`` requests are read ahead, so the input
+        can be any size. Results are written to ``args.output`` (stdout by
+        default) in completion order, one JSONL line each, and flushed as
+        they arrive; ``index`` and ``id`` tie them back to the input.
+        Progress and the latency summary go to stderr when results go to
+        stdout.
+
+        Returns:
+            Exit status: 0 if every plan succeeded, 1 otherwise, 130 when
+            interrupted
+        """
+        status_stream = sys.stderr if not args.output else sys.stdout
+        try:
+            jobs = iter_plan_jobs(args.input, args.hours, args.days)
+            out = open(args.output, "wb") if args.output else sys.stdout.buffer
+        except OSError as e:
+            print(f"❌ Cannot open file: {e}", file=sys.stderr)
+            return 1
+
+        print(
+            f"📋 Sending plan requests from {args.input} to {self.plan_endpoint} "
+            f"({args.concurrency} concurrent)",
+            file=status_stream,
+        )
+        client = BulkPlanClient(
+            self.plan_endpoint, args.concurrency, args.retries, args.timeout
+        )
+        stats = BulkStats()
+        executor = ThreadPoolExecutor(
+            max_workers=args.concurrency, thread_name_prefix="plan-bulk"
+        )
+        pending: Dict[Future, PlanJob] = {}
+        interrupted = False
+        try:
+            self._drain_bulk(
+                jobs, client, executor, 2 * args.concurrency, pending, out, stats, status_stream
+            )
+        except KeyboardInterrupt:
+            interrupted = True
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"\n❌ Bulk run stopped: {e}", file=sys.stderr)
+            stats.failed += 1
+        finally:
+            executor.shutdown(wait=not interrupted, cancel_futures=True)
+            client.close()
+            if out is not sys.stdout.buffer:
+                out.close()
+            else:
+                out.flush()
+
+        if interrupted:
+            print(
+                f"\n⚠️  Interrupted; {len(pending)} requests in flight were dropped",
+                file=status_stream,
+            )
+        print(("\n" if status_stream.isatty() else "") + stats.summary(), file=status_stream)
+        if interrupted:
+            return 130
+        return 0 if stats.failed == 0 else 1
+
+    @staticmethod
+    def _drain_bulk(
+        jobs: Iterator[PlanJob],
+        client: BulkPlanClient,
+        executor: ThreadPoolExecutor,
+        read_ahead: int,
+        pending: Dict[Future, PlanJob],
+        out: BinaryIO,
+        stats: BulkStats,
+        status_stream: TextIO,
+    ) -> None:
+        """Keep the executor fed from ``jobs`` and write results as they finish."""
+        live = status_stream.isatty()
+        report_every = 0.25 if live else 5.0
+        last_report = time.perf_counter()
+        exhausted = False
+
+        while True:
+            while not exhausted and len(pending) < read_ahead:
+                job = next(jobs, None)
+                if job is None:
+                    exhausted = True
+                elif job.error is not None:
+                    result = PlanResult(False, None, job.error.encode("utf-8"), 0, 0.0)
+                    stats.record(result)
+                    out.write(encode_result(job, result))
+                else:
+                    pending[executor.submit(client.post, job.payload)] = job
+            if not pending:
+                return
+
+            done, _ = wait(pending, timeout=report_every, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = pending.pop(future)
+                result = future.result()
+                stats.record(result)
+                out.write(encode_result(job, result))
+            if done:
+                out.flush()
+
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                last_report = now
+                print(
+                    ("\r" if live else "") + stats.progress_line(),
+                    end="" if live else "\n",
+                    file=status_stream,
+                    flush=True,
+                )
+
+    def run_local(self, args: argparse.Namespace) -> int:
+        """
+        Generate plans for every request in ``args.input`` in-process.
+
+        Jobs are cut into chunks of ``args.chunksize`` and spread over
+        ``args.workers`` processes (``--workers 1`` runs the plain loop in
+        this process). At most ``2 * workers`` chunks are in flight, and
+        the oldest is always written first, so the output is in input
+        order and memory does not grow with the input. On Ctrl-C the
+        chunks already running finish, nothing else is started, and the
+        output is left as a complete prefix of the input.
+
+        Returns:
+            Exit status: 0 if every plan succeeded, 1 otherwise, 130 when
+            interrupted
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+
+        status_stream = sys.stderr if not args.output else sys.stdout
+        try:
+            jobs = iter_plan_jobs(args.input, args.hours, args.days)
+            out = open(args.output, "wb") if args.output else sys.stdout.buffer
+        except OSError as e:
+            print(f"❌ Cannot open file: {e}", file=sys.stderr)
+            return 1
+
+        print(
+            f"📋 Generating plans from {args.input} in-process "
+            f"({args.workers} workers, {args.chunksize} plans per chunk)",
+            file=status_stream,
+        )
+        # Loaded before the pool starts, so forked workers inherit it
+        import workflows.agent_workflow  # noqa: F401
+
+        stats = BulkStats()
+        live = status_stream.isatty()
+        report_every = 0.25 if live else 5.0
+        last_report = time.perf_counter()
+
+        def write(results: List[LocalResult]) -> None:
+            nonlocal last_report
+            for ok, latency_ms, line in results:
+                stats.add(ok, latency_ms)
+                out.write(line)
+            out.flush()
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                last_report = now
+                print(
+                    ("\r" if live else "") + stats.progress_line(),
+                    end="" if live else "\n",
+                    file=status_stream,
+                    flush=True,
+                )
+
+        executor = None
+        window: Deque[Future] = deque()
+        status = 0
+        try:
+            chunks = _chunked(jobs, args.chunksize)
+            if args.workers == 1:
+                for chunk in chunks:
+                    write(generate_chunk(chunk))
+            else:
+                executor = ProcessPoolExecutor(
+                    max_workers=args.workers, initializer=_init_local_worker
+                )
+                for chunk in chunks:
+                    window.append(executor.submit(generate_chunk, chunk))
+                    if len(window) >= 2 * args.workers:
+                        write(window.popleft().result())
+                while window:
+                    write(window.popleft().result())
+        except KeyboardInterrupt:
+            status = 130
+            for future in window:
+                future.cancel()
+        except (OSError, UnicodeDecodeError, BrokenProcessPool) as e:
+            print(f"\n❌ Generation stopped: {e}", file=sys.stderr)
+            status = 1
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+            if out is not sys.stdout.buffer:
+                out.close()
+            else:
+                out.flush()
+
+        if status == 130:
+            print(
+                f"\n⚠️  Interrupted; the output holds the first {stats.done} inputs "
+                f"in order (resume from index {stats.done})",
+                file=status_stream,
+            )
+        print(("\n" if live else "") + stats.summary(), file=status_stream)
+        if status:
+            return status
+        return 0 if stats.failed == 0 else 1
+
     def _create_parser(self) -> argparse.ArgumentParser:
         """Create and configure argument parser."""
         parser = argparse.ArgumentParser(
@@ -165,17 +738,30 @@ class StudyPlannerCLI:
 Examples:
   python cli.py -s "Mathematics, Physics" --hours 3 --days 6
   python cli.py -s "Python, JavaScript, React" --hours 2 --days 5 -o study_plan.json
+  python cli.py -s "Python, SQL" --format ics --weeks 12 -o study_plan.ics
+  python cli.py -s "Python, SQL" --format csv > sessions.csv
   python cli.py --subjects "Biology" --hours 4 --api-url http://localhost:8000
+  python cli.py --input cohort.jsonl --concurrency 16 -o plans.jsonl
+  python cli.py --input cohort.jsonl --local --workers 8 -o plans.jsonl
             """,
         )
 
-        parser.add_argument(
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument(
             "-s",
             "--subjects",
-            required=True,
-            help="Comma-separated list of subjects (required)",
+            help="Comma-separated list of subjects",
             metavar="SUBJECTS",
         )
+        source.add_argument(
+            "-i",
+            "--input",
+            help=(
+                "Bulk mode: JSONL or .csv file of plan requests (subjects, hours, "
+                "days_per_week, optional id); results go to -o as JSONL"
+            ),
+            metavar="FILE",
+        )
         parser.add_argument(
             "--hours",
             type=int,
@@ -193,15 +779,85 @@ Examples:
         parser.add_argument(
             "-o",
             "--output",
-            help="Save plan as JSON to file (optional)",
+            help="Save plan to file, as JSON or in the --format given (optional)",
             metavar="FILE",
         )
+        parser.add_argument(
+            "-f",
+            "--format",
+            choices=["json", "ics", "csv"],
+            default="json",
+            help=(
+                "json: print the plan (and save JSON with -o); ics/csv: export "
+                "calendar events or session rows to -o, or to stdout (default: json)"
+            ),
+        )
+        parser.add_argument(
+            "--start-date",
+            type=date.fromisoformat,
+            help="Monday of the first calendar week, YYYY-MM-DD (default: next Monday)",
+            metavar="DATE",
+        )
+        parser.add_argument(
+            "--weeks",
+            type=int,
+            default=1,
+            help="Weeks the calendar events repeat for (default: 1)",
+            metavar="WEEKS",
+        )
         parser.add_argument(
             "--api-url",
             default="http://localhost:8000",
             help="FastAPI backend URL (default: http://localhost:8000)",
             metavar="URL",
         )
+        bulk = parser.add_argument_group("bulk mode")
+        bulk.add_argument(
+            "-c",
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Requests in flight, over as many pooled connections (default: 8)",
+            metavar="N",
+        )
+        bulk.add_argument(
+            "--retries",
+            type=int,
+            default=3,
+            help="Retries per request on connection errors, timeouts, 429 and 5xx (default: 3)",
+            metavar="N",
+        )
+        bulk.add_argument(
+            "--timeout",
+            type=float,
+            default=30.0,
+            help="Per-request timeout in seconds (default: 30)",
+            metavar="SECONDS",
+        )
+        local = parser.add_argument_group("in-process mode")
+        local.add_argument(
+            "--local",
+            action="store_true",
+            help=(
+                "Generate the --input file in-process instead of calling the API; "
+                "results are written in input order"
+            ),
+        )
+        local.add_argument(
+            "-w",
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes, 1 for a plain loop (default: CPU count)",
+            metavar="N",
+        )
+        local.add_argument(
+            "--chunksize",
+            type=int,
+            default=64,
+            help="Plans per chunk sent to a worker (default: 64)",
+            metavar="N",
+        )
         parser.add_argument(
             "-v",
             "--version",
@@ -227,6 +883,46 @@ Examples:
         except IOError as e:
             print(f"⚠️  Warning: Could not save to {filepath}: {str(e)}")
 
+    @staticmethod
+    def _export(
+        plan_data: dict,
+        export_format: str,
+        filepath: Optional[str],
+        start_date: Optional[date] = None,
+        weeks: int = 1,
+    ) -> None:
+        """
+        Write the plan as iCalendar or CSV, streamed chunk by chunk.
+
+        Args:
+            plan_data: Study plan response
+            export_format: "ics" or "csv"
+            filepath: File to write, or None for stdout
+            start_date: Monday of the first calendar week (ics)
+            weeks: Weeks the calendar events repeat for (ics)
+        """
+        # Imported lazily: only exports need it (standard library only)
+        from services.exporters import csv_lines, encode_chunks, ics_lines, iter_plan_sessions
+
+        sessions = iter_plan_sessions(plan_data.get("plan", []))
+        if export_format == "ics":
+            lines = ics_lines(sessions, start_date=start_date, weeks=weeks)
+        else:
+            lines = csv_lines(sessions)
+
+        if not filepath:
+            for chunk in encode_chunks(lines):
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.flush()
+            return
+        try:
+            with open(filepath, "wb") as f:
+                for chunk in encode_chunks(lines):
+                    f.write(chunk)
+            print(f"💾 Plan exported to: {filepath}")
+        except IOError as e:
+            print(f"⚠️  Warning: Could not save to {filepath}: {str(e)}")
+
 
 def main():
     """Entry point for the CLI."""
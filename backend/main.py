@@ -5,21 +5,68 @@ FastAPI application providing endpoints for generating personalized
 study plans using Kestra workflow orchestration.
 """
 
+import asyncio
+import json
 import logging
-from typing import Dict, List
+import time
+from datetime import date
+from typing import (
+    Any, AsyncIterator, Awaitable, Dict, Iterator, List, Literal, Optional, Sequence, TypeVar
+)
 
-from fastapi import FastAPI, HTTPException, status
+from fastapi import APIRouter, FastAPI, Header, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field, validator
 import os
-from dotenv import load_dotenv
 
-from agents.planner_agent import DailyPlan
-from agents.resource_agent import SubjectResources
-from workflows.agent_workflow import run_workflow
+from services.env import load_env
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file (before importing modules
+# that read settings at import time)
+load_env()
+
+from agents.planner_agent import CalendarDailyPlan, DailyPlan, PlannerAgent, TimedDailyPlan
+from agents.resource_agent import SubjectResources
+from services.metrics import (
+    ERRORS,
+    REGISTRY,
+    format_server_timing,
+    start_server_timing,
+    timed,
+)
+from services.exporters import (
+    CSV_MEDIA_TYPE,
+    ICS_MEDIA_TYPE,
+    PLAN_CSV_COLUMNS,
+    STORED_CSV_COLUMNS,
+    csv_lines,
+    encode_chunks,
+    ics_lines,
+    iter_plan_sessions,
+)
+from services.llm_backend import close_backend, get_backend
+from services.llm_scheduler import close_scheduler
+from services.persistence import (
+    PlanStore,
+    close_plan_writer,
+    decode_cursor,
+    encode_cursor,
+    get_plan_writer,
+    parse_fields,
+)
+from services.resource_catalog import get_catalog
+from services.timetable import TimetableEngine
+from workflows.agent_workflow import AgentOrchestrator
+from workflows.batch_workflow import run_batch, shutdown_executor
+from workflows.plan_update import update_plan
+from workflows.workflow_cache import (
+    arun_workflow_memoized,
+    etag_matches,
+    make_etag,
+    workflow_cache_key,
+    workflow_memo,
+)
 
 # ---------------------------------------------------------------------
 # Logging configuration
@@ -80,6 +127,323 @@ class StudyPlanResponse(BaseModel):
         }
 
 
+def render_plan_response(result: Dict[str, Any]) -> bytes:
+    """Serialize a workflow result to StudyPlanResponse JSON bytes.
+
+    The agents only emit well-formed DailyPlan/SubjectResources models, so
+    the response is assembled with ``model_construct`` (no re-validation)
+    and written by pydantic-core's serializer in one pass. The bytes are
+    identical to what ``response_model=StudyPlanResponse`` would produce.
+
+    Args:
+        result: Workflow result with ``plan`` and ``resources``
+
+    Returns:
+        UTF-8 encoded JSON body
+    """
+    return StudyPlanResponse.model_construct(
+        plan=result["plan"],
+        resources=result["resources"],
+    ).model_dump_json().encode("utf-8")
+
+
+class SemesterPlanRequest(StudyPlanRequest):
+    """Request model for multi-week (semester) plan generation."""
+
+    weeks: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=52,
+        description="Horizon length in weeks, typically 12-20 (ignored if end_date is set)"
+    )
+    start_date: Optional[date] = Field(
+        default=None,
+        description="First day of the plan (default: today)"
+    )
+    end_date: Optional[date] = Field(
+        default=None,
+        description="Last day of the plan, inclusive"
+    )
+
+    class Config:
+        """Pydantic configuration."""
+        schema_extra = {
+            "example": {
+                "subjects": ["Python", "Data Structures", "Web Development"],
+                "hours": 3,
+                "days_per_week": 5,
+                "weeks": 16,
+                "start_date": "2026-01-12"
+            }
+        }
+
+
+class SemesterPlanResponse(BaseModel):
+    """Response model for semester plan generation."""
+
+    plan: List[CalendarDailyPlan]
+    resources: Dict[str, SubjectResources]
+
+
+class BatchPlanRequest(BaseModel):
+    """Request model for batch study plan generation."""
+
+    items: List[StudyPlanRequest] = Field(
+        ...,
+        min_items=1,
+        max_items=10000,
+        description="Study plan requests to generate (1-10000)"
+    )
+
+
+class BatchPlanItem(BaseModel):
+    """Outcome for a single item of a batch request."""
+
+    index: int
+    status: str = Field(..., description="'ok' or 'error'")
+    result: Optional[StudyPlanResponse] = None
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+
+
+class BatchPlanResponse(BaseModel):
+    """Response model for batch study plan generation."""
+
+    results: List[BatchPlanItem]
+    total_items: int
+    unique_items: int
+    failed_items: int
+    elapsed_seconds: float
+    items_per_second: float
+
+
+class DayWindow(BaseModel):
+    """Study window for one day."""
+
+    start: str = Field(..., description="Earliest start (HH:MM)")
+    end: str = Field(..., description="Latest end (HH:MM, 24:00 allowed)")
+
+
+class BlockedInterval(BaseModel):
+    """Recurring weekly time that must stay free (class, sleep, ...)."""
+
+    day: str = Field(..., description="Day name, e.g. Monday")
+    start: str = Field(..., description="Start (HH:MM)")
+    end: str = Field(..., description="End (HH:MM); an end before start runs past midnight")
+    label: Optional[str] = None
+
+
+class Availability(BaseModel):
+    """Weekly availability used to place sessions at concrete times."""
+
+    day_start: str = Field(default="07:00", description="Default earliest start (HH:MM)")
+    day_end: str = Field(default="22:00", description="Default latest end (HH:MM)")
+    days: Dict[str, Optional[DayWindow]] = Field(
+        default_factory=dict,
+        description="Per-day windows overriding the default; null marks a day unavailable"
+    )
+    blocked: List[BlockedInterval] = Field(default_factory=list, max_items=500)
+    break_minutes: int = Field(default=10, ge=0, le=120, description="Gap after each session")
+
+
+class TimetableRequest(StudyPlanRequest):
+    """Request model for a study plan with scheduled session times."""
+
+    availability: Availability = Field(default_factory=Availability)
+
+    class Config:
+        """Pydantic configuration."""
+        schema_extra = {
+            "example": {
+                "subjects": ["Python", "Data Structures"],
+                "hours": 3,
+                "days_per_week": 5,
+                "availability": {
+                    "day_start": "08:00",
+                    "day_end": "21:00",
+                    "days": {"Saturday": {"start": "10:00", "end": "14:00"}},
+                    "blocked": [{"day": "Monday", "start": "09:00", "end": "12:00", "label": "Lectures"}]
+                }
+            }
+        }
+
+
+class TimetableResponse(StudyPlanResponse):
+    """Study plan whose sessions carry a ``time_slot``."""
+
+    plan: List[TimedDailyPlan]
+    unplaced_sessions: int = Field(
+        ...,
+        description="Sessions that did not fit the availability (time_slot is null)"
+    )
+
+
+class PlanDelta(BaseModel):
+    """Edit applied to an existing plan by ``/plan/update``."""
+
+    add_subjects: List[str] = Field(default_factory=list, description="Subjects to add")
+    remove_subjects: List[str] = Field(default_factory=list, description="Subjects to drop")
+    rename_subjects: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Old subject name -> new name (the subject keeps its position)"
+    )
+    hours: Optional[float] = Field(
+        default=None,
+        gt=0,
+        le=12,
+        description="New daily study hours (unchanged if omitted)"
+    )
+    days_per_week: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=7,
+        description="New days per week (unchanged if omitted)"
+    )
+
+
+class PreviousPlan(BaseModel):
+    """A plan previously returned by the API, with its inputs."""
+
+    subjects: List[str] = Field(..., min_items=1, max_items=8)
+    hours: float = Field(..., gt=0, le=12)
+    days_per_week: int = Field(..., ge=1, le=7)
+    planner: Literal["cycle", "optimized"] = Field(
+        default="cycle",
+        description="Planner mode the plan was built with (?planner= of /plan)"
+    )
+    plan: List[DailyPlan]
+    resources: Dict[str, SubjectResources] = Field(default_factory=dict)
+    outlines: Optional[Dict[str, Dict[str, Any]]] = None
+
+
+class PlanUpdateRequest(BaseModel):
+    """Request model for incremental plan updates.
+
+    Exactly one of ``plan_id`` (a stored plan) or ``previous`` (a plan
+    sent back by the client) must be given.
+    """
+
+    plan_id: Optional[int] = Field(default=None, ge=1, description="Stored plan to update")
+    previous: Optional[PreviousPlan] = Field(default=None, description="Plan to update")
+    delta: PlanDelta
+    include_outlines: bool = Field(
+        default=False,
+        description="Generate AI outlines for subjects that have none"
+    )
+
+    @validator("previous", always=True)
+    def _one_source(cls, previous, values):
+        if (previous is None) == (values.get("plan_id") is None):
+            raise ValueError("Provide exactly one of plan_id or previous")
+        return previous
+
+    class Config:
+        """Pydantic configuration."""
+        schema_extra = {
+            "example": {
+                "plan_id": 42,
+                "delta": {"add_subjects": ["Statistics"], "hours": 4}
+            }
+        }
+
+
+class PlanUpdateResponse(BaseModel):
+    """Response model for incremental plan updates."""
+
+    subjects: List[str]
+    hours: float
+    days_per_week: int
+    planner: str = Field(..., description="Planner mode, kept from the previous plan")
+    plan: List[DailyPlan]
+    resources: Dict[str, SubjectResources]
+    outlines: Optional[Dict[str, Any]] = None
+    diff: Dict[str, Any] = Field(
+        ...,
+        description="Changed inputs, rebuilt days, and reused/generated resources and outlines"
+    )
+
+
+class SessionCompletionRequest(BaseModel):
+    """Request model for marking stored sessions complete."""
+
+    session_ids: List[int] = Field(
+        ...,
+        min_items=1,
+        max_items=1000,
+        description="Session ids from GET /plans/{plan_id}/sessions (1-1000)"
+    )
+    completed: bool = Field(
+        default=True,
+        description="Mark the sessions done (true) or not done (false)"
+    )
+
+
+class PlanProgress(BaseModel):
+    """Progress counters of a stored plan."""
+
+    plan_id: int
+    total_sessions: int
+    completed_sessions: int
+    total_hours: float
+    completed_hours: float
+    percent_complete: float = Field(..., description="Completed sessions, in percent")
+
+
+class SessionCompletionResponse(BaseModel):
+    """Response model for bulk session completion."""
+
+    updated: int = Field(..., description="Sessions whose state changed")
+    progress: PlanProgress
+
+
+class StoredSession(BaseModel):
+    """A study session as stored, with its completion state."""
+
+    session_id: int
+    day: str
+    subject: str
+    session_type: str
+    duration_hours: float
+    notes: str = ""
+    time_slot: Optional[str] = None
+    completed: bool
+    completed_at: Optional[str] = None
+
+
+class PlanSessionsResponse(BaseModel):
+    """Response model for a stored plan's sessions."""
+
+    plan_id: int
+    sessions: List[StoredSession]
+    progress: PlanProgress
+
+
+class PlanSummary(BaseModel):
+    """Summary of a stored plan, as listed by GET /plans."""
+
+    plan_id: int
+    subjects: List[str]
+    hours_per_week: float
+    days_per_week: int
+    created_at: Optional[str] = None
+    total_sessions: int
+    completed_sessions: int
+    fields: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Requested plan_data paths and their values (null if absent)"
+    )
+
+
+class PlanListResponse(BaseModel):
+    """Response model for the plan listing."""
+
+    plans: List[PlanSummary]
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Pass as ?cursor= for the next page; null on the last page"
+    )
+
+
 class HealthResponse(BaseModel):
     """Response model for health check endpoint."""
 
@@ -88,31 +452,14 @@ class HealthResponse(BaseModel):
 
 
 # ---------------------------------------------------------------------
-# FastAPI App
-# ---------------------------------------------------------------------
-app = FastAPI(
-    title="AI Study Planner Agent Backend",
-    description="FastAPI backend orchestrating Kestra workflows",
-    version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc",
-)
-
-# ---------------------------------------------------------------------
-# CORS (allow frontend access)
+# Routes (mounted on the app by create_app)
 # ---------------------------------------------------------------------
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # tighten in production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+router = APIRouter()
 
 # ---------------------------------------------------------------------
 # Health Endpoint
 # ---------------------------------------------------------------------
-@app.get(
+@router.get(
     "/health",
     response_model=HealthResponse,
     tags=["Health"],
@@ -122,10 +469,45 @@ def health() -> HealthResponse:
     logger.info("Health check requested")
     return HealthResponse(status="ok")
 
+# ---------------------------------------------------------------------
+# Client disconnect handling
+# ---------------------------------------------------------------------
+T = TypeVar("T")
+
+DISCONNECT_POLL_SECONDS = 0.1
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client went away before the work finished."""
+
+
+async def _cancel_on_disconnect(request: Request, work: Awaitable[T]) -> T:
+    """Await ``work``, cancelling it if the client disconnects first.
+
+    Work shared through a single flight only stops once every client
+    waiting on it has gone (see ``AsyncSingleFlight``).
+
+    Raises:
+        ClientDisconnected: If the client disconnected
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                logger.info("Client disconnected; request cancelled")
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
+
 # ---------------------------------------------------------------------
 # Study Plan Endpoint (Kestra-triggered)
 # ---------------------------------------------------------------------
-@app.post(
+@router.post(
     "/plan",
     response_model=StudyPlanResponse,
     status_code=status.HTTP_200_OK,
@@ -134,22 +516,44 @@ def health() -> HealthResponse:
     description="Creates a personalized weekly study plan with curated resources",
     responses={
         200: {"description": "Study plan generated successfully"},
+        304: {"description": "Plan unchanged since the ETag sent in If-None-Match"},
         422: {"description": "Invalid input parameters"},
          500: {"description": "Server error during plan generation"},
     }
 )
-def create_plan(request: StudyPlanRequest) -> StudyPlanResponse:
+async def create_plan(
+    request: StudyPlanRequest,
+    http_request: Request,
+    if_none_match: Optional[str] = Header(default=None),
+    planner: Literal["cycle", "optimized"] = Query(
+        default="cycle",
+        description=(
+            "cycle: rotate subjects in fixed blocks; optimized: local search "
+            "for balance, spacing and phase progression (fixed iteration budget)"
+        )
+    ),
+) -> Response:
     """Generate a personalized study plan.
 
     Orchestrates multiple agents to create:
     1. A personalized weekly study schedule
     2. Curated learning resources for each subject
 
+    Results are memoized on the canonical inputs and tagged with an
+    ``ETag``; a matching ``If-None-Match`` gets an empty 304 response.
+    The body is serialized straight from the agents' models (see
+    ``render_plan_response``) and memoized with the result. The workflow
+    runs on the event loop; a disconnected client stops waiting for it,
+    and it is cancelled once no client is waiting for it any more.
+
     Args:
         request: Study plan request with subjects and hours
+        http_request: Raw request, used to detect client disconnects
+        if_none_match: ETag(s) the client already holds
+        planner: Weekly allocation mode (see PlannerAgent.MODES)
 
     Returns:
-        StudyPlanResponse with complete plan and resources
+        JSON response matching the StudyPlanResponse schema
 
     Raises:
         HTTPException: If plan generation fails
@@ -160,15 +564,128 @@ def create_plan(request: StudyPlanRequest) -> StudyPlanResponse:
     )
 
     try:
-        # Execute workflow
-        result = run_workflow(
+        AgentOrchestrator._validate_inputs(
+            request.subjects, request.hours, request.days_per_week
+        )
+
+        # The ETag depends only on the inputs, so a revalidation needs no work
+        etag = make_etag(workflow_cache_key(
+            request.subjects, request.hours, request.days_per_week, planner
+        ))
+        if etag_matches(if_none_match, etag):
+            logger.info("Study plan not modified")
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag}
+            )
+
+        # Execute workflow (memoized on the canonical inputs)
+        cache_key, result = await _cancel_on_disconnect(
+            http_request,
+            arun_workflow_memoized(
+                subjects=request.subjects,
+                daily_hours=request.hours,
+                days_per_week=request.days_per_week,
+                planner_mode=planner
+            )
+        )
+
+        # Persist in the background; storage never delays the response
+        writer = get_plan_writer()
+        if writer is not None:
+            writer.submit(
+                [s.strip() for s in request.subjects],
+                request.hours,
+                request.days_per_week,
+                result,
+                planner_mode=planner
+            )
+
+        body = workflow_memo.get_body(cache_key)
+        if body is None:
+            with timed("serialize"):
+                body = render_plan_response(result)
+            workflow_memo.set_body(cache_key, body)
+
+        logger.info("Study plan generated successfully")
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={"ETag": etag}
+        )
+
+    except ClientDisconnected:
+        ERRORS.inc(1.0, "api", "ClientDisconnected")
+        # Nobody is listening; 499 mirrors nginx's "client closed request"
+        return Response(status_code=499)
+    except ValueError as e:
+        ERRORS.inc(1.0, "api", type(e).__name__)
+        logger.warning(f"Validation error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid input: {str(e)}"
+        )
+    except RuntimeError as e:
+        ERRORS.inc(1.0, "api", type(e).__name__)
+        logger.error(f"Workflow error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to generate study plan"
+        )
+    except Exception as e:
+        ERRORS.inc(1.0, "api", type(e).__name__)
+        logger.exception(f"Unexpected error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred"
+        )
+
+# ---------------------------------------------------------------------
+# Semester Study Plan Endpoint
+# ---------------------------------------------------------------------
+@router.post(
+    "/plan/semester",
+    response_model=SemesterPlanResponse,
+    status_code=status.HTTP_200_OK,
+    tags=["Study Planning"],
+    summary="Generate multi-week study plan",
+    description="Creates a dated study plan spanning several weeks with phased progression",
+    responses={
+        200: {"description": "Semester plan generated successfully"},
+        422: {"description": "Invalid input parameters"},
+        500: {"description": "Server error during plan generation"},
+    }
+)
+def create_semester_plan(request: SemesterPlanRequest) -> SemesterPlanResponse:
+    """Generate a multi-week study plan with calendar dates.
+
+    Args:
+        request: Semester plan request with subjects, hours and horizon
+
+    Returns:
+        SemesterPlanResponse with dated daily plans and resources
+
+    Raises:
+        HTTPException: If plan generation fails
+    """
+    logger.info(
+        f"Semester plan request received: subjects={request.subjects}, "
+        f"hours={request.hours}, days={request.days_per_week}, "
+        f"weeks={request.weeks}, start={request.start_date}, end={request.end_date}"
+    )
+
+    try:
+        result = AgentOrchestrator.run_semester_workflow(
             subjects=request.subjects,
             daily_hours=request.hours,
-            days_per_week=request.days_per_week
+            days_per_week=request.days_per_week,
+            weeks=request.weeks,
+            start_date=request.start_date,
+            end_date=request.end_date,
         )
 
-        logger.info("Study plan generated successfully")
-        return StudyPlanResponse(**result)
+        logger.info("Semester plan generated successfully")
+        return SemesterPlanResponse(**result)
 
     except ValueError as e:
         logger.warning(f"Validation error: {str(e)}")
@@ -190,13 +707,979 @@ def create_plan(request: StudyPlanRequest) -> StudyPlanResponse:
         )
 
 # ---------------------------------------------------------------------
-# Lifecycle Events
+# Batch Study Plan Endpoint
 # ---------------------------------------------------------------------
-@app.on_event("startup")
-async def startup_event():
-    logger.info("AI Study Planner Backend starting")
-    logger.info("Docs available at /docs")
+@router.post(
+    "/plan/batch",
+    response_model=BatchPlanResponse,
+    status_code=status.HTTP_200_OK,
+    tags=["Study Planning"],
+    summary="Generate many study plans at once",
+    description=(
+        "Generates study plans for a list of requests. Identical inputs are "
+        "computed once; results come back in input order with per-item errors"
+    ),
+    responses={
+        200: {"description": "Batch processed (see per-item status)"},
+        422: {"description": "Invalid input parameters"},
+        500: {"description": "Server error during batch generation"},
+    }
+)
+def create_plan_batch(request: BatchPlanRequest) -> BatchPlanResponse:
+    """Generate study plans for a batch of requests.
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("AI Study Planner Backend shutting down")
+    Args:
+        request: Batch of study plan requests
+
+    Returns:
+        BatchPlanResponse with per-item results and throughput statistics
+
+    Raises:
+        HTTPException: If the batch cannot be processed
+    """
+    logger.info(f"Batch study plan request received: {len(request.items)} items")
+
+    try:
+        batch = run_batch(
+            [(item.subjects, item.hours, item.days_per_week) for item in request.items]
+        )
+        logger.info(
+            f"Batch generated: {batch['total_items']} items, "
+            f"{batch['items_per_second']:.1f} items/s"
+        )
+        return BatchPlanResponse(**batch)
+
+    except Exception as e:
+        logger.exception(f"Unexpected batch error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to generate study plans"
+        )
+
+# ---------------------------------------------------------------------
+# Timetable Endpoint
+# ---------------------------------------------------------------------
+def _timetable_engine(availability: Availability) -> TimetableEngine:
+    """Compile request availability into a TimetableEngine.
+
+    Raises:
+        ValueError: If a time or day name is invalid
+    """
+    return TimetableEngine(
+        day_start=availability.day_start,
+        day_end=availability.day_end,
+        days={
+            day: None if window is None else (window.start, window.end)
+            for day, window in availability.days.items()
+        },
+        blocked=[(b.day, b.start, b.end) for b in availability.blocked],
+        break_minutes=availability.break_minutes,
+    )
+
+
+@router.post(
+    "/plan/timetable",
+    response_model=TimetableResponse,
+    status_code=status.HTTP_200_OK,
+    tags=["Study Planning"],
+    summary="Generate study plan with session times",
+    description=(
+        "Creates the weekly study plan and places every session at a concrete "
+        "start/end time within the given availability"
+    ),
+    responses={
+        200: {"description": "Timetable generated successfully"},
+        422: {"description": "Invalid input parameters or availability"},
+        500: {"description": "Server error during plan generation"},
+    }
+)
+async def create_timetable(
+    request: TimetableRequest,
+    planner: Literal["cycle", "optimized"] = Query(
+        default="cycle",
+        description=(
+            "cycle: rotate subjects in fixed blocks; optimized: local search "
+            "for balance, spacing and phase progression (fixed iteration budget)"
+        )
+    ),
+) -> Response:
+    """Generate a study plan and assign each session a time slot.
+
+    The plan itself comes from the memoized workflow, so only the
+    placement runs per request.
+
+    Args:
+        request: Study plan request with weekly availability
+        planner: Weekly allocation mode (see PlannerAgent.MODES)
+
+    Returns:
+        JSON response matching the TimetableResponse schema
+
+    Raises:
+        HTTPException: If the input is invalid or generation fails
+    """
+    logger.info(
+        f"Timetable request received: subjects={request.subjects}, "
+        f"hours={request.hours}, days={request.days_per_week}, "
+        f"blocked={len(request.availability.blocked)}"
+    )
+
+    try:
+        AgentOrchestrator._validate_inputs(
+            request.subjects, request.hours, request.days_per_week
+        )
+        engine = _timetable_engine(request.availability)
+
+        _, result = await arun_workflow_memoized(
+            subjects=request.subjects,
+            daily_hours=request.hours,
+            days_per_week=request.days_per_week,
+            planner_mode=planner
+        )
+        with timed("timetable"):
+            plan, unplaced = engine.place(result["plan"])
+
+        writer = get_plan_writer()
+        if writer is not None:
+            writer.submit(
+                [s.strip() for s in request.subjects],
+                request.hours,
+                request.days_per_week,
+                {**result, "plan": plan},
+                planner_mode=planner
+            )
+
+        with timed("serialize"):
+            body = TimetableResponse.model_construct(
+                plan=plan,
+                resources=result["resources"],
+                unplaced_sessions=unplaced,
+            ).model_dump_json()
+
+        logger.info(f"Timetable generated successfully ({unplaced} sessions unplaced)")
+        return Response(content=body, media_type="application/json")
+
+    except ValueError as e:
+        ERRORS.inc(1.0, "api", type(e).__name__)
+        logger.warning(f"Validation error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid input: {str(e)}"
+        )
+    except RuntimeError as e:
+        ERRORS.inc(1.0, "api", type(e).__name__)
+        logger.error(f"Workflow error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to generate study plan"
+        )
+    except Exception as e:
+        ERRORS.inc(1.0, "api", type(e).__name__)
+        logger.exception(f"Unexpected error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred"
+        )
+
+# ---------------------------------------------------------------------
+# Incremental Plan Update Endpoint
+# ---------------------------------------------------------------------
+def _plan_store(detail: str = "Plan storage is not configured") -> PlanStore:
+    """Return the configured plan store.
+
+    Raises:
+        HTTPException: 503 if persistence is off (no DATABASE_URL)
+    """
+    writer = get_plan_writer()
+    if writer is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail
+        )
+    return writer.store
+
+
+async def _load_previous_plan(request: PlanUpdateRequest) -> Dict[str, Any]:
+    """Resolve the plan to update into workflow-result form.
+
+    Raises:
+        HTTPException: 503 if a plan_id is given but persistence is off,
+            404 if the stored plan does not exist
+    """
+    if request.previous is not None:
+        previous = request.previous
+        return {
+            "subjects": previous.subjects,
+            "daily_hours": previous.hours,
+            "days_per_week": previous.days_per_week,
+            "planner_mode": previous.planner,
+            "plan": previous.plan,
+            "resources": previous.resources,
+            "outlines": previous.outlines,
+        }
+
+    store = _plan_store("Plan storage is not configured; send the previous plan instead")
+    record = await asyncio.to_thread(store.get_plan_record, request.plan_id)
+    if record is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Plan {request.plan_id} not found"
+        )
+    document = record["plan_data"]
+    return {
+        "subjects": record["subjects"],
+        "daily_hours": record["daily_hours"],
+        "days_per_week": record["days_per_week"],
+        "planner_mode": record["planner_mode"],
+        "plan": [DailyPlan.model_validate(day) for day in document["plan"]],
+        "resources": {
+            subject: SubjectResources.model_validate(res)
+            for subject, res in document.get("resources", {}).items()
+        },
+        "outlines": document.get("outlines"),
+    }
+
+
+@router.post(
+    "/plan/update",
+    response_model=PlanUpdateResponse,
+    status_code=status.HTTP_200_OK,
+    tags=["Study Planning"],
+    summary="Update an existing study plan",
+    description=(
+        "Applies a small edit (add/remove/rename subjects, change hours or days) "
+        "to a stored or client-supplied plan, rebuilding only the affected days "
+        "and returning a compact diff"
+    ),
+    responses={
+        200: {"description": "Plan updated successfully"},
+        404: {"description": "Stored plan not found"},
+        422: {"description": "Invalid delta or input parameters"},
+        500: {"description": "Server error during plan update"},
+        503: {"description": "plan_id given but plan storage is not configured"},
+    }
+)
+async def update_study_plan(request: PlanUpdateRequest) -> Response:
+    """Apply an edit to an existing study plan.
+
+    Resources and outlines of unchanged subjects are reused, and days
+    whose sessions are unchanged keep their previous ``DailyPlan``. The
+    new plan is built with the previous plan's planner mode. When
+    persistence is on, the new plan is stored in the background, as for
+    ``/plan``; it is listed by ``GET /plans``.
+
+    Args:
+        request: The plan to update (``plan_id`` or ``previous``) and the delta
+
+    Returns:
+        JSON response matching the PlanUpdateResponse schema
+
+    Raises:
+        HTTPException: If the plan cannot be found or updated
+    """
+    logger.info(
+        f"Plan update request received: plan_id={request.plan_id}, "
+        f"delta={request.delta.model_dump(exclude_defaults=True)}"
+    )
+
+    try:
+        previous = await _load_previous_plan(request)
+        delta = request.delta.model_dump(exclude={"days_per_week"})
+        delta["new_days_per_week"] = request.delta.days_per_week
+
+        result = await update_plan(
+            previous,
+            previous["subjects"],
+            previous["daily_hours"],
+            previous["days_per_week"],
+            delta,
+            include_outlines=request.include_outlines,
+            planner_mode=previous["planner_mode"],
+        )
+
+        # Persist in the background; storage never delays the response
+        writer = get_plan_writer()
+        if writer is not None:
+            writer.submit(
+                result["subjects"],
+                result["daily_hours"],
+                result["days_per_week"],
+                result,
+                planner_mode=result["planner_mode"]
+            )
+
+        with timed("serialize"):
+            body = PlanUpdateResponse.model_construct(
+                subjects=result["subjects"],
+                hours=result["daily_hours"],
+                days_per_week=result["days_per_week"],
+                planner=result["planner_mode"],
+                plan=result["plan"],
+                resources=result["resources"],
+                outlines=result["outlines"],
+                diff=result["diff"],
+            ).model_dump_json()
+
+        logger.info("Study plan updated successfully")
+        return Response(content=body, media_type="application/json")
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        ERRORS.inc(1.0, "api", type(e).__name__)
+        logger.warning(f"Validation error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid input: {str(e)}"
+        )
+    except RuntimeError as e:
+        ERRORS.inc(1.0, "api", type(e).__name__)
+        logger.error(f"Workflow error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update study plan"
+        )
+    except Exception as e:
+        ERRORS.inc(1.0, "api", type(e).__name__)
+        logger.exception(f"Unexpected error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred"
+        )
+
+# ---------------------------------------------------------------------
+# Plan Listing Endpoint
+# ---------------------------------------------------------------------
+@router.get(
+    "/plans",
+    response_model=PlanListResponse,
+    tags=["Plans"],
+    summary="List stored plans",
+    description=(
+        "Lists stored plans newest first with keyset pagination: follow "
+        "next_cursor, every page costs the same at any depth. Only summary "
+        "columns are returned unless fields= projects paths of plan_data"
+    ),
+    responses={
+        422: {"description": "Invalid cursor, fields or parameters"},
+        500: {"description": "Server error while listing plans"},
+        503: {"description": "Plan storage is not configured"},
+    }
+)
+async def list_plans(
+    limit: int = Query(default=50, ge=1, le=200, description="Plans per page (1-200)"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    subject: Optional[str] = Query(
+        default=None,
+        min_length=1,
+        max_length=255,
+        description="Only plans that include this subject (case-insensitive)"
+    ),
+    fields: Optional[str] = Query(
+        default=None,
+        description=(
+            "Comma-separated dotted paths into plan_data to include, "
+            "e.g. resources.Python,plan.0 (up to 10)"
+        )
+    ),
+) -> Response:
+    """List stored plans page by page.
+
+    The cursor encodes the ``(created_at, plan_id)`` of the last plan of
+    the previous page, and the next page is read from the index right
+    after it, so no rows are skipped over. A subject filter reads the
+    ``plan_subjects`` index instead.
+
+    Args:
+        limit: Page size
+        cursor: Position returned by the previous page
+        subject: Subject filter
+        fields: plan_data projection
+
+    Returns:
+        JSON response matching the PlanListResponse schema
+
+    Raises:
+        HTTPException: 422 on a bad cursor or projection, 503 without storage
+    """
+    store = _plan_store()
+    try:
+        after = decode_cursor(cursor) if cursor else None
+        paths = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid input: {str(e)}"
+        )
+
+    try:
+        rows = await asyncio.to_thread(store.list_plans, limit + 1, after, subject, paths)
+    except Exception as e:
+        ERRORS.inc(1.0, "api", type(e).__name__)
+        logger.exception(f"Unexpected error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to list plans"
+        )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["plan_id"])
+    body = PlanListResponse.model_construct(
+        plans=[PlanSummary.model_construct(**row) for row in rows],
+        next_cursor=next_cursor,
+    ).model_dump_json()
+    return Response(content=body, media_type="application/json")
+
+# ---------------------------------------------------------------------
+# Session Progress Endpoints
+# ---------------------------------------------------------------------
+async def _plan_progress(store: PlanStore, plan_id: int) -> PlanProgress:
+    """Read one plan's counters.
+
+    Raises:
+        HTTPException: 404 if the plan does not exist
+    """
+    progress = await asyncio.to_thread(store.get_progress, [plan_id])
+    if plan_id not in progress:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Plan {plan_id} not found"
+        )
+    return PlanProgress(**progress[plan_id])
+
+
+@router.get(
+    "/plans/progress",
+    response_model=List[PlanProgress],
+    tags=["Progress"],
+    summary="Progress of many stored plans",
+    description=(
+        "Returns session and hour counters for up to 500 plans; each plan is "
+        "one counter lookup, however many sessions it has. Unknown ids are skipped"
+    ),
+    responses={
+        503: {"description": "Plan storage is not configured"},
+    }
+)
+async def get_plans_progress(
+    plan_id: List[int] = Query(
+        ...,
+        max_length=500,
+        description="Plan ids (repeat the parameter, up to 500)"
+    ),
+) -> List[PlanProgress]:
+    """Read progress counters for a dashboard of plans.
+
+    Args:
+        plan_id: Plans to read
+
+    Returns:
+        Counters of the plans that exist, in request order
+    """
+    store = _plan_store()
+    progress = await asyncio.to_thread(store.get_progress, plan_id)
+    return [PlanProgress(**progress[pid]) for pid in dict.fromkeys(plan_id) if pid in progress]
+
+
+@router.get(
+    "/plans/{plan_id}/progress",
+    response_model=PlanProgress,
+    tags=["Progress"],
+    summary="Progress of a stored plan",
+    responses={
+        404: {"description": "Stored plan not found"},
+        503: {"description": "Plan storage is not configured"},
+    }
+)
+async def get_plan_progress(plan_id: int) -> PlanProgress:
+    """Read one plan's session and hour counters."""
+    return await _plan_progress(_plan_store(), plan_id)
+
+
+@router.get(
+    "/plans/{plan_id}/sessions",
+    response_model=PlanSessionsResponse,
+    tags=["Progress"],
+    summary="Sessions of a stored plan",
+    description="Lists the plan's sessions with their ids and completion state",
+    responses={
+        404: {"description": "Stored plan not found"},
+        503: {"description": "Plan storage is not configured"},
+    }
+)
+async def get_plan_sessions(plan_id: int) -> PlanSessionsResponse:
+    """List a stored plan's sessions, in plan order."""
+    store = _plan_store()
+    progress = await _plan_progress(store, plan_id)
+    sessions = await asyncio.to_thread(store.get_sessions, plan_id)
+    return PlanSessionsResponse(
+        plan_id=plan_id,
+        sessions=[StoredSession(**session) for session in sessions],
+        progress=progress,
+    )
+
+
+@router.post(
+    "/plans/{plan_id}/sessions/complete",
+    response_model=SessionCompletionResponse,
+    status_code=status.HTTP_200_OK,
+    tags=["Progress"],
+    summary="Mark sessions complete",
+    description=(
+        "Marks many sessions of a stored plan done (or not done) in one "
+        "statement; the plan's counters are updated in the same transaction"
+    ),
+    responses={
+        404: {"description": "Stored plan not found"},
+        422: {"description": "Invalid input parameters"},
+        500: {"description": "Server error while updating sessions"},
+        503: {"description": "Plan storage is not configured"},
+    }
+)
+async def complete_sessions(
+    plan_id: int, request: SessionCompletionRequest
+) -> SessionCompletionResponse:
+    """Mark sessions of a stored plan complete.
+
+    Ids that do not belong to the plan, and sessions already in the
+    requested state, are ignored (``updated`` counts real changes), so
+    retrying a request is safe.
+
+    Args:
+        plan_id: Stored plan
+        request: Session ids and the state to set
+
+    Returns:
+        Number of changed sessions and the plan's new counters
+
+    Raises:
+        HTTPException: If the plan is missing or the update fails
+    """
+    store = _plan_store()
+    try:
+        updated = await asyncio.to_thread(
+            store.set_sessions_completed, plan_id, request.session_ids, request.completed
+        )
+        progress = await _plan_progress(store, plan_id)
+        logger.info(
+            f"Plan {plan_id}: {updated} sessions marked "
+            f"{'complete' if request.completed else 'incomplete'}"
+        )
+        return SessionCompletionResponse(updated=updated, progress=progress)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        ERRORS.inc(1.0, "api", type(e).__name__)
+        logger.exception(f"Unexpected error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update sessions"
+        )
+
+# ---------------------------------------------------------------------
+# Export Endpoints
+# ---------------------------------------------------------------------
+ExportFormat = Literal["ics", "csv"]
+
+EXPORT_FORMAT_QUERY = Query(
+    default="ics",
+    alias="format",
+    description="ics: iCalendar events for calendar apps; csv: one row per session"
+)
+START_DATE_QUERY = Query(
+    default=None,
+    description="Monday of the first week in the calendar (default: next Monday)"
+)
+WEEKS_QUERY = Query(
+    default=1,
+    ge=1,
+    le=PlannerAgent.MAX_WEEKS,
+    description="Weeks the calendar events repeat for (ics only)"
+)
+
+
+def _export_response(
+    sessions: Iterator[Dict[str, Any]],
+    export_format: str,
+    filename: str,
+    columns: Sequence[str],
+    start_date: Optional[date],
+    weeks: int,
+) -> StreamingResponse:
+    """Stream ``sessions`` (an iterator of session dicts) as a download.
+
+    Starlette iterates the synchronous generator on its thread pool, so
+    store reads made while exporting stay off the event loop.
+    """
+    if export_format == "csv":
+        lines = csv_lines(sessions, columns)
+        media_type = CSV_MEDIA_TYPE
+    else:
+        lines = ics_lines(sessions, start_date=start_date, weeks=weeks)
+        media_type = ICS_MEDIA_TYPE
+    return StreamingResponse(
+        encode_chunks(lines),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
+
+
+@router.post(
+    "/plan/export",
+    status_code=status.HTTP_200_OK,
+    tags=["Export"],
+    summary="Export a new study plan",
+    description=(
+        "Generates a weekly plan and streams it as an iCalendar file or CSV, "
+        "day by day as the planner builds it"
+    ),
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Calendar or CSV download",
+            "content": {"text/calendar": {}, "text/csv": {}},
+        },
+        422: {"description": "Invalid input parameters"},
+    }
+)
+def export_plan(
+    request: StudyPlanRequest,
+    export_format: ExportFormat = EXPORT_FORMAT_QUERY,
+    start_date: Optional[date] = START_DATE_QUERY,
+    weeks: int = WEEKS_QUERY,
+    planner: Literal["cycle", "optimized"] = Query(
+        default="cycle",
+        description="Weekly allocation mode (see POST /plan)"
+    ),
+) -> StreamingResponse:
+    """Stream a generated plan as ``.ics`` or ``.csv``.
+
+    Args:
+        request: Study plan request with subjects and hours
+        export_format: ``ics`` or ``csv``
+        start_date: First week's Monday (ics)
+        weeks: Number of weeks events repeat for (ics)
+        planner: Weekly allocation mode (see PlannerAgent.MODES)
+
+    Returns:
+        StreamingResponse with the export
+
+    Raises:
+        HTTPException: If the input is invalid
+    """
+    try:
+        AgentOrchestrator._validate_inputs(
+            request.subjects, request.hours, request.days_per_week
+        )
+    except ValueError as e:
+        logger.warning(f"Validation error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid input: {str(e)}"
+        )
+
+    days = PlannerAgent.iter_study_plan(
+        request.subjects, request.hours, request.days_per_week, planner
+    )
+    return _export_response(
+        iter_plan_sessions(days), export_format, "study_plan",
+        PLAN_CSV_COLUMNS, start_date, weeks,
+    )
+
+
+@router.get(
+    "/plans/export",
+    tags=["Export"],
+    summary="Export all stored sessions",
+    description=(
+        "Streams every stored session of every plan as CSV (or iCalendar), "
+        "reading the table in fixed-size batches"
+    ),
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "CSV or calendar download",
+            "content": {"text/csv": {}, "text/calendar": {}},
+        },
+        503: {"description": "Plan storage is not configured"},
+    }
+)
+def export_all_sessions(
+    export_format: ExportFormat = Query(
+        default="csv",
+        alias="format",
+        description="csv: one row per session; ics: one event per session"
+    ),
+    start_date: Optional[date] = START_DATE_QUERY,
+    weeks: int = WEEKS_QUERY,
+) -> StreamingResponse:
+    """Stream the sessions of all stored plans, in session order."""
+    store = _plan_store()
+    return _export_response(
+        store.iter_sessions(), export_format, "study_sessions",
+        STORED_CSV_COLUMNS, start_date, weeks,
+    )
+
+
+@router.get(
+    "/plans/{plan_id}/export",
+    tags=["Export"],
+    summary="Export a stored plan",
+    description="Streams a stored plan's sessions as an iCalendar file or CSV",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Calendar or CSV download",
+            "content": {"text/calendar": {}, "text/csv": {}},
+        },
+        404: {"description": "Stored plan not found"},
+        503: {"description": "Plan storage is not configured"},
+    }
+)
+async def export_stored_plan(
+    plan_id: int,
+    export_format: ExportFormat = EXPORT_FORMAT_QUERY,
+    start_date: Optional[date] = START_DATE_QUERY,
+    weeks: int = WEEKS_QUERY,
+) -> StreamingResponse:
+    """Stream one stored plan's sessions, with their completion state."""
+    store = _plan_store()
+    await _plan_progress(store, plan_id)
+    return _export_response(
+        store.iter_sessions(plan_id), export_format, f"study_plan_{plan_id}",
+        STORED_CSV_COLUMNS, start_date, weeks,
+    )
+
+# ---------------------------------------------------------------------
+# Streaming Study Plan Endpoint
+# ---------------------------------------------------------------------
+def _encode_record(record: Dict[str, Any]) -> bytes:
+    """Encode a workflow record as one NDJSON line."""
+    data = record.get("data")
+    if isinstance(data, BaseModel):
+        record = {**record, "data": data.model_dump(mode="json")}
+    return (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+@router.post(
+    "/plan/stream",
+    status_code=status.HTTP_200_OK,
+    tags=["Study Planning"],
+    summary="Stream personalized study plan",
+    description=(
+        "Streams the study plan as NDJSON: one record per day, then one per "
+        "subject's resources, then a summary; requested outlines are "
+        "interleaved as soon as each is ready"
+    ),
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "NDJSON stream of plan records",
+            "content": {"application/x-ndjson": {}},
+        },
+        422: {"description": "Invalid input parameters"},
+    }
+)
+async def stream_plan(
+    request: StudyPlanRequest,
+    include_outlines: bool = Query(
+        default=False,
+        description="Also stream AI-generated subject outlines"
+    ),
+    outline_mode: Literal["per_subject", "batched"] = Query(
+        default="per_subject",
+        description=(
+            "per_subject: one LLM call per subject; batched: one call for all "
+            "subjects, retrying only the ones that fail validation"
+        )
+    ),
+    planner: Literal["cycle", "optimized"] = Query(
+        default="cycle",
+        description=(
+            "cycle: rotate subjects in fixed blocks; optimized: local search "
+            "for balance, spacing and phase progression (fixed iteration budget)"
+        )
+    ),
+) -> StreamingResponse:
+    """Stream a personalized study plan as newline-delimited JSON.
+
+    Each ``DailyPlan`` is flushed as soon as the planner yields it. Content
+    generation starts at the same time and runs alongside, so outlines
+    arrive as they finish without delaying the first byte.
+
+    Args:
+        request: Study plan request with subjects and hours
+        include_outlines: Whether to stream LLM outlines per subject
+        outline_mode: How outlines are requested; the summary record
+            reports the calls and tokens used
+        planner: Weekly allocation mode (see PlannerAgent.MODES)
+
+    Returns:
+        StreamingResponse with ``application/x-ndjson`` records
+
+    Raises:
+        HTTPException: If the input is invalid
+    """
+    logger.info(
+        f"Streamed study plan request received: subjects={request.subjects}, "
+        f"hours={request.hours}, days={request.days_per_week}"
+    )
+
+    try:
+        AgentOrchestrator._validate_inputs(
+            request.subjects, request.hours, request.days_per_week
+        )
+    except ValueError as e:
+        logger.warning(f"Validation error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid input: {str(e)}"
+        )
+
+    async def _body() -> AsyncIterator[bytes]:
+        async for record in AgentOrchestrator.stream_workflow(
+            subjects=request.subjects,
+            daily_hours=request.hours,
+            days_per_week=request.days_per_week,
+            include_outlines=include_outlines,
+            outline_mode=outline_mode,
+            planner_mode=planner,
+        ):
+            yield _encode_record(record)
+
+    return StreamingResponse(
+        _body(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# ---------------------------------------------------------------------
+# Metrics Endpoint
+# ---------------------------------------------------------------------
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    tags=["Health"],
+    summary="Prometheus metrics"
+)
+def metrics() -> PlainTextResponse:
+    """Expose stage, LLM and error metrics in Prometheus text format."""
+    return PlainTextResponse(
+        REGISTRY.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+# ---------------------------------------------------------------------
+# Server-Timing (opt-in: SERVER_TIMING_ENABLED=1)
+# ---------------------------------------------------------------------
+async def server_timing_middleware(request, call_next):
+    entries = start_server_timing()
+    started = time.perf_counter()
+    response = await call_next(request)
+    entries.append(("total", time.perf_counter() - started))
+    response.headers["Server-Timing"] = format_server_timing(entries)
+    return response
+
+# ---------------------------------------------------------------------
+# Warm-up (opt-in: APP_WARMUP=1 or create_app(warmup=True))
+# ---------------------------------------------------------------------
+def warm_up() -> None:
+    """Pay the one-time costs of a first request before serving.
+
+    Imports the LLM stack and builds the configured backend, loads the
+    resource catalog, and runs one small plan through the workflow and
+    the response serializer (without memoizing it). Failures are logged,
+    not raised: a cold process still serves correctly.
+    """
+    started = time.perf_counter()
+    try:
+        # Imported lazily elsewhere: the LLM stack is only needed for outlines
+        import groq  # noqa: F401
+        from agents.content_agent import ContentAgent  # noqa: F401
+
+        get_backend()
+    except (RuntimeError, ValueError) as e:
+        logger.warning(f"Warm-up: LLM backend not ready: {str(e)}")
+    get_catalog()
+    try:
+        result = AgentOrchestrator.run_workflow(["Python", "Data Structures"], 2, 5)
+        render_plan_response(result)
+    except Exception as e:
+        logger.warning(f"Warm-up: sample plan failed: {type(e).__name__}: {str(e)}")
+    logger.info(f"Warm-up finished in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+# ---------------------------------------------------------------------
+# Lifecycle Events
+# ---------------------------------------------------------------------
+async def startup_event():
+    logger.info("AI Study Planner Backend starting")
+    logger.info("Docs available at /docs")
+    if get_plan_writer() is not None:
+        logger.info("Plan persistence enabled")
+
+async def warm_up_event():
+    await asyncio.to_thread(warm_up)
+
+async def shutdown_event():
+    logger.info("AI Study Planner Backend shutting down")
+    shutdown_executor()
+    close_plan_writer()
+    close_backend()
+    close_scheduler()
+
+
+# ---------------------------------------------------------------------
+# App Factory
+# ---------------------------------------------------------------------
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "0").lower() in ("1", "true", "yes")
+
+
+def create_app(warmup: Optional[bool] = None) -> FastAPI:
+    """Build the FastAPI application.
+
+    ``uvicorn main:app`` serves the module-level instance below;
+    ``uvicorn main:create_app --factory`` builds a fresh one.
+
+    Args:
+        warmup: Run ``warm_up`` during startup, so the process only
+            reports ready once the first request will be fast
+            (default: the APP_WARMUP environment variable)
+
+    Returns:
+        Configured application
+    """
+    app = FastAPI(
+        title="AI Study Planner Agent Backend",
+        description="FastAPI backend orchestrating Kestra workflows",
+        version="1.0.0",
+        docs_url="/docs",
+        redoc_url="/redoc",
+    )
+
+    # CORS (allow frontend access)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # tighten in production
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    if _env_flag("SERVER_TIMING_ENABLED"):
+        app.middleware("http")(server_timing_middleware)
+
+    app.include_router(router)
+
+    if warmup is None:
+        warmup = _env_flag("APP_WARMUP")
+    app.add_event_handler("startup", startup_event)
+    if warmup:
+        app.add_event_handler("startup", warm_up_event)
+    app.add_event_handler("shutdown", shutdown_event)
+    return app
+
+
+app = create_app()
@@ -1,9 +1,55 @@
-from typing import Any
-import os
-from dotenv import load_dotenv
-from groq import Groq
+from typing import Any, Callable, Dict, Optional
+import threading
+import time
 
-load_dotenv()
+from services.llm_backend import LLMBackend, LLMRequest, LLMResponse, get_backend
+from services.llm_cache import ResponseCache, get_default_cache
+from services.llm_scheduler import Priority
+from services.metrics import ERRORS, LLM_LATENCY, LLM_TOKENS
+from services.single_flight import AsyncSingleFlight, SingleFlight
+
+# Process-wide, so identical prompts coalesce across AIClient instances
+_llm_flight = SingleFlight("llm")
+_llm_async_flight = AsyncSingleFlight("llm_async")
+
+
+class TokenUsage:
+    """Accumulates upstream calls and token counts across AIClient calls.
+
+    Pass one as ``usage=`` to ``generate_text``/``agenerate_text`` to see
+    what a unit of work cost. Cache hits are counted but use no tokens.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.cache_hits = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def add(self, response: LLMResponse) -> None:
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += response.prompt_tokens
+            self.completion_tokens += response.completion_tokens
+
+    def add_cache_hit(self) -> None:
+        with self._lock:
+            self.cache_hits += 1
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "cache_hits": self.cache_hits,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.prompt_tokens + self.completion_tokens,
+            }
 
 
 class AIClient:
@@ -11,30 +57,53 @@ class AIClient:
     
     Uses llama3-8b-8192 model for structured output generation.
     Designed for deterministic planning tasks (temperature=0.3).
+    Responses are cached by (model, system prompt, prompt, temperature,
+    max_tokens) in a two-tier LRU + SQLite cache, and concurrent identical
+    prompts that miss the cache share a single upstream call. A caller
+    that passes ``validate`` only ever gets responses cached that passed
+    it, so one malformed reply is not served again for the whole TTL. Upstream
+    calls go through an ``LLMBackend``: the real API via the shared
+    scheduler, or a recorder/replayer for offline load tests.
     """
+
+    SYSTEM_PROMPT = "You respond with STRICT valid JSON only when asked. No markdown, no commentary."
+    TEMPERATURE = 0.3
+    MAX_TOKENS = 2048
     
-    def __init__(self) -> None:
-        """Initialize Groq client with API key from environment.
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        backend: Optional[LLMBackend] = None,
+    ) -> None:
+        """Initialize the client on the configured LLM backend.
+
+        Args:
+            cache: Response cache to use (default: process-wide cache)
+            backend: Backend for upstream calls (default: ``LLM_BACKEND``)
         
         Raises:
-            RuntimeError: If GROQ_API_KEY not found in .env
+            RuntimeError: If the Groq backend is used and GROQ_API_KEY
+                is not found in .env
         """
-        api_key = os.getenv("GROQ_API_KEY")
-
-        if not api_key:
-            raise RuntimeError(
-                "GROQ_API_KEY not found. Check your backend/.env file."
-            )
-
-        self.client = Groq(api_key=api_key)
+        self.backend = backend if backend is not None else get_backend()
         self.model = "llama3-8b-8192"  # Reliable for structured output
+        self.cache = cache if cache is not None else get_default_cache()
 
     def generate_text(self, prompt: str, **kwargs: Any) -> str:
         """Send prompt to Groq and return model response.
         
         Args:
             prompt: The input prompt for the model
-            **kwargs: Additional parameters (reserved for future use)
+            **kwargs: Additional parameters; ``bypass_cache=True`` forces
+                a fresh upstream call (the result is still stored) and
+                ``priority`` picks the scheduler lane (default: the
+                ``llm_priority`` context, interactive), ``max_tokens``
+                overrides the completion budget and ``usage`` (a
+                ``TokenUsage``) accumulates the tokens spent.
+                ``validate`` (a callable returning whether a response is
+                usable) gates caching: a fresh response that fails it is
+                returned but not stored, and a cached one that fails it is
+                evicted and fetched again
             
         Returns:
             Model response as string (stripped of whitespace)
@@ -42,23 +111,149 @@ class AIClient:
         Raises:
             groq.APIError: If API call fails
         """
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You respond with STRICT valid JSON only when asked. No markdown, no commentary."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                },
-            ],
-            temperature=0.3,
-            max_tokens=2048,
+        request = self._build_request(prompt, kwargs.get("max_tokens"))
+        key = request.key
+        usage: Optional[TokenUsage] = kwargs.get("usage")
+        validate: Optional[Callable[[str], bool]] = kwargs.get("validate")
+        cached = self._cache_lookup(key, kwargs)
+        if cached is not None:
+            if usage is not None:
+                usage.add_cache_hit()
+            return cached
+
+        priority = kwargs.get("priority")
+        return _llm_flight.do(key, lambda: self._complete(request, priority, usage, validate))
+
+    def _complete(
+        self,
+        request: LLMRequest,
+        priority: Optional[Priority],
+        usage: Optional[TokenUsage],
+        validate: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        """Make the upstream call and cache the response if it is valid."""
+        started = time.perf_counter()
+        try:
+            response = self.backend.complete(request, priority)
+        except Exception as e:
+            ERRORS.inc(1.0, "llm", type(e).__name__)
+            raise
+        self._record_usage(response, time.perf_counter() - started)
+        if usage is not None:
+            usage.add(response)
+
+        self._store(request.key, response.text, validate)
+        return response.text
+
+    async def agenerate_text(self, prompt: str, **kwargs: Any) -> str:
+        """Async counterpart of ``generate_text``.
+
+        Awaits ``LLMBackend.acomplete`` (for Groq, the shared scheduler's
+        async path), so many prompts can be in flight at once from a
+        single event loop.
+
+        Args:
+            prompt: The input prompt for the model
+            **kwargs: Same as ``generate_text``
+
+        Returns:
+            Model response as string (stripped of whitespace)
+
+        Raises:
+            groq.APIError: If API call fails
+        """
+        request = self._build_request(prompt, kwargs.get("max_tokens"))
+        key = request.key
+        usage: Optional[TokenUsage] = kwargs.get("usage")
+        validate: Optional[Callable[[str], bool]] = kwargs.get("validate")
+        cached = await self._acache_lookup(key, kwargs)
+        if cached is not None:
+            if usage is not None:
+                usage.add_cache_hit()
+            return cached
+
+        priority = kwargs.get("priority")
+        return await _llm_async_flight.do(
+            key, lambda: self._acomplete(request, priority, usage, validate)
         )
 
-        return response.choices[0].message.content.strip()
+    async def _acomplete(
+        self,
+        request: LLMRequest,
+        priority: Optional[Priority],
+        usage: Optional[TokenUsage],
+        validate: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        """Async counterpart of ``_complete``."""
+        started = time.perf_counter()
+        try:
+            response = await self.backend.acomplete(request, priority)
+        except Exception as e:
+            ERRORS.inc(1.0, "llm", type(e).__name__)
+            raise
+        self._record_usage(response, time.perf_counter() - started)
+        if usage is not None:
+            usage.add(response)
+
+        await self._astore(request.key, response.text, validate)
+        return response.text
+
+    def _record_usage(self, response: LLMResponse, elapsed: float) -> None:
+        """Record latency and token usage of an upstream call."""
+        LLM_LATENCY.observe(elapsed, self.model)
+        LLM_TOKENS.observe(response.prompt_tokens, self.model, "prompt")
+        LLM_TOKENS.observe(response.completion_tokens, self.model, "completion")
+
+    def _build_request(self, prompt: str, max_tokens: Optional[int] = None) -> LLMRequest:
+        """Build the backend request (its key is also the cache key)."""
+        return LLMRequest(
+            self.model, self.SYSTEM_PROMPT, prompt, self.TEMPERATURE, max_tokens or self.MAX_TOKENS
+        )
+
+    def _cache_lookup(self, key: str, options: Dict[str, Any]) -> Optional[str]:
+        """Return a cached response unless the caller asked to bypass it.
+
+        A cached response that fails the caller's ``validate`` (stored
+        before validation existed, or under a stricter check) is evicted
+        and reported as a miss.
+        """
+        if options.get("bypass_cache"):
+            self.cache.record_bypass()
+            return None
+        cached = self.cache.get(key)
+        validate = options.get("validate")
+        if cached is not None and validate is not None and not validate(cached):
+            self.cache.delete(key)
+            return None
+        return cached
+
+    async def _acache_lookup(self, key: str, options: Dict[str, Any]) -> Optional[str]:
+        """Async counterpart of ``_cache_lookup`` (disk I/O off the loop)."""
+        if options.get("bypass_cache"):
+            self.cache.record_bypass()
+            return None
+        cached = await self.cache.aget(key)
+        validate = options.get("validate")
+        if cached is not None and validate is not None and not validate(cached):
+            await self.cache.adelete(key)
+            return None
+        return cached
+
+    def _store(self, key: str, text: str, validate: Optional[Callable[[str], bool]]) -> None:
+        """Cache ``text`` unless it fails ``validate``."""
+        if validate is not None and not validate(text):
+            self.cache.record_rejected()
+            return
+        self.cache.set(key, text)
+
+    async def _astore(
+        self, key: str, text: str, validate: Optional[Callable[[str], bool]]
+    ) -> None:
+        """Async counterpart of ``_store`` (disk I/O off the loop)."""
+        if validate is not None and not validate(text):
+            self.cache.record_rejected()
+            return
+        await self.cache.aset(key, text)
 
     def summarize(self, text: str) -> str:
         """Summarize text using Groq LLM.
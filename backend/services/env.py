@@ -0,0 +1,26 @@
+"""Environment loading.
+
+``.env`` is read once per process, on first use, rather than at import
+time by every module that reads a setting: importing the backend (or the
+CLI) stays cheap, and code paths that never reach the LLM never touch
+python-dotenv.
+"""
+
+import threading
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_env() -> None:
+    """Load ``.env`` into ``os.environ`` (once; existing variables win)."""
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            # Imported lazily: only the first caller pays for it
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            _loaded = True
@@ -0,0 +1,270 @@
+"""Streaming plan exports (iCalendar and CSV).
+
+Exporters are generators over session dictionaries: ``iter_plan_sessions``
+flattens ``DailyPlan`` models (or their JSON dicts) and
+``PlanStore.iter_sessions`` reads stored ``study_sessions`` rows in keyset
+batches. Each session is turned into its lines and forgotten, and
+``encode_chunks`` batches the lines into byte chunks for a streaming
+response or a file, so memory stays flat however many plans are exported.
+
+Only the standard library is used, so the CLI can import this module
+without pulling in the web or LLM stacks.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+# Weekday index of the day names the planner emits (PlannerAgent.DAYS)
+WEEKDAYS = {
+    name: index
+    for index, name in enumerate(
+        ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+    )
+}
+
+# Sessions without a time_slot are laid out back to back from this time
+DEFAULT_DAY_START = 9 * 60
+
+PLAN_CSV_COLUMNS = (
+    "day", "date", "subject", "session_type", "duration_hours", "time_slot", "notes",
+)
+STORED_CSV_COLUMNS = (
+    "plan_id", "session_id", "day", "subject", "session_type", "duration_hours",
+    "time_slot", "notes", "completed", "completed_at",
+)
+
+# Starlette appends "; charset=utf-8" to text/* media types
+ICS_MEDIA_TYPE = "text/calendar"
+CSV_MEDIA_TYPE = "text/csv"
+
+PRODID = "-//AI Study Planner//Study Plan Export//EN"
+# Content lines are folded at 75 octets (RFC 5545 section 3.1)
+ICS_LINE_OCTETS = 75
+# Spreadsheet apps evaluate cells starting with these as formulas
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+CHUNK_BYTES = 64 * 1024
+
+
+def week_start(today: Optional[date] = None) -> date:
+    """Return the next Monday (``today`` itself if it is a Monday)."""
+    today = today or date.today()
+    return today + timedelta(days=-today.weekday() % 7)
+
+
+def iter_plan_sessions(plan: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+    """Flatten DailyPlan models (or their dicts) into session dictionaries.
+
+    ``plan`` may be a generator such as ``PlannerAgent.iter_study_plan``;
+    one day is held at a time. Days of a semester plan carry their
+    ``date``, which the exporters use instead of a weekday offset.
+    """
+    for day in plan:
+        day_data = day if isinstance(day, dict) else day.model_dump(mode="json")
+        for session in day_data["sessions"]:
+            yield {
+                "day": day_data["day"],
+                "date": day_data.get("date"),
+                "subject": session["subject"],
+                "session_type": session["session_type"],
+                "duration_hours": float(session["duration_hours"]),
+                "notes": session.get("notes", ""),
+                "time_slot": session.get("time_slot"),
+            }
+
+
+# ---------------------------------------------------------------------
+# CSV
+# ---------------------------------------------------------------------
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_lines(
+    sessions: Iterable[Dict[str, Any]], columns: Sequence[str] = PLAN_CSV_COLUMNS
+) -> Iterator[str]:
+    """Yield a header line, then one CSV line per session.
+
+    Text cells that a spreadsheet would run as a formula are prefixed
+    with ``'``. Missing values are written as empty cells.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\r\n")
+
+    def line(values: Iterable[Any]) -> str:
+        writer.writerow(values)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    yield line(columns)
+    for session in sessions:
+        yield line(_csv_cell(session.get(column)) for column in columns)
+
+
+# ---------------------------------------------------------------------
+# iCalendar
+# ---------------------------------------------------------------------
+def _ics_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _ics_line(name: str, value: str) -> str:
+    """Format one content line, folded to 75 octets, with CRLF."""
+    line = f"{name}:{value}"
+    encoded = line.encode("utf-8")
+    if len(encoded) <= ICS_LINE_OCTETS:
+        return line + "\r\n"
+
+    parts = []
+    start = 0
+    limit = ICS_LINE_OCTETS
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split a multi-byte character
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode("utf-8"))
+        start = end
+        limit = ICS_LINE_OCTETS - 1  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _ics_time(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def _slot_minutes(time_slot: str) -> Tuple[int, int]:
+    """Parse ``"HH:MM-HH:MM"`` into (start, end) minutes; end may pass midnight."""
+    start_text, sep, end_text = time_slot.partition("-")
+    if not sep:
+        raise ValueError(f"Invalid time slot (expected HH:MM-HH:MM): {time_slot!r}")
+    start, end = (
+        int(hours) * 60 + int(minutes)
+        for hours, minutes in (t.strip().split(":") for t in (start_text, end_text))
+    )
+    return start, end if end > start else end + 24 * 60
+
+
+def ics_lines(
+    sessions: Iterable[Dict[str, Any]],
+    start_date: Optional[date] = None,
+    weeks: int = 1,
+    calendar_name: str = "Study Plan",
+    uid_domain: str = "ai-study-planner",
+) -> Iterator[str]:
+    """Yield an iCalendar document, one VEVENT (as one string) per session.
+
+    A session is placed on its own ``date`` when it has one, otherwise on
+    its weekday in the week starting ``start_date`` (the next Monday by
+    default). Its ``time_slot`` gives the times; sessions without one are
+    laid out back to back from 09:00. Times are floating (local to the
+    calendar app). With ``weeks`` > 1 each undated event repeats weekly.
+
+    Args:
+        sessions: Session dictionaries, grouped by day as plans are
+        start_date: Monday of the first week
+        weeks: Number of weeks undated sessions repeat for
+        calendar_name: X-WR-CALNAME of the calendar
+        uid_domain: Right-hand side of each event UID
+
+    Raises:
+        ValueError: On an unknown day name or malformed time slot
+    """
+    start_date = start_date or week_start()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    yield "BEGIN:VCALENDAR\r\n"
+    yield "VERSION:2.0\r\n"
+    yield _ics_line("PRODID", PRODID)
+    yield "CALSCALE:GREGORIAN\r\n"
+    yield _ics_line("X-WR-CALNAME", _ics_text(calendar_name))
+
+    # Back-to-back layout state; sessions of a day arrive together
+    current_day = None
+    next_free = DEFAULT_DAY_START
+
+    for index, session in enumerate(sessions):
+        dated = session.get("date")
+        if dated:
+            day = date.fromisoformat(dated) if isinstance(dated, str) else dated
+        else:
+            name = str(session["day"]).strip().lower()
+            if name not in WEEKDAYS:
+                raise ValueError(f"Unknown day name: {session['day']!r}")
+            day = start_date + timedelta(days=WEEKDAYS[name])
+
+        day_key = (session.get("plan_id"), day)
+        if day_key != current_day:
+            current_day = day_key
+            next_free = DEFAULT_DAY_START
+
+        if session.get("time_slot"):
+            start, end = _slot_minutes(session["time_slot"])
+        else:
+            start = next_free
+            end = start + round(float(session["duration_hours"]) * 60)
+            next_free = end
+
+        midnight = datetime(day.year, day.month, day.day)
+        session_type = str(session["session_type"])
+        uid = (
+            f"{session['plan_id']}-{session['session_id']}@{uid_domain}"
+            if session.get("session_id") is not None
+            else f"{day.isoformat()}-{index}@{uid_domain}"
+        )
+
+        # One string per event keeps the per-yield overhead off every line
+        event = [
+            "BEGIN:VEVENT\r\n",
+            _ics_line("UID", uid),
+            f"DTSTAMP:{stamp}\r\n",
+            f"DTSTART:{_ics_time(midnight + timedelta(minutes=start))}\r\n",
+            f"DTEND:{_ics_time(midnight + timedelta(minutes=end))}\r\n",
+        ]
+        if weeks > 1 and not dated:
+            event.append(f"RRULE:FREQ=WEEKLY;COUNT={weeks}\r\n")
+        event.append(_ics_line(
+            "SUMMARY", _ics_text(f"{session['subject']} ({session_type.capitalize()})")
+        ))
+        if session.get("notes"):
+            event.append(_ics_line("DESCRIPTION", _ics_text(session["notes"])))
+        event.append(_ics_line("CATEGORIES", _ics_text(session_type.upper())))
+        event.append("END:VEVENT\r\n")
+        yield "".join(event)
+
+    yield "END:VCALENDAR\r\n"
+
+
+def encode_chunks(lines: Iterable[str], chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """Batch text pieces into UTF-8 chunks of about ``chunk_bytes``.
+
+    Keeps a streaming response (or file write) from paying per-line
+    overhead while holding at most one chunk in memory.
+    """
+    pending = []
+    size = 0
+    for line in lines:
+        pending.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield "".join(pending).encode("utf-8")
+            pending.clear()
+            size = 0
+    if pending:
+        yield "".join(pending).encode("utf-8")
@@ -0,0 +1,401 @@
+"""Pluggable backends for upstream LLM calls.
+
+``AIClient`` and ``GroqClient`` send every upstream request through an
+``LLMBackend``:
+
+* ``GroqBackend`` calls the real API through the shared ``LLMScheduler``;
+* ``RecordingBackend`` wraps another backend and appends each
+  prompt/response pair to a JSONL file (gzip-compressed for ``.gz``);
+* ``ReplayBackend`` serves a recording with synthetic latency, so
+  orchestration overhead and concurrency can be load tested offline,
+  deterministically and for free.
+
+The process-wide backend is selected with ``LLM_BACKEND`` (see
+``get_backend``). When replaying, disable the response cache
+(``LLM_CACHE_ENABLED=0``) so every call reaches the backend.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from typing import IO, Any, Dict, List, Optional
+
+from services.env import load_env
+from services.llm_cache import make_cache_key
+from services.llm_scheduler import LLMScheduler, Priority, estimate_tokens, get_scheduler
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Completion budget assumed for requests that do not set max_tokens
+DEFAULT_COMPLETION_TOKENS = 1024
+
+
+class LLMRequest:
+    """Everything that determines a chat completion."""
+
+    __slots__ = ("model", "system_prompt", "prompt", "temperature", "max_tokens")
+
+    def __init__(
+        self,
+        model: str,
+        system_prompt: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: Optional[int] = None,
+    ) -> None:
+        self.model = model
+        self.system_prompt = system_prompt
+        self.prompt = prompt
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+    @property
+    def key(self) -> str:
+        """Stable key shared with the response cache."""
+        return make_cache_key(
+            self.model, self.system_prompt, self.prompt, self.temperature, self.max_tokens or 0
+        )
+
+    def messages(self) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": self.prompt},
+        ]
+
+
+class LLMResponse:
+    """Completion text plus the token usage reported for it."""
+
+    __slots__ = ("text", "prompt_tokens", "completion_tokens")
+
+    def __init__(self, text: str, prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+
+class LLMBackend:
+    """Interface shared by the Groq, recording and replay backends."""
+
+    name = "base"
+
+    def complete(self, request: LLMRequest, priority: Optional[Priority] = None) -> LLMResponse:
+        """Return the completion for ``request``."""
+        raise NotImplementedError
+
+    async def acomplete(self, request: LLMRequest, priority: Optional[Priority] = None) -> LLMResponse:
+        """Async counterpart of ``complete``."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release files or connections."""
+
+
+class GroqBackend(LLMBackend):
+    """Real Groq API, called through the shared scheduler."""
+
+    name = "groq"
+
+    def __init__(self, scheduler: Optional[LLMScheduler] = None) -> None:
+        """
+        Raises:
+            RuntimeError: If GROQ_API_KEY is not set
+        """
+        if not os.getenv("GROQ_API_KEY") and (scheduler is None or not scheduler.api_key):
+            raise RuntimeError(
+                "GROQ_API_KEY not found. Check your backend/.env file."
+            )
+        self.scheduler = scheduler if scheduler is not None else get_scheduler()
+
+    def complete(self, request: LLMRequest, priority: Optional[Priority] = None) -> LLMResponse:
+        response = self.scheduler.call(
+            lambda client: client.chat.completions.create(**self._params(request)),
+            estimated_tokens=self._estimate(request),
+            priority=priority,
+        )
+        return self._to_response(response)
+
+    async def acomplete(self, request: LLMRequest, priority: Optional[Priority] = None) -> LLMResponse:
+        response = await self.scheduler.acall(
+            lambda client: client.chat.completions.create(**self._params(request)),
+            estimated_tokens=self._estimate(request),
+            priority=priority,
+        )
+        return self._to_response(response)
+
+    @staticmethod
+    def _params(request: LLMRequest) -> Dict[str, Any]:
+        params: Dict[str, Any] = {
+            "model": request.model,
+            "messages": request.messages(),
+            "temperature": request.temperature,
+        }
+        if request.max_tokens is not None:
+            params["max_tokens"] = request.max_tokens
+        return params
+
+    @staticmethod
+    def _estimate(request: LLMRequest) -> int:
+        return estimate_tokens(
+            request.system_prompt + request.prompt,
+            request.max_tokens or DEFAULT_COMPLETION_TOKENS,
+        )
+
+    @staticmethod
+    def _to_response(response: Any) -> LLMResponse:
+        usage = getattr(response, "usage", None)
+        return LLMResponse(
+            text=response.choices[0].message.content.strip(),
+            prompt_tokens=getattr(usage, "prompt_tokens", None) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", None) or 0,
+        )
+
+
+def _open_text(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class RecordingBackend(LLMBackend):
+    """Forwards to ``inner`` and appends every pair to a recording.
+
+    One JSON object per line: ``k`` (request key), ``m`` (model), ``p``
+    (prompt), ``r`` (response), ``u`` ([prompt, completion] tokens) and
+    ``ms`` (upstream latency). Keys make replay lookups exact; the prompt
+    is kept so recordings stay inspectable.
+    """
+
+    name = "record"
+
+    def __init__(self, inner: LLMBackend, path: str) -> None:
+        self.inner = inner
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = _open_text(path, "a")
+        self._lock = threading.Lock()
+
+    def complete(self, request: LLMRequest, priority: Optional[Priority] = None) -> LLMResponse:
+        started = time.perf_counter()
+        response = self.inner.complete(request, priority)
+        self._write(request, response, time.perf_counter() - started)
+        return response
+
+    async def acomplete(self, request: LLMRequest, priority: Optional[Priority] = None) -> LLMResponse:
+        started = time.perf_counter()
+        response = await self.inner.acomplete(request, priority)
+        self._write(request, response, time.perf_counter() - started)
+        return response
+
+    def _write(self, request: LLMRequest, response: LLMResponse, elapsed: float) -> None:
+        line = json.dumps(
+            {
+                "k": request.key,
+                "m": request.model,
+                "p": request.prompt,
+                "r": response.text,
+                "u": [response.prompt_tokens, response.completion_tokens],
+                "ms": round(elapsed * 1000.0, 1),
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+        self.inner.close()
+
+
+class LatencyModel:
+    """Synthetic latency distribution for replays.
+
+    Specs (milliseconds):
+        ``none``                     no delay
+        ``fixed:MS``                 constant
+        ``uniform:LOW,HIGH``         uniform between LOW and HIGH
+        ``normal:MEAN,STDDEV``       normal, clipped at 0
+        ``lognormal:MEDIAN,SIGMA``   log-normal with the given median (long tail)
+        ``recorded``                 the latency stored with each pair
+    """
+
+    KINDS = ("none", "fixed", "uniform", "normal", "lognormal", "recorded")
+
+    def __init__(self, spec: str = "none", seed: Optional[int] = None) -> None:
+        """
+        Raises:
+            ValueError: On an unknown kind or wrong number of parameters
+        """
+        kind, _, args = spec.strip().partition(":")
+        kind = kind.lower()
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        try:
+            params = [float(a) for a in args.split(",")] if args else []
+        except ValueError:
+            raise ValueError(f"Invalid latency parameters: {spec}")
+        expected = {"none": 0, "recorded": 0, "fixed": 1}.get(kind, 2)
+        if len(params) != expected:
+            raise ValueError(f"Latency '{kind}' takes {expected} parameter(s): {spec}")
+
+        self.spec = spec
+        self.kind = kind
+        self.params = params
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, recorded_ms: float = 0.0) -> float:
+        """Return a delay in seconds."""
+        kind, params = self.kind, self.params
+        with self._lock:
+            if kind == "none":
+                ms = 0.0
+            elif kind == "recorded":
+                ms = recorded_ms
+            elif kind == "fixed":
+                ms = params[0]
+            elif kind == "uniform":
+                ms = self._random.uniform(params[0], params[1])
+            elif kind == "normal":
+                ms = self._random.gauss(params[0], params[1])
+            else:
+                ms = self._random.lognormvariate(math.log(max(params[0], 1e-9)), params[1])
+        return max(0.0, ms) / 1000.0
+
+
+class ReplayMissError(LookupError):
+    """Raised when a replayed request is not in the recording."""
+
+
+class ReplayBackend(LLMBackend):
+    """Serves recorded responses with synthetic latency; never touches the network."""
+
+    name = "replay"
+
+    def __init__(self, path: str, latency: Optional[LatencyModel] = None) -> None:
+        """Load a recording written by ``RecordingBackend``.
+
+        Later entries for the same request win.
+
+        Raises:
+            OSError: If the recording cannot be read
+        """
+        self.path = path
+        self.latency = latency or LatencyModel()
+        self._pairs: Dict[str, Dict[str, Any]] = {}
+        with _open_text(path, "r") as f:
+            try:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._pairs[record["k"]] = record
+            except (EOFError, json.JSONDecodeError):
+                # Recorder was killed before closing the file; keep what was flushed
+                logger.warning(f"Recording {path} is truncated; using complete entries only")
+        logger.info(f"Loaded {len(self._pairs)} recorded LLM responses from {path}")
+
+    def __len__(self) -> int:
+        return len(self._pairs)
+
+    def _lookup(self, request: LLMRequest) -> Dict[str, Any]:
+        record = self._pairs.get(request.key)
+        if record is None:
+            raise ReplayMissError(f"No recorded response for prompt: {request.prompt[:60]!r}")
+        return record
+
+    @staticmethod
+    def _to_response(record: Dict[str, Any]) -> LLMResponse:
+        prompt_tokens, completion_tokens = record.get("u") or (0, 0)
+        return LLMResponse(record["r"], prompt_tokens, completion_tokens)
+
+    def complete(self, request: LLMRequest, priority: Optional[Priority] = None) -> LLMResponse:
+        record = self._lookup(request)
+        time.sleep(self.latency.sample(record.get("ms", 0.0)))
+        return self._to_response(record)
+
+    async def acomplete(self, request: LLMRequest, priority: Optional[Priority] = None) -> LLMResponse:
+        record = self._lookup(request)
+        await asyncio.sleep(self.latency.sample(record.get("ms", 0.0)))
+        return self._to_response(record)
+
+
+DEFAULT_RECORDING_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ".cache",
+    "llm_recording.jsonl.gz",
+)
+
+_backend: Optional[LLMBackend] = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(kind: str) -> LLMBackend:
+    """Build a backend from the environment.
+
+    Args:
+        kind: "groq", "record" or "replay"
+
+    Environment:
+        LLM_RECORDING_PATH: Recording file (default: backend/.cache/llm_recording.jsonl.gz)
+        LLM_REPLAY_LATENCY: ``LatencyModel`` spec for replays (default: "recorded")
+        LLM_REPLAY_SEED: Seed for the latency model (default: 0)
+
+    Raises:
+        ValueError: On an unknown kind or latency spec
+        RuntimeError: If the Groq backend is needed and GROQ_API_KEY is unset
+    """
+    path = os.getenv("LLM_RECORDING_PATH") or DEFAULT_RECORDING_PATH
+    if kind == "groq":
+        return GroqBackend()
+    if kind == "record":
+        return RecordingBackend(GroqBackend(), path)
+    if kind == "replay":
+        latency = LatencyModel(
+            os.getenv("LLM_REPLAY_LATENCY", "recorded"),
+            seed=int(os.getenv("LLM_REPLAY_SEED", "0")),
+        )
+        return ReplayBackend(path, latency)
+    raise ValueError(f"Unknown LLM_BACKEND: {kind}")
+
+
+def get_backend() -> LLMBackend:
+    """Return the process-wide backend selected by ``LLM_BACKEND``
+    ("groq" by default, "record" or "replay")."""
+    global _backend
+    if _backend is None:
+        load_env()
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(os.getenv("LLM_BACKEND", "groq").lower())
+                logger.info(f"LLM backend: {_backend.name}")
+    return _backend
+
+
+def set_backend(backend: Optional[LLMBackend]) -> Optional[LLMBackend]:
+    """Replace the process-wide backend (e.g. with a replayer in a
+    benchmark) and return the previous one. ``None`` re-reads the env."""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    return previous
+
+
+def close_backend() -> None:
+    """Flush and close the process-wide backend, if created."""
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+            _backend = None
@@ -0,0 +1,401 @@
+"""Two-tier response cache for LLM calls.
+
+Responses are keyed by everything that determines the model output
+(model, system prompt, user prompt, temperature, max_tokens). Lookups hit
+an in-process LRU first and fall back to an on-disk SQLite tier that
+survives restarts. Both tiers honour a TTL and a size limit. The async
+methods run the SQLite tier in a worker thread, so an event loop never
+waits on disk I/O.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from services.metrics import REGISTRY, counter_lines, gauge_lines
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MEMORY_ENTRIES = 512
+DEFAULT_DISK_ENTRIES = 20_000
+# A disk hit refreshes last_access (the LRU order) at most this often,
+# so most reads do not write
+TOUCH_INTERVAL_SECONDS = 300.0
+DEFAULT_DB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ".cache",
+    "llm_cache.sqlite3",
+)
+
+
+def make_cache_key(
+    model: str,
+    system_prompt: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+) -> str:
+    """Build a stable cache key from the request parameters."""
+    payload = json.dumps(
+        [model, system_prompt, prompt, float(temperature), int(max_tokens)],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LRUTier:
+    """Thread-safe in-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, expires_at: float) -> None:
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteTier:
+    """On-disk tier backed by a single SQLite table.
+
+    Eviction is by expiry first, then least-recently-used once the table
+    grows past ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int,
+        touch_interval: float = TOUCH_INTERVAL_SECONDS,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, last_access FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            if now - row[2] >= self.touch_interval:
+                self._conn.execute(
+                    "UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+            return row[0], row[1]
+
+    def set(self, key: str, value: str, expires_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time()),
+            )
+            self._writes_since_prune += 1
+            # Pruning scans the table, so amortise it over a batch of writes
+            if self._writes_since_prune >= max(1, self.max_entries // 10):
+                self._prune_locked()
+            self._conn.commit()
+
+    def _prune_locked(self) -> None:
+        self._writes_since_prune = 0
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+        self._conn.execute(
+            """
+            DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM llm_cache ORDER BY last_access DESC
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """LRU + SQLite cache for LLM responses with hit/miss counters."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = DEFAULT_DB_PATH,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        disk_entries: int = DEFAULT_DISK_ENTRIES,
+        enabled: bool = True,
+    ) -> None:
+        """Create a cache.
+
+        Args:
+            db_path: SQLite file for the disk tier (None disables the tier)
+            ttl_seconds: Entry lifetime in both tiers
+            memory_entries: Max entries in the in-process LRU
+            disk_entries: Max rows kept in the SQLite tier
+            enabled: When False every lookup misses and nothing is stored
+        """
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.memory = LRUTier(memory_entries, ttl_seconds)
+        self.disk: Optional[SQLiteTier] = None
+        if enabled and db_path:
+            try:
+                self.disk = SQLiteTier(db_path, disk_entries)
+            except sqlite3.Error as e:
+                logger.warning(f"LLM disk cache unavailable ({db_path}): {str(e)}")
+
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "writes": 0,
+            "rejected": 0,
+            "evicted": 0,
+        }
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key`` or None on a miss."""
+        if not self.enabled:
+            return None
+
+        value = self.memory.get(key)
+        if value is not None:
+            self._incr("memory_hits")
+            return value
+        return self._disk_get(key)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Async ``get``; the SQLite tier is read in a worker thread."""
+        if not self.enabled:
+            return None
+
+        value = self.memory.get(key)
+        if value is not None:
+            self._incr("memory_hits")
+            return value
+        if self.disk is None:
+            return self._disk_get(key)
+        return await asyncio.to_thread(self._disk_get, key)
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        """Look ``key`` up in the SQLite tier after a memory miss."""
+        if self.disk is not None:
+            try:
+                found = self.disk.get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"LLM disk cache read failed: {str(e)}")
+                found = None
+            if found is not None:
+                value, expires_at = found
+                self.memory.set(key, value, expires_at)
+                self._incr("disk_hits")
+                return value
+
+        self._incr("misses")
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        """Store ``value`` in both tiers."""
+        if not self.enabled:
+            return
+
+        expires_at = time.time() + self.ttl_seconds
+        self.memory.set(key, value, expires_at)
+        self._disk_set(key, value, expires_at)
+
+    async def aset(self, key: str, value: str) -> None:
+        """Async ``set``; the SQLite tier is written in a worker thread."""
+        if not self.enabled:
+            return
+
+        expires_at = time.time() + self.ttl_seconds
+        self.memory.set(key, value, expires_at)
+        if self.disk is None:
+            self._disk_set(key, value, expires_at)
+        else:
+            await asyncio.to_thread(self._disk_set, key, value, expires_at)
+
+    def _disk_set(self, key: str, value: str, expires_at: float) -> None:
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value, expires_at)
+            except sqlite3.Error as e:
+                logger.warning(f"LLM disk cache write failed: {str(e)}")
+        self._incr("writes")
+
+    def record_bypass(self) -> None:
+        """Count a call that skipped the cache on purpose."""
+        self._incr("bypassed")
+
+    def record_rejected(self) -> None:
+        """Count a response that failed validation and was not stored."""
+        self._incr("rejected")
+
+    def delete(self, key: str) -> None:
+        """Drop ``key`` from both tiers (e.g. a cached response found invalid)."""
+        self.memory.delete(key)
+        self._disk_delete(key)
+
+    async def adelete(self, key: str) -> None:
+        """Async ``delete``; the SQLite tier is written in a worker thread."""
+        self.memory.delete(key)
+        if self.disk is None:
+            self._disk_delete(key)
+        else:
+            await asyncio.to_thread(self._disk_delete, key)
+
+    def _disk_delete(self, key: str) -> None:
+        if self.disk is not None:
+            try:
+                self.disk.delete(key)
+            except sqlite3.Error as e:
+                logger.warning(f"LLM disk cache delete failed: {str(e)}")
+        self._incr("evicted")
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return a snapshot of the hit/miss counters."""
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+        snapshot["hits"] = snapshot["memory_hits"] + snapshot["disk_hits"]
+        snapshot["memory_entries"] = len(self.memory)
+        return snapshot
+
+    def _incr(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+
+_default_cache: Optional[ResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> ResponseCache:
+    """Return the process-wide cache configured from the environment.
+
+    Environment:
+        LLM_CACHE_ENABLED: "0"/"false" disables caching (default: enabled)
+        LLM_CACHE_PATH: SQLite file for the disk tier ("" disables the tier)
+        LLM_CACHE_TTL_SECONDS: Entry lifetime (default: 7 days)
+        LLM_CACHE_MEMORY_ENTRIES: LRU size (default: 512)
+        LLM_CACHE_DISK_ENTRIES: SQLite row limit (default: 20000)
+    """
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = ResponseCache(
+                    db_path=os.getenv("LLM_CACHE_PATH", DEFAULT_DB_PATH) or None,
+                    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+                    memory_entries=int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", DEFAULT_MEMORY_ENTRIES)),
+                    disk_entries=int(os.getenv("LLM_CACHE_DISK_ENTRIES", DEFAULT_DISK_ENTRIES)),
+                    enabled=os.getenv("LLM_CACHE_ENABLED", "1").lower() not in ("0", "false", "no"),
+                )
+                REGISTRY.register_collector(_collect_cache_stats)
+    return _default_cache
+
+
+def _collect_cache_stats() -> List[str]:
+    """Expose the default cache counters on /metrics."""
+    if _default_cache is None:
+        return []
+    stats = _default_cache.stats()
+    entries = {"memory_entries": stats.pop("memory_entries")}
+    del stats["hits"]  # memory_hits + disk_hits; summing the family would count it twice
+    return counter_lines(
+        "study_planner_llm_cache",
+        "LLM response cache lookups, writes and evictions",
+        stats,
+        "stat",
+    ) + gauge_lines(
+        "study_planner_llm_cache",
+        "LLM response cache size",
+        entries,
+        "stat",
+    )
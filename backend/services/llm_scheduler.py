@@ -0,0 +1,575 @@
+"""Process-wide scheduler for upstream LLM calls.
+
+Every Groq request in the process goes through one ``LLMScheduler`` which:
+
+* reuses a single pooled HTTP client (keep-alive connections) instead of
+  one client per ``AIClient``;
+* admits requests through token buckets for requests/minute and
+  estimated tokens/minute, mirroring Groq's RPM/TPM limits;
+* orders waiting requests by priority lane, so interactive ``/plan``
+  calls are admitted ahead of batch jobs;
+* retries 429s, 5xx and connection errors with jittered exponential
+  backoff, honouring ``retry-after`` (which also pauses the other lanes).
+
+Point ``GROQ_BASE_URL`` at a local fake server to exercise it without
+the real API (see ``benchmarks/fake_groq.py``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import heapq
+import itertools
+import logging
+import math
+import os
+import random
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from services.env import load_env
+from services.metrics import REGISTRY, counter_lines, gauge_lines
+
+if TYPE_CHECKING:
+    import groq
+    import httpx
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_REQUESTS_PER_MINUTE = 30
+DEFAULT_TOKENS_PER_MINUTE = 30_000
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_BASE_SECONDS = 0.5
+DEFAULT_BACKOFF_MAX_SECONDS = 20.0
+DEFAULT_TIMEOUT_SECONDS = 60.0
+
+
+class Priority(IntEnum):
+    """Admission lanes; lower values are admitted first."""
+
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+_current_priority: ContextVar[Priority] = ContextVar(
+    "llm_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def llm_priority(priority: Priority) -> Iterator[None]:
+    """Run LLM calls made inside the block in the given lane."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``per_minute / 60`` per second.
+
+    Not thread-safe on its own; the scheduler guards it with its lock.
+    A non-positive rate disables the limit.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` tokens are available (0: available now)."""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        # A request larger than the bucket would never fit; let it drain it
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float, now: float) -> None:
+        if not self.unlimited:
+            self._refill(now)
+            self.level -= amount
+
+    def give_back(self, amount: float) -> None:
+        """Return over-estimated tokens (negative amounts record a debt)."""
+        if not self.unlimited:
+            self.level = min(self.capacity, self.level + amount)
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "tokens", "wake")
+
+    def __init__(self, priority: Priority, seq: int, tokens: float, wake: Callable[[], None]) -> None:
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.wake = wake
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class LLMScheduler:
+    """Admission control, connection pooling and retries for LLM calls.
+
+    Requests wait in a single priority queue. Only the head of the queue
+    may be admitted, and only once a concurrency slot is free and both
+    buckets can cover it, so a higher-priority arrival overtakes every
+    queued lower-priority request.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE_SECONDS,
+        backoff_max: float = DEFAULT_BACKOFF_MAX_SECONDS,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> None:
+        """Create a scheduler.
+
+        Args:
+            max_concurrency: Max requests in flight (also the pool size)
+            requests_per_minute: Request bucket rate (<= 0: unlimited)
+            tokens_per_minute: Estimated-token bucket rate (<= 0: unlimited)
+            max_retries: Retries after the first attempt
+            backoff_base: First backoff ceiling in seconds; doubles per retry
+            backoff_max: Upper bound of a single backoff
+            timeout: Per-request HTTP timeout in seconds
+            base_url: Groq API base URL (default: GROQ_BASE_URL or the SDK's)
+            api_key: Groq API key (default: GROQ_API_KEY)
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.base_url = base_url or os.getenv("GROQ_BASE_URL") or None
+        self.api_key = api_key
+
+        self._lock = threading.Lock()
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._active = 0
+        self._paused_until = 0.0
+
+        self._client: Optional[groq.Groq] = None
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, groq.AsyncGroq]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._client_lock = threading.Lock()
+
+        self._stats: Dict[str, float] = {
+            "admitted_interactive": 0,
+            "admitted_batch": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failed": 0,
+            "queue_wait_seconds": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Pooled clients
+    # ------------------------------------------------------------------
+
+    def _limits(self) -> httpx.Limits:
+        # Imported lazily: groq/httpx cost ~0.3s and most requests never call the LLM
+        import httpx
+
+        return httpx.Limits(
+            max_connections=self.max_concurrency,
+            max_keepalive_connections=self.max_concurrency,
+            keepalive_expiry=30.0,
+        )
+
+    def _api_key(self) -> Optional[str]:
+        return self.api_key or os.getenv("GROQ_API_KEY")
+
+    def sync_client(self) -> groq.Groq:
+        """Return the shared Groq client (SDK retries disabled)."""
+        if self._client is None:
+            import groq
+            import httpx
+
+            with self._client_lock:
+                if self._client is None:
+                    self._client = groq.Groq(
+                        api_key=self._api_key(),
+                        base_url=self.base_url,
+                        max_retries=0,
+                        timeout=self.timeout,
+                        http_client=httpx.Client(limits=self._limits(), timeout=self.timeout),
+                    )
+        return self._client
+
+    def async_client(self) -> groq.AsyncGroq:
+        """Return the AsyncGroq client of the running event loop.
+
+        Async connection pools are bound to their loop, so each loop
+        gets its own client; it goes away with the loop.
+        """
+        import groq
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        with self._client_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = groq.AsyncGroq(
+                    api_key=self._api_key(),
+                    base_url=self.base_url,
+                    max_retries=0,
+                    timeout=self.timeout,
+                    http_client=httpx.AsyncClient(limits=self._limits(), timeout=self.timeout),
+                )
+                self._async_clients[loop] = client
+        return client
+
+    def close(self) -> None:
+        """Close the shared sync client (async clients close with their loop)."""
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    def call(
+        self,
+        request: Callable[[groq.Groq], T],
+        estimated_tokens: float = 0.0,
+        priority: Optional[Priority] = None,
+    ) -> T:
+        """Run ``request(client)`` under admission control with retries.
+
+        Args:
+            request: Performs one upstream call with the pooled client
+            estimated_tokens: Tokens to reserve from the TPM bucket
+            priority: Lane (default: the ``llm_priority`` context)
+
+        Returns:
+            Whatever ``request`` returns
+
+        Raises:
+            groq.APIError: When the call fails and is not retryable or
+                retries are exhausted
+        """
+        lane = _current_priority.get() if priority is None else priority
+        for attempt in range(self.max_retries + 1):
+            self._acquire(estimated_tokens, lane)
+            failure: Optional[Exception] = None
+            try:
+                response = request(self.sync_client())
+            except Exception as e:
+                failure = e
+            finally:
+                # Release before any backoff so the slot is not held asleep
+                self._release()
+            if failure is None:
+                self._settle(estimated_tokens, response)
+                return response
+            delay = self._on_error(failure, attempt)
+            if delay is None:
+                raise failure
+            time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def acall(
+        self,
+        request: Callable[[groq.AsyncGroq], Awaitable[T]],
+        estimated_tokens: float = 0.0,
+        priority: Optional[Priority] = None,
+    ) -> T:
+        """Async counterpart of ``call``."""
+        lane = _current_priority.get() if priority is None else priority
+        for attempt in range(self.max_retries + 1):
+            await self._aacquire(estimated_tokens, lane)
+            failure: Optional[Exception] = None
+            try:
+                response = await request(self.async_client())
+            except Exception as e:
+                failure = e
+            finally:
+                self._release()
+            if failure is None:
+                self._settle(estimated_tokens, response)
+                return response
+            delay = self._on_error(failure, attempt)
+            if delay is None:
+                raise failure
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    def _try_admit_locked(self, waiter: _Waiter) -> Optional[float]:
+        """Admit ``waiter`` if it can go now.
+
+        Returns:
+            0.0 when admitted, seconds to wait when rate limited, or None
+            when it must wait to be woken (not at the head / no free slot)
+        """
+        if not self._queue or self._queue[0] is not waiter or self._active >= self.max_concurrency:
+            return None
+        now = time.monotonic()
+        delay = max(
+            self._paused_until - now,
+            self.requests.delay(1, now),
+            self.tokens.delay(waiter.tokens, now),
+        )
+        if delay > 0:
+            return delay
+        heapq.heappop(self._queue)
+        self.requests.take(1, now)
+        self.tokens.take(waiter.tokens, now)
+        self._active += 1
+        lane = "interactive" if waiter.priority == Priority.INTERACTIVE else "batch"
+        self._stats[f"admitted_{lane}"] += 1
+        # The next waiter may fit into another free slot straight away
+        self._wake_head_locked()
+        return 0.0
+
+    def _wake_head_locked(self) -> None:
+        if self._queue:
+            self._queue[0].wake()
+
+    def _enqueue(self, tokens: float, priority: Priority, wake: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter(priority, next(self._seq), tokens, wake)
+        with self._lock:
+            heapq.heappush(self._queue, waiter)
+        return waiter
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter in self._queue:
+                self._queue.remove(waiter)
+                heapq.heapify(self._queue)
+                self._wake_head_locked()
+
+    def _acquire(self, tokens: float, priority: Priority) -> None:
+        event = threading.Event()
+        waiter = self._enqueue(tokens, priority, event.set)
+        started = time.monotonic()
+        try:
+            while True:
+                with self._lock:
+                    delay = self._try_admit_locked(waiter)
+                    if delay == 0.0:
+                        self._stats["queue_wait_seconds"] += time.monotonic() - started
+                        return
+                    event.clear()
+                event.wait(delay)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    async def _aacquire(self, tokens: float, priority: Priority) -> None:
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+
+        def wake() -> None:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Loop already closed; its waiter is gone
+                pass
+
+        waiter = self._enqueue(tokens, priority, wake)
+        started = time.monotonic()
+        try:
+            while True:
+                with self._lock:
+                    delay = self._try_admit_locked(waiter)
+                    if delay == 0.0:
+                        self._stats["queue_wait_seconds"] += time.monotonic() - started
+                        return
+                    event.clear()
+                try:
+                    await asyncio.wait_for(event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def _release(self) -> None:
+        with self._lock:
+            self._active -= 1
+            self._wake_head_locked()
+
+    def _settle(self, estimated_tokens: float, response: Any) -> None:
+        """Correct the TPM bucket with the tokens the call actually used."""
+        usage = getattr(response, "usage", None)
+        total = getattr(usage, "total_tokens", None)
+        if total is None:
+            return
+        with self._lock:
+            self.tokens.give_back(estimated_tokens - total)
+
+    # ------------------------------------------------------------------
+    # Retries
+    # ------------------------------------------------------------------
+
+    def _on_error(self, error: Exception, attempt: int) -> Optional[float]:
+        """Return the delay before retrying ``error``, or None to give up."""
+        import groq
+
+        status = getattr(error, "status_code", None)
+        retryable = isinstance(error, groq.APIConnectionError) or status == 429 or (
+            status is not None and status >= 500
+        )
+        with self._lock:
+            if status == 429:
+                self._stats["rate_limited"] += 1
+            if not retryable or attempt >= self.max_retries:
+                self._stats["failed"] += 1
+                return None
+            self._stats["retries"] += 1
+
+        # Full jitter keeps synchronized clients from retrying in lockstep
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        retry_after = _retry_after_seconds(getattr(error, "response", None))
+        if retry_after is not None:
+            delay = min(self.backoff_max, retry_after) + random.uniform(0, self.backoff_base)
+            with self._lock:
+                # Everyone else would get the same 429, so hold all lanes
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+        logger.warning(
+            f"LLM call failed ({type(error).__name__}, status={status}); "
+            f"retry {attempt + 1}/{self.max_retries} in {delay:.2f}s"
+        )
+        return delay
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["active"] = self._active
+            snapshot["queued_interactive"] = sum(
+                1 for w in self._queue if w.priority == Priority.INTERACTIVE
+            )
+            snapshot["queued_batch"] = len(self._queue) - snapshot["queued_interactive"]
+        return snapshot
+
+
+def _retry_after_seconds(response: Optional[httpx.Response]) -> Optional[float]:
+    """Parse a ``retry-after`` header (delta-seconds or HTTP date)."""
+    if response is None:
+        return None
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        seconds = when.timestamp() - time.time()
+    if math.isnan(seconds):
+        return None
+    return max(0.0, seconds)
+
+
+def estimate_tokens(text: str, max_tokens: int) -> int:
+    """Rough token reservation for a call: ~4 chars per prompt token
+    plus the completion budget. Corrected after the call from usage."""
+    return len(text) // 4 + max_tokens
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    """Return the process-wide scheduler configured from the environment.
+
+    Environment:
+        LLM_MAX_CONCURRENCY: Requests in flight / pooled connections (default: 8)
+        LLM_REQUESTS_PER_MINUTE: Request bucket rate, 0 disables (default: 30)
+        LLM_TOKENS_PER_MINUTE: Token bucket rate, 0 disables (default: 30000)
+        LLM_MAX_RETRIES: Retries after the first attempt (default: 4)
+        LLM_BACKOFF_BASE_SECONDS: First backoff ceiling (default: 0.5)
+        LLM_BACKOFF_MAX_SECONDS: Max single backoff (default: 20)
+        LLM_TIMEOUT_SECONDS: HTTP timeout per request (default: 60)
+        GROQ_BASE_URL: Override the API endpoint (e.g. a local fake server)
+    """
+    global _scheduler
+    if _scheduler is None:
+        load_env()
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler(
+                    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+                    requests_per_minute=float(os.getenv("LLM_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE)),
+                    tokens_per_minute=float(os.getenv("LLM_TOKENS_PER_MINUTE", DEFAULT_TOKENS_PER_MINUTE)),
+                    max_retries=int(os.getenv("LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+                    backoff_base=float(os.getenv("LLM_BACKOFF_BASE_SECONDS", DEFAULT_BACKOFF_BASE_SECONDS)),
+                    backoff_max=float(os.getenv("LLM_BACKOFF_MAX_SECONDS", DEFAULT_BACKOFF_MAX_SECONDS)),
+                    timeout=float(os.getenv("LLM_TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS)),
+                )
+                REGISTRY.register_collector(_collect_scheduler_stats)
+    return _scheduler
+
+
+def close_scheduler() -> None:
+    """Close the process-wide scheduler's pooled client, if created."""
+    if _scheduler is not None:
+        _scheduler.close()
+
+
+def _collect_scheduler_stats() -> List[str]:
+    """Expose the default scheduler counters on /metrics."""
+    if _scheduler is None:
+        return []
+    stats = _scheduler.stats()
+    current = {
+        name: stats.pop(name) for name in ("active", "queued_interactive", "queued_batch")
+    }
+    return counter_lines(
+        "study_planner_llm_scheduler",
+        "LLM scheduler admissions, retries, failures and total queue wait",
+        stats,
+        "stat",
+    ) + gauge_lines(
+        "study_planner_llm_scheduler",
+        "LLM calls in flight and waiting in each lane",
+        current,
+        "stat",
+    )
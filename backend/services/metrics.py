@@ -0,0 +1,240 @@
+"""Lightweight in-process metrics with Prometheus text exposition.
+
+Recording is a lock-protected increment, so instrumented code pays well
+under a microsecond per observation; the text format is only rendered
+when ``/metrics`` is scraped. Stage timings can also be collected per
+request for a ``Server-Timing`` response header.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Seconds; covers sub-millisecond agent stages up to slow LLM calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+TOKEN_BUCKETS = (16, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for labelvalues, value in items:
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram with optional labels."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[labelvalues] = series
+            series[0][index] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(lv, list(counts), total[0]) for lv, (counts, total) in self._series.items()]
+        for labelvalues, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                labels = _format_labels(self.labelnames, labelvalues, le)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and collectors and renders them on scrape."""
+
+    def __init__(self) -> None:
+        self._metrics: List[object] = []
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """Add a callback that yields ready-made exposition lines at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())  # type: ignore[attr-defined]
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.histogram(
+    "study_planner_stage_duration_seconds",
+    "Time spent in each request/workflow stage",
+    ("stage",),
+)
+LLM_LATENCY = REGISTRY.histogram(
+    "study_planner_llm_request_duration_seconds",
+    "Latency of upstream LLM calls (cache misses only)",
+    ("model",),
+)
+LLM_TOKENS = REGISTRY.histogram(
+    "study_planner_llm_tokens",
+    "Tokens per LLM call by kind (prompt/completion)",
+    ("model", "kind"),
+    buckets=TOKEN_BUCKETS,
+)
+ERRORS = REGISTRY.counter(
+    "study_planner_errors_total",
+    "Errors by component and exception class",
+    ("component", "exception"),
+)
+
+
+def gauge_lines(name: str, documentation: str, values: Dict[str, float], label: str) -> List[str]:
+    """Render a labelled gauge family, for use in collectors."""
+    return _family_lines(name, documentation, "gauge", values, label)
+
+
+def counter_lines(name: str, documentation: str, values: Dict[str, float], label: str) -> List[str]:
+    """Render a labelled counter family as ``<name>_total``, for use in collectors.
+
+    For running totals (hits, retries, ...); values that can go down
+    belong in ``gauge_lines``.
+    """
+    return _family_lines(f"{name}_total", documentation, "counter", values, label)
+
+
+def _family_lines(
+    name: str, documentation: str, kind: str, values: Dict[str, float], label: str
+) -> List[str]:
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for key, value in values.items():
+        lines.append(f'{name}{{{label}="{_escape(key)}"}} {_format_value(value)}')
+    return lines
+
+
+# Per-request list of (stage, seconds) for Server-Timing; None when disabled
+_server_timing: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar(
+    "server_timing", default=None
+)
+
+
+def start_server_timing() -> List[Tuple[str, float]]:
+    """Begin collecting stage timings for the current request."""
+    entries: List[Tuple[str, float]] = []
+    _server_timing.set(entries)
+    return entries
+
+
+def format_server_timing(entries: List[Tuple[str, float]]) -> str:
+    """Format collected timings as a Server-Timing header value (ms)."""
+    return ", ".join(f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in entries)
+
+
+class timed:
+    """Context manager recording a stage duration.
+
+    Example:
+        with timed("planner"):
+            PlannerAgent.generate_study_plan(...)
+    """
+
+    __slots__ = ("stage", "_start")
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+
+    def __enter__(self) -> "timed":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self._start
+        STAGE_DURATION.observe(elapsed, self.stage)
+        entries = _server_timing.get()
+        if entries is not None:
+            entries.append((self.stage, elapsed))
+        if exc_type is not None:
+            ERRORS.inc(1.0, self.stage, exc_type.__name__)
@@ -0,0 +1,1187 @@
+"""Persistence layer for generated study plans.
+
+Stores each plan in the tables defined by ``database/init.sql``
+(``study_plans``, ``study_sessions``, ``workflow_executions``). PostgreSQL
+is used through a psycopg connection pool and sessions are written with a
+single COPY per plan; the tables and triggers added since init.sql
+(``POSTGRES_SCHEMA``) are created when the store starts, so existing
+databases upgrade in place. A SQLite store with the same schema stands in
+for local development and tests. Writes go through a background writer so
+request latency does not include database round trips.
+
+Per-plan session totals and completion counters live in
+``plan_progress`` and are maintained by triggers on ``study_sessions``,
+so progress reads never scan sessions. ``plan_subjects`` (also trigger
+maintained) indexes plans by normalized subject for the listing, which
+pages by keyset on ``(created_at, plan_id)`` so every page costs the same.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SessionRow = Tuple[str, str, str, float, str, Optional[str]]
+
+# PlannerAgent.MODE_CYCLE, the mode of plans stored before it was recorded
+DEFAULT_PLANNER_MODE = "cycle"
+
+SESSION_COLUMNS = (
+    "plan_id", "day_name", "subject", "session_type", "duration_hours", "notes", "time_slot"
+)
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS study_plans (
+    plan_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subjects TEXT NOT NULL,
+    hours_per_week REAL NOT NULL,
+    days_per_week INTEGER NOT NULL,
+    plan_data TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS workflow_executions (
+    execution_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    plan_id INTEGER REFERENCES study_plans(plan_id) ON DELETE CASCADE,
+    workflow_name VARCHAR(255) NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP,
+    error_message TEXT
+);
+
+CREATE TABLE IF NOT EXISTS study_sessions (
+    session_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    plan_id INTEGER REFERENCES study_plans(plan_id) ON DELETE CASCADE,
+    day_name VARCHAR(20) NOT NULL,
+    subject VARCHAR(255) NOT NULL,
+    session_type VARCHAR(50) NOT NULL,
+    duration_hours REAL NOT NULL,
+    notes TEXT,
+    time_slot VARCHAR(50),
+    completed BOOLEAN DEFAULT FALSE,
+    completed_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS plan_subjects (
+    plan_id INTEGER NOT NULL REFERENCES study_plans(plan_id) ON DELETE CASCADE,
+    subject_key TEXT NOT NULL,
+    created_at TIMESTAMP,
+    PRIMARY KEY (plan_id, subject_key)
+);
+
+CREATE TABLE IF NOT EXISTS plan_progress (
+    plan_id INTEGER PRIMARY KEY REFERENCES study_plans(plan_id) ON DELETE CASCADE,
+    total_sessions INTEGER NOT NULL DEFAULT 0,
+    completed_sessions INTEGER NOT NULL DEFAULT 0,
+    total_hours REAL NOT NULL DEFAULT 0,
+    completed_hours REAL NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_study_plans_created_at ON study_plans(created_at);
+CREATE INDEX IF NOT EXISTS idx_workflow_executions_plan_id ON workflow_executions(plan_id);
+CREATE INDEX IF NOT EXISTS idx_study_sessions_plan_id ON study_sessions(plan_id);
+CREATE INDEX IF NOT EXISTS idx_plan_subjects_subject
+    ON plan_subjects(subject_key, created_at, plan_id);
+
+CREATE TRIGGER IF NOT EXISTS study_plans_subjects_insert
+AFTER INSERT ON study_plans
+BEGIN
+    INSERT OR IGNORE INTO plan_subjects (plan_id, subject_key, created_at)
+    SELECT NEW.plan_id, lower(trim(value)), NEW.created_at FROM json_each(NEW.subjects);
+END;
+
+CREATE TRIGGER IF NOT EXISTS study_plans_subjects_update
+AFTER UPDATE OF subjects, created_at ON study_plans
+BEGIN
+    DELETE FROM plan_subjects WHERE plan_id = OLD.plan_id;
+    INSERT OR IGNORE INTO plan_subjects (plan_id, subject_key, created_at)
+    SELECT NEW.plan_id, lower(trim(value)), NEW.created_at FROM json_each(NEW.subjects);
+END;
+
+-- SQLite has no statement-level triggers, so counters move per row
+CREATE TRIGGER IF NOT EXISTS study_sessions_progress_insert
+AFTER INSERT ON study_sessions WHEN NEW.plan_id IS NOT NULL
+BEGIN
+    INSERT INTO plan_progress
+        (plan_id, total_sessions, completed_sessions, total_hours, completed_hours)
+    VALUES (
+        NEW.plan_id, 1, COALESCE(NEW.completed, 0) != 0, NEW.duration_hours,
+        CASE WHEN NEW.completed THEN NEW.duration_hours ELSE 0 END
+    )
+    ON CONFLICT (plan_id) DO UPDATE SET
+        total_sessions = total_sessions + excluded.total_sessions,
+        completed_sessions = completed_sessions + excluded.completed_sessions,
+        total_hours = total_hours + excluded.total_hours,
+        completed_hours = completed_hours + excluded.completed_hours,
+        updated_at = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER IF NOT EXISTS study_sessions_progress_update
+AFTER UPDATE OF plan_id, completed, duration_hours ON study_sessions
+BEGIN
+    UPDATE plan_progress SET
+        total_sessions = total_sessions - 1,
+        completed_sessions = completed_sessions - (COALESCE(OLD.completed, 0) != 0),
+        total_hours = total_hours - OLD.duration_hours,
+        completed_hours = completed_hours
+            - CASE WHEN OLD.completed THEN OLD.duration_hours ELSE 0 END,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE plan_id = OLD.plan_id;
+    UPDATE plan_progress SET
+        total_sessions = total_sessions + 1,
+        completed_sessions = completed_sessions + (COALESCE(NEW.completed, 0) != 0),
+        total_hours = total_hours + NEW.duration_hours,
+        completed_hours = completed_hours
+            + CASE WHEN NEW.completed THEN NEW.duration_hours ELSE 0 END,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE plan_id = NEW.plan_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS study_sessions_progress_delete
+AFTER DELETE ON study_sessions
+BEGIN
+    UPDATE plan_progress SET
+        total_sessions = total_sessions - 1,
+        completed_sessions = completed_sessions - (COALESCE(OLD.completed, 0) != 0),
+        total_hours = total_hours - OLD.duration_hours,
+        completed_hours = completed_hours
+            - CASE WHEN OLD.completed THEN OLD.duration_hours ELSE 0 END,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE plan_id = OLD.plan_id;
+END;
+"""
+
+# Run once per SQLite file (tracked with PRAGMA user_version): counters
+# and subject keys for plans stored before plan_progress and
+# plan_subjects existed, then the planner_mode column
+SQLITE_MIGRATIONS = [
+    """
+    INSERT INTO plan_progress
+        (plan_id, total_sessions, completed_sessions, total_hours, completed_hours)
+    SELECT plan_id,
+           COUNT(*),
+           SUM(COALESCE(completed, 0) != 0),
+           SUM(duration_hours),
+           SUM(CASE WHEN completed THEN duration_hours ELSE 0 END)
+    FROM study_sessions
+    WHERE plan_id IS NOT NULL
+    GROUP BY plan_id
+    """,
+    """
+    INSERT OR IGNORE INTO plan_subjects (plan_id, subject_key, created_at)
+    SELECT p.plan_id, lower(trim(s.value)), p.created_at
+    FROM study_plans p, json_each(p.subjects) AS s
+    """,
+    """
+    ALTER TABLE study_plans
+    ADD COLUMN planner_mode VARCHAR(20) NOT NULL DEFAULT 'cycle'
+    """,
+]
+
+# Run by PostgresPlanStore at startup, so databases whose volume was
+# initialized before these objects existed pick them up: every statement
+# is idempotent (init.sql only runs on an empty data directory)
+POSTGRES_SCHEMA = """
+-- Per-plan progress counters, kept current by the triggers below in the
+-- same transaction as the session writes, so progress reads are one
+-- primary-key lookup instead of a scan of study_sessions
+CREATE TABLE IF NOT EXISTS plan_progress (
+    plan_id INT PRIMARY KEY REFERENCES study_plans(plan_id) ON DELETE CASCADE,
+    total_sessions INT NOT NULL DEFAULT 0,
+    completed_sessions INT NOT NULL DEFAULT 0,
+    total_hours FLOAT NOT NULL DEFAULT 0,
+    completed_hours FLOAT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Subjects of each plan, normalized (lower-cased, trimmed), one row per
+-- subject. Maintained by trigger from study_plans.subjects; carries
+-- created_at so a subject-filtered listing is one index range scan
+CREATE TABLE IF NOT EXISTS plan_subjects (
+    plan_id INT NOT NULL REFERENCES study_plans(plan_id) ON DELETE CASCADE,
+    subject_key TEXT NOT NULL,
+    created_at TIMESTAMP,
+    PRIMARY KEY (plan_id, subject_key)
+);
+
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INT NOT NULL
+);
+
+-- Planner mode the plan was built with, so /plan/update rebuilds it alike
+ALTER TABLE study_plans
+    ADD COLUMN IF NOT EXISTS planner_mode VARCHAR(20) NOT NULL DEFAULT 'cycle';
+
+-- (created_at, plan_id) is the keyset of the GET /plans listing; it
+-- supersedes the created_at-only index of the original schema
+CREATE INDEX IF NOT EXISTS idx_study_plans_keyset ON study_plans(created_at, plan_id);
+DROP INDEX IF EXISTS idx_study_plans_created_at;
+CREATE INDEX IF NOT EXISTS idx_plan_subjects_subject
+    ON plan_subjects(subject_key, created_at, plan_id);
+
+-- Statement-level triggers: one counter update per plan touched by a
+-- statement (a plan's COPY or a bulk completion), not one per session
+CREATE OR REPLACE FUNCTION plan_progress_on_insert() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO plan_progress AS pp
+        (plan_id, total_sessions, completed_sessions, total_hours, completed_hours)
+    SELECT plan_id,
+           COUNT(*),
+           COUNT(*) FILTER (WHERE completed),
+           SUM(duration_hours),
+           COALESCE(SUM(duration_hours) FILTER (WHERE completed), 0)
+    FROM new_rows
+    WHERE plan_id IS NOT NULL
+    GROUP BY plan_id
+    ON CONFLICT (plan_id) DO UPDATE SET
+        total_sessions = pp.total_sessions + EXCLUDED.total_sessions,
+        completed_sessions = pp.completed_sessions + EXCLUDED.completed_sessions,
+        total_hours = pp.total_hours + EXCLUDED.total_hours,
+        completed_hours = pp.completed_hours + EXCLUDED.completed_hours,
+        updated_at = CURRENT_TIMESTAMP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION plan_progress_on_update() RETURNS TRIGGER AS $$
+BEGIN
+    -- Old rows count negatively, new rows positively
+    UPDATE plan_progress pp SET
+        total_sessions = pp.total_sessions + d.sessions,
+        completed_sessions = pp.completed_sessions + d.completed,
+        total_hours = pp.total_hours + d.hours,
+        completed_hours = pp.completed_hours + d.completed_hours,
+        updated_at = CURRENT_TIMESTAMP
+    FROM (
+        SELECT plan_id,
+               SUM(sign) AS sessions,
+               COALESCE(SUM(sign) FILTER (WHERE completed), 0) AS completed,
+               SUM(sign * duration_hours) AS hours,
+               COALESCE(SUM(sign * duration_hours) FILTER (WHERE completed), 0) AS completed_hours
+        FROM (
+            SELECT plan_id, 1 AS sign, completed, duration_hours FROM new_rows
+            UNION ALL
+            SELECT plan_id, -1 AS sign, completed, duration_hours FROM old_rows
+        ) changes
+        WHERE plan_id IS NOT NULL
+        GROUP BY plan_id
+    ) d
+    WHERE pp.plan_id = d.plan_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION plan_progress_on_delete() RETURNS TRIGGER AS $$
+BEGIN
+    -- When the plan itself is deleted its counter row is already gone
+    UPDATE plan_progress pp SET
+        total_sessions = pp.total_sessions - d.sessions,
+        completed_sessions = pp.completed_sessions - d.completed,
+        total_hours = pp.total_hours - d.hours,
+        completed_hours = pp.completed_hours - d.completed_hours,
+        updated_at = CURRENT_TIMESTAMP
+    FROM (
+        SELECT plan_id,
+               COUNT(*) AS sessions,
+               COUNT(*) FILTER (WHERE completed) AS completed,
+               SUM(duration_hours) AS hours,
+               COALESCE(SUM(duration_hours) FILTER (WHERE completed), 0) AS completed_hours
+        FROM old_rows
+        GROUP BY plan_id
+    ) d
+    WHERE pp.plan_id = d.plan_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION plan_subjects_sync() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        DELETE FROM plan_subjects WHERE plan_id = OLD.plan_id;
+    END IF;
+    INSERT INTO plan_subjects (plan_id, subject_key, created_at)
+    SELECT DISTINCT NEW.plan_id, lower(trim(subject)), NEW.created_at
+    FROM jsonb_array_elements_text(NEW.subjects::jsonb) AS subject;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Created only when missing: dropping and recreating them would take an
+-- exclusive lock on the table at every startup
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgrelid = 'study_sessions'::regclass
+          AND tgname = 'study_sessions_progress_insert'
+    ) THEN
+        CREATE TRIGGER study_sessions_progress_insert
+            AFTER INSERT ON study_sessions
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION plan_progress_on_insert();
+    END IF;
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgrelid = 'study_sessions'::regclass
+          AND tgname = 'study_sessions_progress_update'
+    ) THEN
+        CREATE TRIGGER study_sessions_progress_update
+            AFTER UPDATE ON study_sessions
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION plan_progress_on_update();
+    END IF;
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgrelid = 'study_sessions'::regclass
+          AND tgname = 'study_sessions_progress_delete'
+    ) THEN
+        CREATE TRIGGER study_sessions_progress_delete
+            AFTER DELETE ON study_sessions
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION plan_progress_on_delete();
+    END IF;
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgrelid = 'study_plans'::regclass
+          AND tgname = 'study_plans_subjects_sync'
+    ) THEN
+        CREATE TRIGGER study_plans_subjects_sync
+            AFTER INSERT OR UPDATE OF subjects, created_at ON study_plans
+            FOR EACH ROW EXECUTE FUNCTION plan_subjects_sync();
+    END IF;
+END;
+$$;
+
+-- Quick plan summary (reads the counters; no GROUP BY). Existing columns
+-- keep their names and types so it can replace the init.sql version
+CREATE OR REPLACE VIEW plan_summary AS
+SELECT
+    p.plan_id,
+    p.subjects,
+    p.hours_per_week,
+    p.days_per_week,
+    p.created_at,
+    COALESCE(pp.total_sessions, 0)::BIGINT AS total_sessions,
+    COALESCE(pp.completed_sessions, 0)::BIGINT AS completed_sessions,
+    COALESCE(pp.total_hours, 0) AS total_hours,
+    COALESCE(pp.completed_hours, 0) AS completed_hours
+FROM study_plans p
+LEFT JOIN plan_progress pp ON p.plan_id = pp.plan_id;
+"""
+
+# Run once per PostgreSQL database (tracked in schema_version), after
+# POSTGRES_SCHEMA: counters and subject keys for plans stored before
+# plan_progress and plan_subjects existed
+POSTGRES_MIGRATIONS = [
+    """
+    INSERT INTO plan_progress
+        (plan_id, total_sessions, completed_sessions, total_hours, completed_hours)
+    SELECT ss.plan_id,
+           COUNT(*),
+           COUNT(*) FILTER (WHERE ss.completed),
+           SUM(ss.duration_hours),
+           COALESCE(SUM(ss.duration_hours) FILTER (WHERE ss.completed), 0)
+    FROM study_sessions ss
+    WHERE ss.plan_id IS NOT NULL
+      AND NOT EXISTS (SELECT 1 FROM plan_progress pp WHERE pp.plan_id = ss.plan_id)
+    GROUP BY ss.plan_id
+    """,
+    """
+    INSERT INTO plan_subjects (plan_id, subject_key, created_at)
+    SELECT DISTINCT p.plan_id, lower(trim(subject)), p.created_at
+    FROM study_plans p, jsonb_array_elements_text(p.subjects::jsonb) AS subject
+    WHERE NOT EXISTS (SELECT 1 FROM plan_subjects ps WHERE ps.plan_id = p.plan_id)
+    """,
+]
+
+# pg_advisory_xact_lock key serializing POSTGRES_SCHEMA across processes
+POSTGRES_MIGRATION_LOCK = 0x5354_5544
+
+WORKFLOW_NAME = "study_plan"
+
+
+def plan_to_rows(plan: Sequence[Any]) -> List[SessionRow]:
+    """Flatten DailyPlan models (or their dicts) into study_sessions rows."""
+    rows: List[SessionRow] = []
+    for day in plan:
+        day_data = day if isinstance(day, dict) else day.model_dump(mode="json")
+        for session in day_data["sessions"]:
+            rows.append((
+                day_data["day"],
+                session["subject"],
+                session["session_type"],
+                float(session["duration_hours"]),
+                session.get("notes", ""),
+                session.get("time_slot"),
+            ))
+    return rows
+
+
+def serialize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a workflow result into the JSON document stored in plan_data."""
+    document = {
+        "plan": [
+            day if isinstance(day, dict) else day.model_dump(mode="json")
+            for day in result["plan"]
+        ],
+        "resources": {
+            subject: res if isinstance(res, dict) else res.model_dump(mode="json")
+            for subject, res in result["resources"].items()
+        },
+    }
+    if result.get("outlines"):
+        document["outlines"] = {
+            subject: outline if isinstance(outline, dict) else outline.model_dump(mode="json")
+            for subject, outline in result["outlines"].items()
+        }
+    return document
+
+
+def _progress_record(
+    plan_id: int,
+    total_sessions: Optional[int],
+    completed_sessions: Optional[int],
+    total_hours: Optional[float],
+    completed_hours: Optional[float],
+) -> Dict[str, Any]:
+    """Build a get_progress entry from plan_progress counters (NULL when
+    the plan has no sessions yet)."""
+    total = total_sessions or 0
+    completed = completed_sessions or 0
+    return {
+        "plan_id": plan_id,
+        "total_sessions": total,
+        "completed_sessions": completed,
+        "total_hours": round(float(total_hours or 0.0), 6),
+        "completed_hours": round(float(completed_hours or 0.0), 6),
+        "percent_complete": round(100.0 * completed / total, 1) if total else 0.0,
+    }
+
+
+def _session_record(
+    session_id: int,
+    day_name: str,
+    subject: str,
+    session_type: str,
+    duration_hours: float,
+    notes: Optional[str],
+    time_slot: Optional[str],
+    completed: Any,
+    completed_at: Any,
+) -> Dict[str, Any]:
+    """Build a get_sessions entry from a study_sessions row."""
+    if completed_at is not None and not isinstance(completed_at, str):
+        completed_at = completed_at.isoformat(sep=" ", timespec="seconds")
+    return {
+        "session_id": session_id,
+        "day": day_name,
+        "subject": subject,
+        "session_type": session_type,
+        "duration_hours": float(duration_hours),
+        "notes": notes or "",
+        "time_slot": time_slot,
+        "completed": bool(completed),
+        "completed_at": completed_at,
+    }
+
+
+# Listing: plan_data fields are projected by path, at most this many
+MAX_LIST_FIELDS = 10
+MAX_FIELD_DEPTH = 6
+_FIELD_SEGMENT = re.compile(r"^[^.\"]+$")
+
+PLAN_SUMMARY_COLUMNS = (
+    "p.plan_id, p.subjects, p.hours_per_week, p.days_per_week, p.created_at, "
+    "pp.total_sessions, pp.completed_sessions"
+)
+
+
+def parse_fields(fields: Optional[str]) -> List[Tuple[str, ...]]:
+    """Parse a ``fields`` projection such as ``resources.Python,plan.0``.
+
+    Each comma-separated entry is a dotted path into ``plan_data``;
+    numeric segments index arrays.
+
+    Raises:
+        ValueError: On an empty, too deep or malformed path, or too many paths
+    """
+    if not fields:
+        return []
+    paths = []
+    for entry in dict.fromkeys(part.strip() for part in fields.split(",")):
+        segments = tuple(segment.strip() for segment in entry.split("."))
+        if not entry or not all(_FIELD_SEGMENT.match(segment) for segment in segments):
+            raise ValueError(f"invalid field path {entry!r}")
+        if len(segments) > MAX_FIELD_DEPTH:
+            raise ValueError(f"field path {entry!r} is deeper than {MAX_FIELD_DEPTH}")
+        paths.append(segments)
+    if len(paths) > MAX_LIST_FIELDS:
+        raise ValueError(f"at most {MAX_LIST_FIELDS} fields can be projected")
+    return paths
+
+
+def encode_cursor(created_at: str, plan_id: int) -> str:
+    """Opaque keyset cursor for the row after which the next page starts."""
+    raw = json.dumps([created_at, plan_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Inverse of ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor was not produced by ``encode_cursor``
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, plan_id = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(created_at, str) or not isinstance(plan_id, int):
+        raise ValueError("invalid cursor")
+    return created_at, plan_id
+
+
+def _timestamp_text(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return value.isoformat(sep=" ")
+
+
+def _summary_record(
+    row: Sequence[Any], fields: Sequence[Tuple[str, ...]], parse_json: bool
+) -> Dict[str, Any]:
+    """Build a list_plans entry from a summary row plus projected fields."""
+    plan_id, subjects, hours_per_week, days_per_week, created_at, total, completed = row[:7]
+    record: Dict[str, Any] = {
+        "plan_id": plan_id,
+        "subjects": json.loads(subjects) if isinstance(subjects, str) else list(subjects),
+        "hours_per_week": float(hours_per_week),
+        "days_per_week": days_per_week,
+        "created_at": _timestamp_text(created_at),
+        "total_sessions": total or 0,
+        "completed_sessions": completed or 0,
+    }
+    if fields:
+        values = row[7:]
+        record["fields"] = {
+            ".".join(path): json.loads(value) if parse_json and value is not None else value
+            for path, value in zip(fields, values)
+        }
+    return record
+
+
+SESSION_SELECT = (
+    "SELECT session_id, day_name, subject, session_type, duration_hours, notes, "
+    "time_slot, completed, completed_at FROM study_sessions"
+)
+SESSION_EXPORT_SELECT = (
+    "SELECT plan_id, session_id, day_name, subject, session_type, duration_hours, notes, "
+    "time_slot, completed, completed_at FROM study_sessions"
+)
+PROGRESS_SELECT = (
+    "SELECT p.plan_id, pp.total_sessions, pp.completed_sessions, pp.total_hours, "
+    "pp.completed_hours FROM study_plans p "
+    "LEFT JOIN plan_progress pp ON pp.plan_id = p.plan_id"
+)
+
+
+def _plan_record(
+    subjects: Any,
+    hours_per_week: float,
+    days_per_week: int,
+    planner_mode: str,
+    plan_data: Any,
+) -> Dict[str, Any]:
+    """Build a get_plan_record result from a study_plans row."""
+    return {
+        "subjects": json.loads(subjects) if isinstance(subjects, str) else list(subjects),
+        # Only the weekly total is stored, so divide it back out
+        "daily_hours": round(float(hours_per_week) / days_per_week, 6),
+        "days_per_week": days_per_week,
+        "planner_mode": planner_mode,
+        "plan_data": json.loads(plan_data) if isinstance(plan_data, str) else plan_data,
+    }
+
+
+class PlanStore(ABC):
+    """Interface shared by the PostgreSQL and SQLite stores."""
+
+    @abstractmethod
+    def save_plan(
+        self,
+        subjects: List[str],
+        daily_hours: float,
+        days_per_week: int,
+        result: Dict[str, Any],
+        planner_mode: str = DEFAULT_PLANNER_MODE,
+    ) -> int:
+        """Store a plan with its sessions and execution record.
+
+        ``planner_mode`` is the PlannerAgent mode the plan was built with.
+
+        Returns:
+            The new plan_id
+        """
+
+    @abstractmethod
+    def get_plan(self, plan_id: int) -> Optional[Dict[str, Any]]:
+        """Return the stored plan_data document, or None if missing."""
+
+    @abstractmethod
+    def get_plan_record(self, plan_id: int) -> Optional[Dict[str, Any]]:
+        """Return a plan with its inputs, or None if missing.
+
+        Returns:
+            Dictionary with ``subjects``, ``daily_hours``, ``days_per_week``,
+            ``planner_mode`` and the ``plan_data`` document
+        """
+
+    @abstractmethod
+    def set_sessions_completed(
+        self, plan_id: int, session_ids: Sequence[int], completed: bool = True
+    ) -> int:
+        """Mark sessions of a plan complete (or not) in one statement.
+
+        Ids that are not sessions of the plan, and sessions already in
+        the requested state, are left alone. The plan's counters are
+        updated by trigger in the same transaction.
+
+        Returns:
+            Number of sessions whose state changed
+        """
+
+    @abstractmethod
+    def get_progress(self, plan_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+        """Return progress counters of the given plans that exist.
+
+        Each plan costs one primary-key lookup of its counters, however
+        many sessions it has.
+
+        Returns:
+            plan_id -> dictionary with ``total_sessions``,
+            ``completed_sessions``, ``total_hours``, ``completed_hours``
+            and ``percent_complete``
+        """
+
+    @abstractmethod
+    def get_sessions(self, plan_id: int) -> List[Dict[str, Any]]:
+        """Return the stored sessions of a plan, in plan order."""
+
+    def iter_sessions(
+        self, plan_id: Optional[int] = None, batch_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield stored sessions (of one plan, or of all plans) for export.
+
+        Rows are read in keyset batches on ``session_id``, each in its own
+        short query, so memory is bounded by ``batch_size`` and no
+        connection or lock is held while the caller consumes a batch.
+
+        Returns:
+            Iterator of get_sessions entries with ``plan_id`` added, in
+            session order
+        """
+        after = 0
+        while True:
+            rows = self._session_batch(plan_id, after, batch_size)
+            for row in rows:
+                yield {"plan_id": row[0], **_session_record(*row[1:])}
+            if len(rows) < batch_size:
+                return
+            after = rows[-1][1]
+
+    @abstractmethod
+    def _session_batch(
+        self, plan_id: Optional[int], after: int, limit: int
+    ) -> List[Tuple[Any, ...]]:
+        """Read up to ``limit`` SESSION_EXPORT_SELECT rows past ``after``."""
+
+    @abstractmethod
+    def list_plans(
+        self,
+        limit: int,
+        after: Optional[Tuple[str, int]] = None,
+        subject: Optional[str] = None,
+        fields: Sequence[Tuple[str, ...]] = (),
+    ) -> List[Dict[str, Any]]:
+        """List plans newest first, by keyset.
+
+        Only summary columns are read unless ``fields`` names paths into
+        ``plan_data``, which the database extracts. With ``subject`` the
+        scan runs over ``plan_subjects`` (case-insensitive match).
+
+        Args:
+            limit: Maximum number of plans
+            after: ``(created_at, plan_id)`` of the last plan already seen
+            subject: Only plans that include this subject
+            fields: Paths from ``parse_fields``
+
+        Returns:
+            Dictionaries with the summary columns, progress counters and,
+            when projected, ``fields`` (path -> value, None if absent)
+        """
+
+    def close(self) -> None:
+        """Release connections."""
+
+
+class PostgresPlanStore(PlanStore):
+    """PostgreSQL store using a psycopg connection pool and COPY."""
+
+    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 10) -> None:
+        try:
+            from psycopg.types.json import Jsonb
+            from psycopg_pool import ConnectionPool
+        except ImportError as e:
+            raise RuntimeError(
+                "PostgreSQL persistence requires psycopg and psycopg-pool "
+                "(pip install 'psycopg[binary]' psycopg-pool)"
+            ) from e
+
+        self._jsonb = Jsonb
+        self.pool = ConnectionPool(dsn, min_size=min_size, max_size=max_size, open=True)
+        try:
+            self._migrate()
+        except Exception:
+            self.pool.close()
+            raise
+
+    def _migrate(self) -> None:
+        with self.pool.connection() as conn:
+            with conn.transaction():
+                # Every worker process runs this at startup; one at a time
+                conn.execute("SELECT pg_advisory_xact_lock(%s)", (POSTGRES_MIGRATION_LOCK,))
+                conn.execute(POSTGRES_SCHEMA)
+                row = conn.execute("SELECT version FROM schema_version").fetchone()
+                version = row[0] if row else 0
+                for statement in POSTGRES_MIGRATIONS[version:]:
+                    conn.execute(statement)
+                if row is None:
+                    conn.execute(
+                        "INSERT INTO schema_version (version) VALUES (%s)",
+                        (len(POSTGRES_MIGRATIONS),),
+                    )
+                elif version < len(POSTGRES_MIGRATIONS):
+                    conn.execute(
+                        "UPDATE schema_version SET version = %s", (len(POSTGRES_MIGRATIONS),)
+                    )
+
+    def save_plan(
+        self,
+        subjects: List[str],
+        daily_hours: float,
+        days_per_week: int,
+        result: Dict[str, Any],
+        planner_mode: str = DEFAULT_PLANNER_MODE,
+    ) -> int:
+        plan_data = serialize_result(result)
+        rows = plan_to_rows(plan_data["plan"])
+
+        with self.pool.connection() as conn:
+            with conn.transaction():
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "INSERT INTO study_plans "
+                        "(subjects, hours_per_week, days_per_week, planner_mode, plan_data) "
+                        "VALUES (%s, %s, %s, %s, %s) RETURNING plan_id",
+                        (
+                            json.dumps(subjects),
+                            daily_hours * days_per_week,
+                            days_per_week,
+                            planner_mode,
+                            self._jsonb(plan_data),
+                        ),
+                    )
+                    plan_id = cur.fetchone()[0]
+
+                    # One COPY for every session of the plan
+                    with cur.copy(
+                        f"COPY study_sessions ({', '.join(SESSION_COLUMNS)}) FROM STDIN"
+                    ) as copy:
+                        for row in rows:
+                            copy.write_row((plan_id, *row))
+
+                    cur.execute(
+                        "INSERT INTO workflow_executions "
+                        "(plan_id, workflow_name, status, completed_at) "
+                        "VALUES (%s, %s, %s, CURRENT_TIMESTAMP)",
+                        (plan_id, WORKFLOW_NAME, "completed"),
+                    )
+        return plan_id
+
+    def get_plan(self, plan_id: int) -> Optional[Dict[str, Any]]:
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT plan_data FROM study_plans WHERE plan_id = %s", (plan_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_plan_record(self, plan_id: int) -> Optional[Dict[str, Any]]:
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT subjects, hours_per_week, days_per_week, planner_mode, plan_data "
+                "FROM study_plans WHERE plan_id = %s",
+                (plan_id,),
+            ).fetchone()
+        return _plan_record(*row) if row else None
+
+    def set_sessions_completed(
+        self, plan_id: int, session_ids: Sequence[int], completed: bool = True
+    ) -> int:
+        with self.pool.connection() as conn:
+            cur = conn.execute(
+                "UPDATE study_sessions SET completed = %s, "
+                "completed_at = CASE WHEN %s THEN CURRENT_TIMESTAMP END "
+                "WHERE plan_id = %s AND session_id = ANY(%s) "
+                "AND completed IS DISTINCT FROM %s",
+                (completed, completed, plan_id, list(session_ids), completed),
+            )
+            return cur.rowcount
+
+    def get_progress(self, plan_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                f"{PROGRESS_SELECT} WHERE p.plan_id = ANY(%s)", (list(plan_ids),)
+            ).fetchall()
+        return {row[0]: _progress_record(*row) for row in rows}
+
+    def get_sessions(self, plan_id: int) -> List[Dict[str, Any]]:
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                f"{SESSION_SELECT} WHERE plan_id = %s ORDER BY session_id", (plan_id,)
+            ).fetchall()
+        return [_session_record(*row) for row in rows]
+
+    def _session_batch(
+        self, plan_id: Optional[int], after: int, limit: int
+    ) -> List[Tuple[Any, ...]]:
+        query = f"{SESSION_EXPORT_SELECT} WHERE session_id > %s"
+        params: List[Any] = [after]
+        if plan_id is not None:
+            query += " AND plan_id = %s"
+            params.append(plan_id)
+        query += " ORDER BY session_id LIMIT %s"
+        params.append(limit)
+        with self.pool.connection() as conn:
+            return conn.execute(query, params).fetchall()
+
+    def list_plans(
+        self,
+        limit: int,
+        after: Optional[Tuple[str, int]] = None,
+        subject: Optional[str] = None,
+        fields: Sequence[Tuple[str, ...]] = (),
+    ) -> List[Dict[str, Any]]:
+        from datetime import datetime
+
+        keyset = "s" if subject is not None else "p"
+        columns = PLAN_SUMMARY_COLUMNS + "".join(", p.plan_data #> %s" for _ in fields)
+        params: List[Any] = [list(path) for path in fields]
+        if subject is not None:
+            query = (
+                f"SELECT {columns} FROM plan_subjects s "
+                "JOIN study_plans p ON p.plan_id = s.plan_id "
+                "LEFT JOIN plan_progress pp ON pp.plan_id = p.plan_id "
+                "WHERE s.subject_key = lower(trim(%s))"
+            )
+            params.append(subject)
+        else:
+            query = (
+                f"SELECT {columns} FROM study_plans p "
+                "LEFT JOIN plan_progress pp ON pp.plan_id = p.plan_id WHERE TRUE"
+            )
+        if after is not None:
+            query += f" AND ({keyset}.created_at, {keyset}.plan_id) < (%s, %s)"
+            params.extend([datetime.fromisoformat(after[0]), after[1]])
+        query += f" ORDER BY {keyset}.created_at DESC, {keyset}.plan_id DESC LIMIT %s"
+        params.append(limit)
+
+        with self.pool.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [_summary_record(row, fields, parse_json=False) for row in rows]
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+class SQLitePlanStore(PlanStore):
+    """SQLite stand-in with the same schema, for development and tests.
+
+    SQLite serializes writers anyway, so a single connection guarded by a
+    lock replaces the pool. Sessions are inserted with multi-row VALUES.
+    """
+
+    # Keep each statement under SQLite's default bound-parameter limit
+    ROWS_PER_STATEMENT = 100
+
+    def __init__(self, path: str = ":memory:") -> None:
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SQLITE_SCHEMA)
+        self._migrate()
+        self._lock = threading.Lock()
+
+    def _migrate(self) -> None:
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        with self._conn:
+            for statement in SQLITE_MIGRATIONS[version:]:
+                self._conn.execute(statement)
+            self._conn.execute(f"PRAGMA user_version = {len(SQLITE_MIGRATIONS)}")
+
+    def save_plan(
+        self,
+        subjects: List[str],
+        daily_hours: float,
+        days_per_week: int,
+        result: Dict[str, Any],
+        planner_mode: str = DEFAULT_PLANNER_MODE,
+    ) -> int:
+        plan_data = serialize_result(result)
+        rows = plan_to_rows(plan_data["plan"])
+
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO study_plans "
+                "(subjects, hours_per_week, days_per_week, planner_mode, plan_data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    json.dumps(subjects),
+                    daily_hours * days_per_week,
+                    days_per_week,
+                    planner_mode,
+                    json.dumps(plan_data),
+                ),
+            )
+            plan_id = cur.lastrowid
+
+            for chunk in _chunks(rows, self.ROWS_PER_STATEMENT):
+                placeholders = ", ".join(["(?, ?, ?, ?, ?, ?, ?)"] * len(chunk))
+                params: List[Any] = []
+                for row in chunk:
+                    params.append(plan_id)
+                    params.extend(row)
+                self._conn.execute(
+                    f"INSERT INTO study_sessions ({', '.join(SESSION_COLUMNS)}) "
+                    f"VALUES {placeholders}",
+                    params,
+                )
+
+            self._conn.execute(
+                "INSERT INTO workflow_executions "
+                "(plan_id, workflow_name, status, completed_at) "
+                "VALUES (?, ?, ?, CURRENT_TIMESTAMP)",
+                (plan_id, WORKFLOW_NAME, "completed"),
+            )
+        return plan_id
+
+    def get_plan(self, plan_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT plan_data FROM study_plans WHERE plan_id = ?", (plan_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_plan_record(self, plan_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT subjects, hours_per_week, days_per_week, planner_mode, plan_data "
+                "FROM study_plans WHERE plan_id = ?",
+                (plan_id,),
+            ).fetchone()
+        return _plan_record(*row) if row else None
+
+    def set_sessions_completed(
+        self, plan_id: int, session_ids: Sequence[int], completed: bool = True
+    ) -> int:
+        changed = 0
+        with self._lock, self._conn:
+            for chunk in _chunks(list(session_ids), self.ROWS_PER_STATEMENT):
+                placeholders = ", ".join(["?"] * len(chunk))
+                cur = self._conn.execute(
+                    "UPDATE study_sessions SET completed = ?, "
+                    "completed_at = CASE WHEN ? THEN CURRENT_TIMESTAMP END "
+                    f"WHERE plan_id = ? AND session_id IN ({placeholders}) "
+                    "AND COALESCE(completed, 0) != ?",
+                    (completed, completed, plan_id, *chunk, completed),
+                )
+                changed += cur.rowcount
+        return changed
+
+    def get_progress(self, plan_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+        progress: Dict[int, Dict[str, Any]] = {}
+        with self._lock:
+            for chunk in _chunks(list(plan_ids), self.ROWS_PER_STATEMENT):
+                placeholders = ", ".join(["?"] * len(chunk))
+                for row in self._conn.execute(
+                    f"{PROGRESS_SELECT} WHERE p.plan_id IN ({placeholders})", chunk
+                ):
+                    progress[row[0]] = _progress_record(*row)
+        return progress
+
+    def get_sessions(self, plan_id: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"{SESSION_SELECT} WHERE plan_id = ? ORDER BY session_id", (plan_id,)
+            ).fetchall()
+        return [_session_record(*row) for row in rows]
+
+    def _session_batch(
+        self, plan_id: Optional[int], after: int, limit: int
+    ) -> List[Tuple[Any, ...]]:
+        query = f"{SESSION_EXPORT_SELECT} WHERE session_id > ?"
+        params: List[Any] = [after]
+        if plan_id is not None:
+            query += " AND plan_id = ?"
+            params.append(plan_id)
+        query += " ORDER BY session_id LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def list_plans(
+        self,
+        limit: int,
+        after: Optional[Tuple[str, int]] = None,
+        subject: Optional[str] = None,
+        fields: Sequence[Tuple[str, ...]] = (),
+    ) -> List[Dict[str, Any]]:
+        keyset = "s" if subject is not None else "p"
+        columns = PLAN_SUMMARY_COLUMNS + "".join(
+            ", json_quote(json_extract(p.plan_data, ?))" for _ in fields
+        )
+        params: List[Any] = [_json_path(path) for path in fields]
+        if subject is not None:
+            query = (
+                f"SELECT {columns} FROM plan_subjects s "
+                "JOIN study_plans p ON p.plan_id = s.plan_id "
+                "LEFT JOIN plan_progress pp ON pp.plan_id = p.plan_id "
+                "WHERE s.subject_key = lower(trim(?))"
+            )
+            params.append(subject)
+        else:
+            query = (
+                f"SELECT {columns} FROM study_plans p "
+                "LEFT JOIN plan_progress pp ON pp.plan_id = p.plan_id WHERE 1"
+            )
+        if after is not None:
+            query += f" AND ({keyset}.created_at, {keyset}.plan_id) < (?, ?)"
+            params.extend(after)
+        query += f" ORDER BY {keyset}.created_at DESC, {keyset}.plan_id DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [_summary_record(row, fields, parse_json=True) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _json_path(path: Tuple[str, ...]) -> str:
+    """SQLite JSON path for a parse_fields path."""
+    return "$" + "".join(
+        f"[{segment}]" if segment.isdigit() else f'."{segment}"' for segment in path
+    )
+
+
+def _chunks(rows: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def create_plan_store(database_url: str) -> PlanStore:
+    """Create a store for ``postgresql://`` or ``sqlite:///`` URLs."""
+    if database_url.startswith(("postgresql://", "postgres://")):
+        return PostgresPlanStore(database_url)
+    if database_url.startswith("sqlite://"):
+        path = database_url[len("sqlite:///"):] or ":memory:"
+        return SQLitePlanStore(path)
+    raise ValueError(f"Unsupported DATABASE_URL scheme: {database_url.split(':', 1)[0]}")
+
+
+class PlanWriter:
+    """Writes plans on a background thread so callers never wait on I/O."""
+
+    def __init__(self, store: PlanStore, workers: int = 2) -> None:
+        self.store = store
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="plan-writer"
+        )
+
+    def submit(
+        self,
+        subjects: List[str],
+        daily_hours: float,
+        days_per_week: int,
+        result: Dict[str, Any],
+        planner_mode: str = DEFAULT_PLANNER_MODE,
+    ) -> Future:
+        """Queue a plan for storage and return a future for its plan_id."""
+        future = self._executor.submit(
+            self.store.save_plan, subjects, daily_hours, days_per_week, result, planner_mode
+        )
+        future.add_done_callback(_log_write_failure)
+        return future
+
+    def close(self) -> None:
+        """Flush pending writes and release the store."""
+        self._executor.shutdown(wait=True)
+        self.store.close()
+
+
+def _log_write_failure(future: Future) -> None:
+    error = future.exception()
+    if error is not None:
+        logger.error(f"Failed to persist study plan: {type(error).__name__}: {error}")
+
+
+_plan_writer: Optional[PlanWriter] = None
+_plan_writer_failed = False
+_plan_writer_lock = threading.Lock()
+
+
+def get_plan_writer() -> Optional[PlanWriter]:
+    """Return the process-wide writer, or None when persistence is off.
+
+    Persistence is off when DATABASE_URL is unset or the store could not
+    be created (the failure is logged once).
+    """
+    global _plan_writer, _plan_writer_failed
+    if _plan_writer is None and not _plan_writer_failed:
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            return None
+        with _plan_writer_lock:
+            if _plan_writer is None and not _plan_writer_failed:
+                try:
+                    _plan_writer = PlanWriter(create_plan_store(database_url))
+                except Exception as e:
+                    _plan_writer_failed = True
+                    logger.error(f"Plan persistence disabled: {str(e)}")
+    return _plan_writer
+
+
+def close_plan_writer() -> None:
+    """Flush and close the process-wide writer if it was started."""
+    global _plan_writer
+    with _plan_writer_lock:
+        if _plan_writer is not None:
+            _plan_writer.close()
+            _plan_writer = None
@@ -0,0 +1,376 @@
+"""Resource Catalog Module.
+
+Loads the curated subject catalog (``data/resource_catalog.json``) into
+an in-memory index: normalized subject names and aliases for exact
+lookup, a character trigram index for fuzzy lookup (with an edit-distance
+check for short names, so "Pyton" still finds Python), and a token index
+so "Intro to Python" still finds Python. The file is re-read when it
+changes on disk, so curating the catalog never needs a restart.
+"""
+
+from collections import Counter, defaultdict
+from itertools import chain, combinations
+from operator import itemgetter
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from services.metrics import REGISTRY, counter_lines, gauge_lines
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data",
+    "resource_catalog.json",
+)
+DEFAULT_CHECK_SECONDS = 2.0
+
+# Fuzzy matches below this trigram (Dice) similarity are ignored
+MIN_SIMILARITY = 0.55
+# One typo removes up to three of a short name's few trigrams, which sinks
+# it below MIN_SIMILARITY; names of this length are matched within
+# MAX_TYPOS edits (insertion, deletion, substitution or transposition)
+MIN_TYPO_KEY_LENGTH = 4
+MAX_TYPO_KEY_LENGTH = 12
+MAX_TYPOS = 1
+MAX_CACHED_LOOKUPS = 4096
+# Subjects with more words than this only use their first words for the
+# contained-key fallback (it tries every subset of the words)
+MAX_QUERY_TOKENS = 8
+
+_NON_WORD = re.compile(r"[\W_]+")
+_SYMBOLS = (("&", " and "), ("+", " plus "), ("#", " sharp "))
+
+
+def normalize_subject(name: str) -> str:
+    """Canonical lookup form: casefolded words separated by single spaces.
+
+    ``&``, ``+`` and ``#`` are spelled out so "C++", "C#" and "C" stay
+    distinct.
+    """
+    text = name.casefold()
+    for symbol, word in _SYMBOLS:
+        if symbol in text:
+            text = text.replace(symbol, word)
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def _trigrams(key: str) -> frozenset:
+    padded = f" {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, or ``limit + 1`` once it exceeds
+    ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+class ResourceCatalog:
+    """Immutable index over one version of the catalog file.
+
+    Attributes:
+        path: File the catalog was loaded from
+        stamp: (mtime_ns, size) of that file, used to detect changes
+        version: Short content digest, stable across processes
+        entries: Catalog entries as loaded (dicts with ``name``,
+            ``aliases``, ``links`` and optionally ``course``)
+    """
+
+    def __init__(
+        self,
+        entries: List[Dict[str, Any]],
+        path: str = "",
+        stamp: Optional[Tuple[int, int]] = None,
+        version: str = "empty",
+    ) -> None:
+        self.path = path
+        self.stamp = stamp
+        self.version = version
+        self.entries = entries
+
+        # Lookup keys (normalized names and aliases) -> entry index
+        self._exact: Dict[str, int] = {}
+        for index, entry in enumerate(entries):
+            for name in [entry["name"], *entry.get("aliases", ())]:
+                key = normalize_subject(name)
+                if not key:
+                    continue
+                owner = self._exact.setdefault(key, index)
+                if owner != index:
+                    logger.warning(
+                        f"Catalog key {key!r} of {entry['name']!r} already "
+                        f"belongs to {entries[owner]['name']!r}; ignored"
+                    )
+
+        self._keys = list(self._exact)
+        self._key_grams = [_trigrams(key) for key in self._keys]
+
+        self._grams: Dict[str, List[int]] = defaultdict(list)
+        for key_id, grams in enumerate(self._key_grams):
+            for gram in grams:
+                self._grams[gram].append(key_id)
+
+        # Word set -> longest key with exactly those words
+        self._token_sets: Dict[FrozenSet[str], int] = {}
+        for key_id, key in enumerate(self._keys):
+            tokens = frozenset(key.split())
+            current = self._token_sets.get(tokens)
+            if current is None or len(key) > len(self._keys[current]):
+                self._token_sets[tokens] = key_id
+
+        self._lookups: Dict[str, Optional[int]] = {}
+        self.stats = {"exact": 0, "fuzzy": 0, "token": 0, "miss": 0}
+
+    @classmethod
+    def load(cls, path: str) -> "ResourceCatalog":
+        """Read and index a catalog file.
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file is not a valid catalog
+        """
+        stat = os.stat(path)
+        with open(path, "rb") as handle:
+            raw = handle.read()
+        document = json.loads(raw)
+        entries = document.get("subjects") if isinstance(document, dict) else None
+        if not isinstance(entries, list):
+            raise ValueError(f"{path}: expected an object with a 'subjects' list")
+        for position, entry in enumerate(entries):
+            if not isinstance(entry, dict) or not isinstance(entry.get("name"), str):
+                raise ValueError(f"{path}: subject #{position} has no name")
+            links = entry.setdefault("links", [])
+            if not all(
+                isinstance(link, dict) and link.get("title") and link.get("url")
+                for link in links
+            ):
+                raise ValueError(f"{path}: subject {entry['name']!r} has an invalid link")
+        version = hashlib.sha256(raw).hexdigest()[:16]
+        return cls(entries, path, (stat.st_mtime_ns, stat.st_size), version)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def key_count(self) -> int:
+        return len(self._keys)
+
+    def lookup(self, subject: str) -> Optional[Dict[str, Any]]:
+        """Find the catalog entry for a subject name, or None.
+
+        Tries, in order: exact match on a normalized name or alias, the
+        most similar key by character trigrams, for short names a key
+        within ``MAX_TYPOS`` edits, and the longest key whose words all
+        appear in the subject. Results are cached per catalog.
+        """
+        key = normalize_subject(subject)
+        if key in self._lookups:
+            index = self._lookups[key]
+        else:
+            index = self._resolve(key)
+            if len(self._lookups) >= MAX_CACHED_LOOKUPS:
+                self._lookups.clear()
+            self._lookups[key] = index
+        return None if index is None else self.entries[index]
+
+    def _resolve(self, key: str) -> Optional[int]:
+        if not key:
+            return None
+
+        index = self._exact.get(key)
+        if index is not None:
+            self.stats["exact"] += 1
+            return index
+
+        grams = _trigrams(key)
+        postings = [self._grams[gram] for gram in grams if gram in self._grams]
+        shared = Counter(chain.from_iterable(postings))
+        key_id = self._most_similar(len(grams), shared)
+        if key_id is None:
+            key_id = self._closest_by_edits(key, shared)
+        if key_id is not None:
+            self.stats["fuzzy"] += 1
+            return self._exact[self._keys[key_id]]
+
+        key_id = self._longest_contained(key)
+        if key_id is not None:
+            self.stats["token"] += 1
+            return self._exact[self._keys[key_id]]
+
+        self.stats["miss"] += 1
+        return None
+
+    def _most_similar(self, size: int, shared: Counter) -> Optional[int]:
+        """Best key by trigram Dice similarity, if above MIN_SIMILARITY.
+
+        ``shared`` counts, per key, the query's ``size`` trigrams it
+        shares (tallied over the posting lists in one C-level pass). Keys
+        sharing too few trigrams to reach the threshold are dropped, and
+        the rest are scored in descending count order: a key sharing
+        ``c`` of the query's ``n`` trigrams scores at most
+        ``2c / (n + c)``, so the scan stops once that bound cannot beat
+        the best score so far.
+        """
+        floor = MIN_SIMILARITY * size / (2 - MIN_SIMILARITY)
+        viable = [item for item in shared.items() if item[1] > floor]
+        viable.sort(key=itemgetter(1), reverse=True)
+
+        key_grams = self._key_grams
+        best_id, best_score = None, MIN_SIMILARITY
+        for key_id, count in viable:
+            if 2.0 * count / (size + count) <= best_score:
+                break
+            score = 2.0 * count / (size + len(key_grams[key_id]))
+            if score > best_score:
+                best_id, best_score = key_id, score
+        return best_id
+
+    def _closest_by_edits(self, key: str, shared: Counter) -> Optional[int]:
+        """Short key within MAX_TYPOS edits of a short query, if any.
+
+        Only keys sharing a trigram with the query are candidates; ties go
+        to fewer edits, then more shared trigrams.
+        """
+        if not MIN_TYPO_KEY_LENGTH <= len(key) <= MAX_TYPO_KEY_LENGTH:
+            return None
+        best_id, best_rank = None, None
+        for key_id, count in shared.items():
+            candidate = self._keys[key_id]
+            if len(candidate) < MIN_TYPO_KEY_LENGTH:
+                continue
+            distance = _edit_distance(key, candidate, MAX_TYPOS)
+            if distance > MAX_TYPOS:
+                continue
+            rank = (distance, -count, key_id)
+            if best_rank is None or rank < best_rank:
+                best_id, best_rank = key_id, rank
+        return best_id
+
+    def _longest_contained(self, key: str) -> Optional[int]:
+        """Longest key whose words all appear in the subject."""
+        tokens = list(dict.fromkeys(key.split()))[:MAX_QUERY_TOKENS]
+        best_id, best_length = None, 0
+        for count in range(len(tokens), 0, -1):
+            for subset in combinations(tokens, count):
+                key_id = self._token_sets.get(frozenset(subset))
+                if key_id is not None and len(self._keys[key_id]) > best_length:
+                    best_id, best_length = key_id, len(self._keys[key_id])
+        return best_id
+
+
+_catalog: Optional[ResourceCatalog] = None
+_catalog_checked_at = 0.0
+_catalog_reloads = 0
+_catalog_lock = threading.Lock()
+
+
+def _catalog_path() -> str:
+    return os.getenv("RESOURCE_CATALOG_PATH") or DEFAULT_CATALOG_PATH
+
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def get_catalog() -> ResourceCatalog:
+    """Return the process-wide catalog, reloading it if the file changed.
+
+    The file is checked at most every RESOURCE_CATALOG_CHECK_SECONDS
+    (default 2s); between checks this is a global read. If a reload
+    fails the previous catalog stays in use (an empty one at startup).
+    """
+    global _catalog, _catalog_checked_at
+    catalog = _catalog
+    interval = float(os.getenv("RESOURCE_CATALOG_CHECK_SECONDS", DEFAULT_CHECK_SECONDS))
+    if catalog is not None and time.monotonic() - _catalog_checked_at < interval:
+        return catalog
+
+    with _catalog_lock:
+        if _catalog is None or time.monotonic() - _catalog_checked_at >= interval:
+            path = _catalog_path()
+            if _catalog is None or _catalog.path != path or _catalog.stamp != _file_stamp(path):
+                _load_catalog(path)
+            _catalog_checked_at = time.monotonic()
+        return _catalog
+
+
+def reload_catalog() -> ResourceCatalog:
+    """Re-read the catalog file now, regardless of its timestamp."""
+    global _catalog_checked_at
+    with _catalog_lock:
+        _load_catalog(_catalog_path())
+        _catalog_checked_at = time.monotonic()
+        return _catalog
+
+
+def _load_catalog(path: str) -> None:
+    """Swap in a freshly loaded catalog (caller holds the lock)."""
+    global _catalog, _catalog_reloads
+    started = time.perf_counter()
+    try:
+        catalog = ResourceCatalog.load(path)
+    except (OSError, ValueError) as e:
+        logger.error(f"Resource catalog not loaded from {path}: {str(e)}")
+        if _catalog is None:
+            _catalog = ResourceCatalog([], path, _file_stamp(path))
+        return
+    _catalog = catalog
+    _catalog_reloads += 1
+    logger.info(
+        f"Resource catalog loaded: {len(catalog)} subjects, {catalog.key_count} keys "
+        f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+    )
+
+
+def _collect_catalog_stats() -> List[str]:
+    catalog = _catalog
+    if catalog is None:
+        return []
+    size = {
+        "subjects": float(len(catalog)),
+        "keys": float(catalog.key_count),
+    }
+    totals = {
+        "reloads": float(_catalog_reloads),
+        **{f"lookups_{kind}": float(count) for kind, count in catalog.stats.items()},
+    }
+    return counter_lines(
+        "study_planner_resource_catalog",
+        "Resource catalog reloads and lookup outcomes (lookups reset on reload)",
+        totals,
+        "stat",
+    ) + gauge_lines(
+        "study_planner_resource_catalog",
+        "Resource catalog size",
+        size,
+        "stat",
+    )
+
+
+REGISTRY.register_collector(_collect_catalog_stats)
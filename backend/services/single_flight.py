@@ -0,0 +1,147 @@
+"""Single-flight coalescing of identical in-flight calls.
+
+When several callers ask for the same key at the same time, only the
+first (the leader) does the work; the rest (followers) wait for it and
+receive the leader's result or exception. Nothing is cached once the
+call completes -- that is the job of the caches in front of it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, TypeVar
+
+from services.metrics import REGISTRY
+
+T = TypeVar("T")
+
+_flights: List["_FlightStats"] = []
+
+
+class _FlightStats:
+    """Leader/follower counters shared by both flight implementations."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.leaders = 0
+        self.coalesced = 0
+        self._stats_lock = threading.Lock()
+        _flights.append(self)
+
+    def _count(self, leader: bool) -> None:
+        with self._stats_lock:
+            if leader:
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {"leaders": self.leaders, "coalesced": self.coalesced}
+
+
+class _Call(Generic[T]):
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(_FlightStats):
+    """Thread-based single-flight for synchronous callables."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self._calls: Dict[str, _Call[Any]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """Run ``fn`` once for all concurrent callers with the same ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+        self._count(leader)
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore[return-value]
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+
+class AsyncSingleFlight(_FlightStats):
+    """Event-loop single-flight for coroutines.
+
+    The shared work runs as its own task, so a caller that is cancelled
+    (e.g. its client disconnected) does not cancel it for the others.
+    When the last waiting caller is cancelled the task is cancelled too,
+    since nobody is left to receive its result.
+    """
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self._tasks: Dict[str, "asyncio.Future[Any]"] = {}
+        self._waiters: Dict["asyncio.Future[Any]", int] = {}
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """Await ``factory()`` once for all concurrent callers with ``key``."""
+        task = self._tasks.get(key)
+        leader = task is None or task.get_loop() is not asyncio.get_running_loop()
+        if leader:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        self._count(leader)
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1 and not task.done():
+                # Later callers must start afresh, not join a dying task
+                if self._tasks.get(key) is task:
+                    del self._tasks[key]
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def _forget(self, key: str, task: "asyncio.Future[Any]") -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark the exception retrieved when every waiter has gone away
+        if not task.cancelled():
+            task.exception()
+
+
+def _collect_flight_stats() -> List[str]:
+    name = "study_planner_single_flight_calls_total"
+    lines = [
+        f"# HELP {name} Calls that led (did the work) or were coalesced onto a leader",
+        f"# TYPE {name} counter",
+    ]
+    for flight in _flights:
+        for stat, value in flight.stats().items():
+            lines.append(f'{name}{{flight="{flight.name}",stat="{stat}"}} {value}')
+    return lines
+
+
+REGISTRY.register_collector(_collect_flight_stats)
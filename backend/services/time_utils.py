@@ -1,10 +1,21 @@
-"""Time utilities for building fixed-slot timetables."""
+"""Time utilities for building fixed-slot timetables.
+
+Times are handled as integer minutes (minute-of-day or minute-of-week);
+strings are parsed once on input and formatted through a lookup table,
+so slot arithmetic never touches ``datetime``.
+"""
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List, Tuple
 
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# "HH:MM" for every minute of the day, plus "24:00" for an end-of-day bound
+_HHMM = tuple(f"{m // 60:02d}:{m % 60:02d}" for m in range(MINUTES_PER_DAY + 1))
+
 
 def parse_hhmm(value: str) -> datetime:
     return datetime.strptime(value, "%H:%M")
@@ -14,6 +25,26 @@ def format_hhmm(dt: datetime) -> str:
     return dt.strftime("%H:%M")
 
 
+def parse_minutes(value: str) -> int:
+    """Parse ``"HH:MM"`` into minutes after midnight (``"24:00"`` allowed).
+
+    Raises:
+        ValueError: If the value is not a valid time of day
+    """
+    hours, sep, minutes = value.strip().partition(":")
+    if not sep or len(minutes) != 2 or not hours.isdigit() or not minutes.isdigit():
+        raise ValueError(f"Invalid time (expected HH:MM): {value!r}")
+    total = int(hours) * 60 + int(minutes)
+    if int(minutes) >= 60 or total > MINUTES_PER_DAY:
+        raise ValueError(f"Invalid time (expected HH:MM): {value!r}")
+    return total
+
+
+def format_minutes(minutes: int) -> str:
+    """Format minutes after midnight (0-1440) as ``"HH:MM"``."""
+    return _HHMM[minutes]
+
+
 def build_time_slots(
     start_time: str,
     daily_hours: float,
@@ -37,15 +68,14 @@ def build_time_slots(
     if slots_count <= 0:
         return []
 
-    start_dt = parse_hhmm(start_time)
+    cur = parse_minutes(start_time)
+    duration = slot_minutes / 60.0
     slots: List[Tuple[str, str, float]] = []
 
-    cur = start_dt
-    for i in range(slots_count):
-        end = cur + timedelta(minutes=slot_minutes)
-        slots.append((format_hhmm(cur), format_hhmm(end), slot_minutes / 60.0))
-        # add break after slot except the last
-        if i < slots_count - 1:
-            cur = end + timedelta(minutes=break_minutes)
+    for _ in range(slots_count):
+        end = cur + slot_minutes
+        # Slots running past midnight wrap, as datetime arithmetic did
+        slots.append((_HHMM[cur % MINUTES_PER_DAY], _HHMM[end % MINUTES_PER_DAY], duration))
+        cur = end + break_minutes
 
     return slots
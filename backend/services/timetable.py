@@ -0,0 +1,236 @@
+"""Weekly Timetable Module.
+
+Assigns each StudySession of a plan a concrete start/end time. The week
+is an integer minute grid (0 = Monday 00:00, 10080 = next Monday), and
+everything a session may not overlap - time outside each day's window,
+classes, sleep - is compiled once into an ``IntervalIndex`` of merged
+blocked intervals. Placement is then a bisect plus a short forward scan
+per session, with no datetime parsing.
+"""
+
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import logging
+
+from agents.planner_agent import (
+    CalendarDailyPlan,
+    DailyPlan,
+    PlannerAgent,
+    SessionType,
+    TimedCalendarDailyPlan,
+    TimedDailyPlan,
+    TimedStudySession,
+)
+from services.time_utils import (
+    MINUTES_PER_DAY,
+    MINUTES_PER_WEEK,
+    format_minutes,
+    parse_minutes,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DAY_INDEX = {day: index for index, day in enumerate(PlannerAgent.DAYS)}
+
+# (day name, "HH:MM" start, "HH:MM" end); end <= start runs past midnight
+BlockedTime = Tuple[str, str, str]
+
+
+class IntervalIndex:
+    """Sorted, merged ``[start, end)`` minute intervals with gap search."""
+
+    def __init__(self, intervals: Iterable[Tuple[int, int]]) -> None:
+        starts: List[int] = []
+        ends: List[int] = []
+        for start, end in sorted(i for i in intervals if i[1] > i[0]):
+            if ends and start <= ends[-1]:
+                if end > ends[-1]:
+                    ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+        self._starts = starts
+        self._ends = ends
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def intervals(self) -> List[Tuple[int, int]]:
+        return list(zip(self._starts, self._ends))
+
+    def is_free(self, start: int, end: int) -> bool:
+        """Whether ``[start, end)`` overlaps no interval."""
+        i = bisect_right(self._starts, start) - 1
+        if i >= 0 and self._ends[i] > start:
+            return False
+        i += 1
+        return i >= len(self._starts) or self._starts[i] >= end
+
+    def first_fit(self, start: int, length: int, limit: int) -> int:
+        """Earliest ``t >= start`` with ``[t, t + length)`` free and
+        ``t + length <= limit``, or -1 if there is none."""
+        starts = self._starts
+        ends = self._ends
+        count = len(starts)
+        i = bisect_right(starts, start) - 1
+        if i >= 0 and ends[i] > start:
+            start = ends[i]
+        i += 1
+        while start + length <= limit:
+            if i >= count or starts[i] >= start + length:
+                return start
+            start = ends[i]
+            i += 1
+        return -1
+
+
+class TimetableEngine:
+    """Places plans into a week with availability constraints.
+
+    The constructor parses and compiles the constraints once; ``place``
+    can then be called for any number of plans.
+    """
+
+    # Bound on the shared timed-session cache before it is reset
+    MAX_CACHED_SESSIONS = 4096
+
+    def __init__(
+        self,
+        day_start: str = "07:00",
+        day_end: str = "22:00",
+        days: Optional[Mapping[str, Optional[Tuple[str, str]]]] = None,
+        blocked: Sequence[BlockedTime] = (),
+        break_minutes: int = 10,
+    ) -> None:
+        """Compile availability into the blocked-interval index.
+
+        Args:
+            day_start: Default earliest start time ("HH:MM")
+            day_end: Default latest end time ("HH:MM", "24:00" allowed)
+            days: Per-day (start, end) overriding the default window;
+                None marks the day unavailable
+            blocked: Recurring weekly blocks such as classes or sleep
+            break_minutes: Gap left after each session
+
+        Raises:
+            ValueError: On malformed times, unknown days or an empty window
+        """
+        if break_minutes < 0:
+            raise ValueError("break_minutes must be non-negative")
+        self.break_minutes = break_minutes
+
+        default_window = (parse_minutes(day_start), parse_minutes(day_end))
+        windows = [default_window] * 7
+        for day, window in (days or {}).items():
+            index = self._day_index(day)
+            windows[index] = None if window is None else (
+                parse_minutes(window[0]), parse_minutes(window[1])
+            )
+
+        intervals: List[Tuple[int, int]] = []
+        for index, window in enumerate(windows):
+            base = index * MINUTES_PER_DAY
+            if window is None:
+                intervals.append((base, base + MINUTES_PER_DAY))
+                continue
+            start, end = window
+            if end <= start:
+                raise ValueError(f"Empty study window on {PlannerAgent.DAYS[index]}")
+            intervals.append((base, base + start))
+            intervals.append((base + end, base + MINUTES_PER_DAY))
+
+        for day, start_text, end_text in blocked:
+            base = self._day_index(day) * MINUTES_PER_DAY
+            start = base + parse_minutes(start_text)
+            end = base + parse_minutes(end_text)
+            if end <= start:
+                # Runs past midnight; Sunday night wraps to Monday morning
+                end += MINUTES_PER_DAY
+            if end > MINUTES_PER_WEEK:
+                intervals.append((0, end - MINUTES_PER_WEEK))
+                end = MINUTES_PER_WEEK
+            intervals.append((start, end))
+
+        self.index = IntervalIndex(intervals)
+        # (subject, type, duration, notes, start minute-of-day) -> timed copy
+        self._timed_sessions: Dict[
+            Tuple[str, SessionType, float, str, Optional[int]], TimedStudySession
+        ] = {}
+
+    @staticmethod
+    def _day_index(day: str) -> int:
+        index = DAY_INDEX.get(day.strip().capitalize())
+        if index is None:
+            raise ValueError(f"Unknown day: {day}")
+        return index
+
+    def place(self, plan: Sequence[DailyPlan]) -> Tuple[List[DailyPlan], int]:
+        """Assign start/end times to every session of ``plan``.
+
+        Sessions go in plan order, each at the earliest free time after
+        the previous one (plus the break), within the same day. Sessions
+        are shared between days by the planner, so timed copies are
+        returned and the input plan is left untouched. Timed copies are
+        immutable too, so they are cached on the engine and shared by
+        every plan that places the same session at the same time.
+
+        Args:
+            plan: Daily plans (weekly or calendar) to place
+
+        Returns:
+            Tuple of (timed plan as TimedDailyPlan/TimedCalendarDailyPlan,
+            number of sessions that did not fit; those have ``time_slot``
+            None)
+        """
+        index = self.index
+        brk = self.break_minutes
+        construct = TimedStudySession.model_construct
+        timed_cache = self._timed_sessions
+        if len(timed_cache) > self.MAX_CACHED_SESSIONS:
+            timed_cache.clear()
+        timed: List[DailyPlan] = []
+        unplaced = 0
+
+        for day in plan:
+            base = DAY_INDEX[day.day] * MINUTES_PER_DAY
+            limit = base + MINUTES_PER_DAY
+            cursor = base
+            sessions: List[TimedStudySession] = []
+            for session in day.sessions:
+                length = round(session.duration_hours * 60)
+                start = index.first_fit(cursor, length, limit)
+                if start < 0:
+                    unplaced += 1
+                    offset = None
+                else:
+                    cursor = start + length + brk
+                    offset = start - base
+                key = (
+                    session.subject, session.session_type, session.duration_hours,
+                    session.notes, offset,
+                )
+                placed = timed_cache.get(key)
+                if placed is None:
+                    placed = construct(
+                        subject=session.subject,
+                        session_type=session.session_type,
+                        duration_hours=session.duration_hours,
+                        notes=session.notes,
+                        time_slot=(
+                            None if offset is None
+                            else f"{format_minutes(offset)}-{format_minutes(offset + length)}"
+                        ),
+                    )
+                    timed_cache[key] = placed
+                sessions.append(placed)
+            timed_type = (
+                TimedCalendarDailyPlan if isinstance(day, CalendarDailyPlan) else TimedDailyPlan
+            )
+            timed.append(timed_type.model_construct(
+                _fields_set=day.model_fields_set, **{**day.__dict__, "sessions": sessions}
+            ))
+
+        if unplaced:
+            logger.info(f"Timetable: {unplaced} sessions did not fit the availability")
+        return timed, unplaced
@@ -0,0 +1,152 @@
+"""SQLitePlanStore round trips and trigger-maintained counters.
+
+Run from backend/: python -m pytest -q tests
+"""
+
+import sqlite3
+
+import pytest
+
+from services.persistence import SQLITE_SCHEMA, PlanStore, SQLitePlanStore
+
+
+def _result(*days):
+    """A workflow result with the given (day, [(subject, hours), ...]) days."""
+    return {
+        "plan": [
+            {
+                "day": day,
+                "sessions": [
+                    {
+                        "subject": subject,
+                        "session_type": "study",
+                        "duration_hours": hours,
+                        "notes": f"{subject} notes",
+                        "time_slot": None,
+                    }
+                    for subject, hours in sessions
+                ],
+            }
+            for day, sessions in days
+        ],
+        "resources": {},
+    }
+
+
+@pytest.fixture
+def store():
+    store = SQLitePlanStore()
+    yield store
+    store.close()
+
+
+def test_plan_store_is_abstract():
+    with pytest.raises(TypeError):
+        PlanStore()
+
+
+def test_save_plan_round_trip(store):
+    result = _result(
+        ("Monday", [("Python", 1.5), ("Math", 0.5)]),
+        ("Tuesday", [("Python", 2.0)]),
+    )
+    plan_id = store.save_plan(["Python", "Math"], 2.0, 2, result)
+
+    record = store.get_plan_record(plan_id)
+    assert record["subjects"] == ["Python", "Math"]
+    assert record["daily_hours"] == 2.0
+    assert record["days_per_week"] == 2
+    assert record["planner_mode"] == "cycle"
+    assert record["plan_data"]["plan"] == result["plan"]
+
+    sessions = store.get_sessions(plan_id)
+    assert [(s["day"], s["subject"], s["duration_hours"]) for s in sessions] == [
+        ("Monday", "Python", 1.5),
+        ("Monday", "Math", 0.5),
+        ("Tuesday", "Python", 2.0),
+    ]
+    assert not any(s["completed"] for s in sessions)
+    assert [s["session_id"] for s in store.iter_sessions(plan_id, batch_size=2)] == [
+        s["session_id"] for s in sessions
+    ]
+
+
+def test_planner_mode_is_stored(store):
+    plan_id = store.save_plan(["Python"], 1.0, 1, _result(), planner_mode="optimized")
+    assert store.get_plan_record(plan_id)["planner_mode"] == "optimized"
+
+
+def test_migrates_files_without_planner_mode(tmp_path):
+    path = str(tmp_path / "plans.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(SQLITE_SCHEMA)
+    conn.execute(
+        "INSERT INTO study_plans (subjects, hours_per_week, days_per_week, plan_data) "
+        "VALUES ('[\"Python\"]', 2.0, 1, '{\"plan\": []}')"
+    )
+    conn.execute("PRAGMA user_version = 2")
+    conn.commit()
+    conn.close()
+
+    store = SQLitePlanStore(path)
+    try:
+        assert store.get_plan_record(1)["planner_mode"] == "cycle"
+        plan_id = store.save_plan(["Math"], 1.0, 1, _result(), planner_mode="optimized")
+        assert store.get_plan_record(plan_id)["planner_mode"] == "optimized"
+    finally:
+        store.close()
+
+
+def test_list_plans_newest_first_and_by_subject(store):
+    first = store.save_plan(["Python"], 1.0, 1, _result(("Monday", [("Python", 1.0)])))
+    second = store.save_plan([" Math "], 1.0, 1, _result(("Monday", [("Math", 1.0)])))
+
+    listed = store.list_plans(limit=10)
+    assert [p["plan_id"] for p in listed] == [second, first]
+    assert listed[0]["total_sessions"] == 1
+
+    assert [p["plan_id"] for p in store.list_plans(limit=10, subject="MATH")] == [second]
+    assert [p["plan_id"] for p in store.list_plans(limit=10, subject="python")] == [first]
+
+    page = store.list_plans(limit=1)
+    after = (page[0]["created_at"], page[0]["plan_id"])
+    assert [p["plan_id"] for p in store.list_plans(limit=10, after=after)] == [first]
+
+
+def test_progress_counters_follow_session_updates(store):
+    plan_id = store.save_plan(
+        ["Python"], 3.0, 1, _result(("Monday", [("Python", 1.0), ("Python", 2.0)]))
+    )
+    progress = store.get_progress([plan_id])[plan_id]
+    assert progress["total_sessions"] == 2
+    assert progress["completed_sessions"] == 0
+    assert progress["total_hours"] == 3.0
+
+    first, second = (s["session_id"] for s in store.get_sessions(plan_id))
+    assert store.set_sessions_completed(plan_id, [second]) == 1
+    # Already complete: no change, counters must not move again
+    assert store.set_sessions_completed(plan_id, [second]) == 0
+
+    progress = store.get_progress([plan_id])[plan_id]
+    assert progress["completed_sessions"] == 1
+    assert progress["completed_hours"] == 2.0
+    assert progress["percent_complete"] == 50.0
+
+    assert store.set_sessions_completed(plan_id, [first, second], completed=False) == 1
+    progress = store.get_progress([plan_id])[plan_id]
+    assert progress["completed_sessions"] == 0
+    assert progress["completed_hours"] == 0.0
+
+
+def test_progress_of_unknown_and_empty_plans(store):
+    plan_id = store.save_plan(["Python"], 1.0, 1, _result())
+    assert store.get_progress([plan_id, plan_id + 1]) == {
+        plan_id: {
+            "plan_id": plan_id,
+            "total_sessions": 0,
+            "completed_sessions": 0,
+            "total_hours": 0.0,
+            "completed_hours": 0.0,
+            "percent_complete": 0.0,
+        }
+    }
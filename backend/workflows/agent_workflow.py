@@ -5,11 +5,15 @@ study plans with accompanying resources. Handles agent coordination,
 error handling, and result aggregation.
 """
 
-from typing import Dict, List, Any
+from datetime import date
+from typing import AsyncIterator, Dict, Iterator, List, Any, Optional, Tuple
+import asyncio
 import logging
 
 from agents.planner_agent import PlannerAgent, DailyPlan
 from agents.resource_agent import ResourceAgent, SubjectResources
+from services.metrics import timed
+from workflows.dag_executor import DAGExecutor, Stage, StageFailed
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -22,11 +26,19 @@ class AgentOrchestrator:
     study plans with curated learning resources.
     """
 
+    # Per-agent timeouts (seconds) for the async executor
+    STAGE_TIMEOUTS: Dict[str, float] = {
+        "planner": 5.0,
+        "resources": 5.0,
+        "outlines": 20.0,
+    }
+
     @staticmethod
     def run_workflow(
         subjects: List[str],
         daily_hours: float,
-        days_per_week: int
+        days_per_week: int,
+        planner_mode: str = PlannerAgent.MODE_CYCLE
     ) -> Dict[str, Any]:
         """Execute the complete study planning workflow.
         
@@ -40,6 +52,7 @@ class AgentOrchestrator:
             subjects: List of subjects to plan for
             daily_hours: Target study hours per day
             days_per_week: Number of days to study per week
+            planner_mode: "cycle" or "optimized" (see PlannerAgent.MODES)
             
         Returns:
             Dictionary containing plan and resources
@@ -49,7 +62,8 @@ class AgentOrchestrator:
             RuntimeError: If workflow execution fails
         """
         # Validate inputs
-        AgentOrchestrator._validate_inputs(subjects, daily_hours, days_per_week)
+        with timed("validation"):
+            AgentOrchestrator._validate_inputs(subjects, daily_hours, days_per_week)
 
         logger.info(
             f"Starting workflow: subjects={subjects}, "
@@ -59,16 +73,19 @@ class AgentOrchestrator:
         try:
             # Execute planner agent
             logger.debug("Executing Planner Agent...")
-            study_plan = PlannerAgent.generate_study_plan(
-                subjects=subjects,
-                daily_hours=daily_hours,
-                days_per_week=days_per_week
-            )
+            with timed("planner"):
+                study_plan = PlannerAgent.generate_study_plan(
+                    subjects=subjects,
+                    daily_hours=daily_hours,
+                    days_per_week=days_per_week,
+                    mode=planner_mode
+                )
             logger.debug(f"Planner Agent completed: {len(study_plan)} days generated")
 
             # Execute resource agent
             logger.debug("Executing Resource Agent...")
-            resources = ResourceAgent.generate_resources(subjects=subjects)
+            with timed("resources"):
+                resources = ResourceAgent.generate_resources(subjects=subjects)
             logger.debug(f"Resource Agent completed: {len(resources)} subjects processed")
 
             # Aggregate results
@@ -87,6 +104,388 @@ class AgentOrchestrator:
             logger.error(f"Unexpected error in workflow: {str(e)}", exc_info=True)
             raise RuntimeError(f"Workflow execution failed: {str(e)}") from e
 
+    @staticmethod
+    async def arun_workflow(
+        subjects: List[str],
+        daily_hours: float,
+        days_per_week: int,
+        include_outlines: bool = False,
+        timeouts: Optional[Dict[str, float]] = None,
+        outline_mode: str = "per_subject",
+        planner_mode: str = PlannerAgent.MODE_CYCLE,
+    ) -> Dict[str, Any]:
+        """Execute the workflow as an async dependency graph.
+        
+        The planner, resource and (optionally) content agents have no
+        dependencies on each other and start together; the final assembly
+        waits for all of them. Each agent has its own timeout. The content
+        stage is optional: if it fails or times out the plan is still
+        returned, with the failure listed under ``degraded``. Cancelling
+        the caller (e.g. on client disconnect) cancels every stage.
+        
+        Args:
+            subjects: List of subjects to plan for
+            daily_hours: Target study hours per day
+            days_per_week: Number of days to study per week
+            include_outlines: Also generate LLM outlines via ContentAgent
+            timeouts: Per-stage overrides of STAGE_TIMEOUTS
+            outline_mode: "per_subject" (one LLM call each) or "batched"
+                (one call for all subjects)
+            planner_mode: "cycle" or "optimized" (see PlannerAgent.MODES)
+            
+        Returns:
+            Dictionary containing plan and resources, plus ``outlines``,
+            ``outline_usage`` (mode, calls and tokens) and ``degraded``
+            when outlines were requested
+            
+        Raises:
+            ValueError: If input validation fails
+            RuntimeError: If a required stage fails or times out
+        """
+        with timed("validation"):
+            AgentOrchestrator._validate_inputs(subjects, daily_hours, days_per_week)
+
+        limits = {**AgentOrchestrator.STAGE_TIMEOUTS, **(timeouts or {})}
+
+        logger.info(
+            f"Starting async workflow: subjects={subjects}, "
+            f"daily_hours={daily_hours}, days_per_week={days_per_week}, "
+            f"include_outlines={include_outlines}"
+        )
+
+        def plan_stage(_: Dict[str, Any]) -> List[DailyPlan]:
+            with timed("planner"):
+                return PlannerAgent.generate_study_plan(
+                    subjects=subjects,
+                    daily_hours=daily_hours,
+                    days_per_week=days_per_week,
+                    mode=planner_mode
+                )
+
+        def resources_stage(_: Dict[str, Any]) -> Dict[str, SubjectResources]:
+            with timed("resources"):
+                return ResourceAgent.generate_resources(subjects=subjects)
+
+        usage = AgentOrchestrator._new_token_usage() if include_outlines else None
+
+        async def outlines_stage(_: Dict[str, Any]) -> Dict[str, Any]:
+            # Imported lazily: the content stage pulls in the LLM client
+            from agents.content_agent import ContentAgent
+
+            with timed("outlines"):
+                return await ContentAgent().agenerate_outlines(
+                    subjects, mode=outline_mode, usage=usage
+                )
+
+        def assemble_stage(inputs: Dict[str, Any]) -> Dict[str, Any]:
+            result = {
+                "plan": inputs["planner"],
+                "resources": inputs["resources"],
+            }
+            if include_outlines:
+                result["outlines"] = inputs["outlines"] or {}
+            return result
+
+        # The sync agents run in worker threads: an inline stage would block
+        # the loop (the optimizer runs a fixed search budget) and its timeout
+        # could never fire
+        stages = [
+            Stage("planner", plan_stage, timeout=limits["planner"], offload=True),
+            Stage("resources", resources_stage, timeout=limits["resources"], offload=True),
+        ]
+        assemble_deps = ["planner", "resources"]
+        if include_outlines:
+            stages.append(
+                Stage("outlines", outlines_stage, timeout=limits["outlines"], optional=True)
+            )
+            assemble_deps.append("outlines")
+        stages.append(Stage("assemble", assemble_stage, depends_on=assemble_deps))
+
+        try:
+            results, degraded = await DAGExecutor(stages).run()
+        except StageFailed as e:
+            logger.error(f"Async workflow failed: {str(e)}")
+            raise RuntimeError(f"Workflow execution failed: {str(e)}") from e
+
+        result = results["assemble"]
+        if include_outlines:
+            result["outline_usage"] = {"mode": outline_mode, **usage.as_dict()}
+            result["degraded"] = degraded
+
+        logger.info("Async workflow completed successfully")
+        return result
+
+    @staticmethod
+    def run_semester_workflow(
+        subjects: List[str],
+        daily_hours: float,
+        days_per_week: int,
+        weeks: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> Dict[str, Any]:
+        """Execute the workflow over a multi-week (semester) horizon.
+        
+        Same stages as ``run_workflow`` but the planner emits one dated
+        CalendarDailyPlan per study day across the whole horizon.
+        
+        Args:
+            subjects: List of subjects to plan for
+            daily_hours: Target study hours per day
+            days_per_week: Number of days to study per week
+            weeks: Horizon length in weeks
+            start_date: First day of the plan (default: today)
+            end_date: Last day of the plan, inclusive
+            
+        Returns:
+            Dictionary containing plan and resources
+            
+        Raises:
+            ValueError: If input validation fails
+            RuntimeError: If workflow execution fails
+        """
+        AgentOrchestrator._validate_inputs(subjects, daily_hours, days_per_week)
+
+        logger.info(
+            f"Starting semester workflow: subjects={subjects}, "
+            f"daily_hours={daily_hours}, days_per_week={days_per_week}, "
+            f"weeks={weeks}, start_date={start_date}, end_date={end_date}"
+        )
+
+        # Horizon errors are input errors, not workflow failures
+        study_plan = PlannerAgent.generate_semester_plan(
+            subjects=subjects,
+            daily_hours=daily_hours,
+            days_per_week=days_per_week,
+            weeks=weeks,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        logger.debug(f"Planner Agent completed: {len(study_plan)} days generated")
+
+        try:
+            resources = ResourceAgent.generate_resources(subjects=subjects)
+        except Exception as e:
+            logger.error(f"Unexpected error in semester workflow: {str(e)}", exc_info=True)
+            raise RuntimeError(f"Workflow execution failed: {str(e)}") from e
+
+        logger.info("Semester workflow completed successfully")
+        return {
+            "plan": study_plan,
+            "resources": resources,
+        }
+
+    @staticmethod
+    async def stream_workflow(
+        subjects: List[str],
+        daily_hours: float,
+        days_per_week: int,
+        include_outlines: bool = False,
+        outline_mode: str = "per_subject",
+        planner_mode: str = PlannerAgent.MODE_CYCLE,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Execute the workflow, yielding each result as soon as it is ready.
+
+        Emits records in this order:
+        1. ``{"type": "day", "data": DailyPlan}`` for every planned day
+        2. ``{"type": "resources", "subject": str, "data": SubjectResources}``
+        3. ``{"type": "summary", ...}`` with totals for the whole plan (and
+           ``outline_usage`` when outlines were requested)
+
+        When ``include_outlines`` is set, content generation starts before
+        the planner, and ``{"type": "outline", "subject": str, "data":
+        SubjectOutline}`` records (or ``"outline_error"`` with an ``error``
+        message) are interleaved in completion order as soon as each is
+        ready. Any still outstanding after the resources are sent before
+        the summary.
+
+        Input validation happens before the first record so callers can turn
+        a ValueError into a normal error response. Subjects are trimmed as
+        in ``canonicalize_inputs``. Planner/resource failures
+        after that are emitted as an ``{"type": "error"}`` record and end the
+        stream; content failures only produce ``outline_error`` records.
+
+        Args:
+            subjects: List of subjects to plan for
+            daily_hours: Target study hours per day
+            days_per_week: Number of days to study per week
+            include_outlines: Also generate LLM outlines via ContentAgent
+            outline_mode: "per_subject" or "batched" (see ``arun_workflow``)
+            planner_mode: "cycle" or "optimized" (see PlannerAgent.MODES)
+
+        Yields:
+            Workflow records as dictionaries
+
+        Raises:
+            ValueError: If input validation fails
+        """
+        AgentOrchestrator._validate_inputs(subjects, daily_hours, days_per_week)
+        # Same canonical names as /plan, in every record and outline key
+        canonical_subjects, daily_hours, days_per_week = (
+            AgentOrchestrator.canonicalize_inputs(subjects, daily_hours, days_per_week)
+        )
+        subjects = list(canonical_subjects)
+
+        logger.info(
+            f"Starting streamed workflow: subjects={subjects}, "
+            f"daily_hours={daily_hours}, days_per_week={days_per_week}, "
+            f"include_outlines={include_outlines}"
+        )
+
+        # Outlines are generated by a task started before the planner; its
+        # records are queued in completion order and end with None
+        usage = None
+        outline_queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+        outline_task: Optional["asyncio.Task[int]"] = None
+        if include_outlines:
+            usage = AgentOrchestrator._new_token_usage()
+            outline_task = asyncio.create_task(
+                AgentOrchestrator._queue_outlines(subjects, outline_mode, usage, outline_queue)
+            )
+
+        days = 0
+        sessions = 0
+        outlines = 0
+        try:
+            try:
+                plan_args = dict(
+                    subjects=subjects,
+                    daily_hours=daily_hours,
+                    days_per_week=days_per_week,
+                    mode=planner_mode
+                )
+                if planner_mode == PlannerAgent.MODE_OPTIMIZED:
+                    # The whole week comes out of one search; run it off the loop
+                    study_plan = await asyncio.to_thread(
+                        PlannerAgent.generate_study_plan, **plan_args
+                    )
+                else:
+                    study_plan = PlannerAgent.iter_study_plan(**plan_args)
+
+                for daily_plan in study_plan:
+                    days += 1
+                    sessions += len(daily_plan.sessions)
+                    yield {"type": "day", "data": daily_plan}
+                    for record in AgentOrchestrator._ready_outlines(outline_queue):
+                        yield record
+
+                for subject, subject_resources in ResourceAgent.iter_resources(subjects):
+                    yield {"type": "resources", "subject": subject, "data": subject_resources}
+                    for record in AgentOrchestrator._ready_outlines(outline_queue):
+                        yield record
+            except Exception as e:
+                logger.error(f"Unexpected error in streamed workflow: {str(e)}", exc_info=True)
+                yield {"type": "error", "error": f"Workflow execution failed: {str(e)}"}
+                return
+
+            if outline_task is not None:
+                while True:
+                    record = await outline_queue.get()
+                    if record is None:
+                        break
+                    yield record
+                outlines = await outline_task
+        finally:
+            # Reached early on a plan failure or when the client goes away
+            if outline_task is not None and not outline_task.done():
+                outline_task.cancel()
+
+        logger.info("Streamed workflow completed successfully")
+        summary = {
+            "type": "summary",
+            "subjects": subjects,
+            "days": days,
+            "sessions": sessions,
+            "total_hours": daily_hours * days,
+            "outlines": outlines,
+        }
+        if usage is not None:
+            summary["outline_usage"] = {"mode": outline_mode, **usage.as_dict()}
+        yield summary
+
+    @staticmethod
+    async def _queue_outlines(
+        subjects: List[str],
+        outline_mode: str,
+        usage: Any,
+        queue: "asyncio.Queue[Optional[Dict[str, Any]]]",
+    ) -> int:
+        """Put outline records on ``queue`` in completion order, then ``None``.
+
+        Outlines are optional: a content failure becomes an
+        ``outline_error`` record, never an exception, so the plan is still
+        complete and the summary is still sent.
+
+        Returns:
+            Number of outlines generated
+        """
+        generated = 0
+        try:
+            # Imported lazily: the content stage pulls in the LLM client
+            from agents.content_agent import ContentAgent
+
+            async for subject, outline in ContentAgent().aiter_outlines(
+                subjects, mode=outline_mode, usage=usage
+            ):
+                if isinstance(outline, BaseException):
+                    queue.put_nowait({
+                        "type": "outline_error",
+                        "subject": subject,
+                        "error": f"{type(outline).__name__}: {outline}",
+                    })
+                else:
+                    generated += 1
+                    queue.put_nowait({"type": "outline", "subject": subject, "data": outline})
+        except Exception as e:
+            logger.warning(f"Content stage failed in streamed workflow: {str(e)}")
+            queue.put_nowait({"type": "outline_error", "subject": None, "error": str(e)})
+        queue.put_nowait(None)
+        return generated
+
+    @staticmethod
+    def _ready_outlines(
+        queue: "asyncio.Queue[Optional[Dict[str, Any]]]",
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield the outline records already queued, leaving the end marker."""
+        while not queue.empty():
+            record = queue.get_nowait()
+            if record is None:
+                queue.put_nowait(None)
+                return
+            yield record
+
+    @staticmethod
+    def _new_token_usage() -> Any:
+        # Imported lazily like ContentAgent: it pulls in the LLM client
+        from services.ai_client import TokenUsage
+
+        return TokenUsage()
+
+    @staticmethod
+    def canonicalize_inputs(
+        subjects: List[str],
+        daily_hours: float,
+        days_per_week: int
+    ) -> Tuple[Tuple[str, ...], float, int]:
+        """Normalize workflow inputs so equivalent requests compare equal.
+
+        Subjects are trimmed but keep their order (it drives the planner's
+        subject rotation); hours become a float and days an int.
+
+        Args:
+            subjects: List of subjects
+            daily_hours: Daily study hours
+            days_per_week: Days per week to study
+
+        Returns:
+            Hashable (subjects, daily_hours, days_per_week) tuple
+        """
+        return (
+            tuple(s.strip() if isinstance(s, str) else s for s in subjects),
+            float(daily_hours),
+            int(days_per_week),
+        )
+
     @staticmethod
     def _validate_inputs(
         subjects: List[str],
@@ -0,0 +1,130 @@
+"""Batch Workflow Module.
+
+Runs the study planning workflow for many inputs at once. Identical
+inputs are canonicalized and computed only once, and the unique inputs
+are spread across a process pool so large onboarding jobs use every core.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import os
+import threading
+import time
+
+from services.llm_scheduler import Priority, llm_priority
+from workflows.agent_workflow import AgentOrchestrator
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CanonicalInputs = Tuple[Tuple[str, ...], float, int]
+
+# Below this many unique inputs the pool's pickling overhead outweighs the
+# parallelism, so the batch runs in-process instead.
+INLINE_THRESHOLD = int(os.getenv("PLAN_BATCH_INLINE_THRESHOLD", "16"))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _pool_size() -> int:
+    """Number of pool workers (PLAN_BATCH_WORKERS, default: CPU count)."""
+    return int(os.getenv("PLAN_BATCH_WORKERS", "0")) or os.cpu_count() or 1
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Return the shared process pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = _pool_size()
+                logger.info(f"Starting batch process pool with {workers} workers")
+                _executor = ProcessPoolExecutor(max_workers=workers)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Shut down the shared process pool if it was started."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _run_one(inputs: CanonicalInputs) -> Dict[str, Any]:
+    """Run one canonical input and return a picklable outcome.
+
+    Executed inside pool workers, so results are plain dicts rather than
+    pydantic models and errors are reported instead of raised. Any LLM
+    calls made here queue in the batch lane, behind interactive requests.
+    """
+    subjects, daily_hours, days_per_week = inputs
+    try:
+        with llm_priority(Priority.BATCH):
+            result = AgentOrchestrator.run_workflow(
+                subjects=list(subjects),
+                daily_hours=daily_hours,
+                days_per_week=days_per_week
+            )
+    except ValueError as e:
+        return {"status": "error", "error_type": "validation", "error": str(e)}
+    except Exception as e:
+        return {"status": "error", "error_type": "workflow", "error": str(e)}
+
+    return {
+        "status": "ok",
+        "result": {
+            "plan": [day.model_dump(mode="json") for day in result["plan"]],
+            "resources": {
+                subject: res.model_dump(mode="json")
+                for subject, res in result["resources"].items()
+            },
+        },
+    }
+
+
+def run_batch(items: List[Tuple[List[str], float, int]]) -> Dict[str, Any]:
+    """Execute the workflow for every item, deduplicating identical inputs.
+
+    Args:
+        items: (subjects, daily_hours, days_per_week) per input, in order
+
+    Returns:
+        Dictionary with per-item ``results`` (input order, each with
+        ``index``, ``status`` and either ``result`` or ``error``) and batch
+        statistics including ``items_per_second``
+    """
+    started = time.perf_counter()
+
+    keys = [AgentOrchestrator.canonicalize_inputs(*item) for item in items]
+    unique_keys = list(dict.fromkeys(keys))
+
+    logger.info(f"Batch workflow: {len(items)} items, {len(unique_keys)} unique")
+
+    if len(unique_keys) <= INLINE_THRESHOLD:
+        outcomes = [_run_one(key) for key in unique_keys]
+    else:
+        chunksize = max(1, len(unique_keys) // (_pool_size() * 4))
+        outcomes = list(_get_executor().map(_run_one, unique_keys, chunksize=chunksize))
+
+    by_key = dict(zip(unique_keys, outcomes))
+    results = [{"index": i, **by_key[key]} for i, key in enumerate(keys)]
+
+    elapsed = time.perf_counter() - started
+    failed = sum(1 for r in results if r["status"] != "ok")
+    logger.info(
+        f"Batch workflow completed: {len(items)} items in {elapsed:.3f}s "
+        f"({failed} failed)"
+    )
+
+    return {
+        "results": results,
+        "total_items": len(items),
+        "unique_items": len(unique_keys),
+        "failed_items": failed,
+        "elapsed_seconds": elapsed,
+        "items_per_second": len(items) / elapsed if elapsed > 0 else float(len(items)),
+    }
@@ -0,0 +1,159 @@
+"""Async DAG Executor Module.
+
+Runs workflow stages as a dependency graph on the event loop. Stages
+without unmet dependencies start immediately and run concurrently; a
+stage starts as soon as all of its inputs are ready. Each stage has its
+own timeout, and optional stages degrade to ``None`` instead of failing
+the whole run.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+import asyncio
+import inspect
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+StageFunc = Callable[[Dict[str, Any]], Union[Any, Awaitable[Any]]]
+
+
+class StageFailed(RuntimeError):
+    """Raised when a required stage fails or times out."""
+
+    def __init__(self, stage: str, error: BaseException) -> None:
+        self.stage = stage
+        self.error = error
+        super().__init__(f"Stage '{stage}' failed: {type(error).__name__}: {error}")
+
+
+class Stage:
+    """A single node of the workflow graph.
+
+    Attributes:
+        name: Unique stage name; its result is passed to dependents under it
+        func: Callable receiving ``{dependency name: result}``; may be async
+        depends_on: Names of stages whose results this stage needs
+        timeout: Seconds before the stage is abandoned (None: no limit)
+        optional: On failure/timeout yield ``None`` instead of failing the run
+        offload: Run a sync ``func`` in a worker thread instead of inline.
+            Inline stages should be short CPU work; timeouts cannot
+            interrupt them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: StageFunc,
+        depends_on: Iterable[str] = (),
+        timeout: Optional[float] = None,
+        optional: bool = False,
+        offload: bool = False,
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.timeout = timeout
+        self.optional = optional
+        self.offload = offload
+
+
+class DAGExecutor:
+    """Executes a set of stages respecting their dependencies."""
+
+    def __init__(self, stages: List[Stage]) -> None:
+        """Validate the graph.
+
+        Raises:
+            ValueError: On duplicate names, unknown dependencies or cycles
+        """
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+
+        for stage in stages:
+            for dep in stage.depends_on:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+        self._check_acyclic()
+
+    def _check_acyclic(self) -> None:
+        visiting: set = set()
+        done: set = set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through stage '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    async def run(self) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Run every stage.
+
+        Returns:
+            Tuple of (results by stage name, errors of optional stages
+            that degraded to None)
+
+        Raises:
+            StageFailed: If a required stage fails or times out; all
+                other stages are cancelled
+        """
+        tasks: Dict[str, "asyncio.Task[Any]"] = {}
+        degraded: Dict[str, str] = {}
+
+        async def run_stage(stage: Stage) -> Any:
+            inputs = {dep: await tasks[dep] for dep in stage.depends_on}
+            try:
+                return await asyncio.wait_for(self._call(stage, inputs), timeout=stage.timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    e = asyncio.TimeoutError(f"timed out after {stage.timeout}s")
+                if stage.optional:
+                    logger.warning(f"Optional stage '{stage.name}' degraded: {type(e).__name__}: {e}")
+                    degraded[stage.name] = f"{type(e).__name__}: {e}"
+                    return None
+                raise StageFailed(stage.name, e) from e
+
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.ensure_future(run_stage(stage))
+
+        try:
+            done, pending = await asyncio.wait(
+                tasks.values(), return_when=asyncio.FIRST_EXCEPTION
+            )
+            for task in done:
+                error = task.exception()
+                if error is not None:
+                    raise error
+        finally:
+            # Also reached when the caller is cancelled (e.g. client disconnect)
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # Dependents re-raise the first failure; it was raised above
+                    task.exception()
+
+        return {name: task.result() for name, task in tasks.items()}, degraded
+
+    @staticmethod
+    async def _call(stage: Stage, inputs: Dict[str, Any]) -> Any:
+        if stage.offload and not inspect.iscoroutinefunction(stage.func):
+            return await asyncio.to_thread(stage.func, inputs)
+        result = stage.func(inputs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
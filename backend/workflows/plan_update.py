@@ -0,0 +1,232 @@
+"""Incremental Plan Update Module.
+
+Applies a small edit (add/remove/rename subjects, change hours or days)
+to an existing plan without regenerating everything: resources and LLM
+outlines are reused for unchanged subjects, the planner rebuilds only
+the days whose sessions differ, and a compact diff describes the change.
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+import logging
+
+from agents.planner_agent import DailyPlan, PlannerAgent
+from agents.resource_agent import ResourceAgent, SubjectResources
+from services.metrics import timed
+from workflows.agent_workflow import AgentOrchestrator
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def apply_delta(
+    subjects: List[str],
+    daily_hours: float,
+    days_per_week: int,
+    add_subjects: Sequence[str] = (),
+    remove_subjects: Sequence[str] = (),
+    rename_subjects: Optional[Mapping[str, str]] = None,
+    hours: Optional[float] = None,
+    new_days_per_week: Optional[int] = None,
+) -> Tuple[List[str], float, int]:
+    """Apply an edit to plan inputs.
+
+    Renamed subjects keep their position; added subjects go to the end.
+
+    Args:
+        subjects: Current subjects
+        daily_hours: Current daily hours
+        days_per_week: Current days per week
+        add_subjects: Subjects to append
+        remove_subjects: Subjects to drop
+        rename_subjects: Old name -> new name
+        hours: New daily hours (None: unchanged)
+        new_days_per_week: New days per week (None: unchanged)
+
+    Returns:
+        Tuple of (subjects, daily_hours, days_per_week) after the edit
+
+    Raises:
+        ValueError: If the edit refers to unknown subjects, creates
+            duplicates or produces invalid inputs
+    """
+    current = [s.strip() for s in subjects]
+    renames = {old.strip(): new.strip() for old, new in (rename_subjects or {}).items()}
+    removals = {s.strip() for s in remove_subjects}
+
+    for name in list(removals) + list(renames):
+        if name not in current:
+            raise ValueError(f"Unknown subject in delta: {name}")
+
+    updated = [renames.get(s, s) for s in current if s not in removals]
+    for subject in add_subjects:
+        subject = subject.strip()
+        if subject in updated:
+            raise ValueError(f"Subject already in plan: {subject}")
+        updated.append(subject)
+
+    if len(set(updated)) != len(updated):
+        raise ValueError("Delta produces duplicate subjects")
+
+    new_hours = daily_hours if hours is None else hours
+    new_days = days_per_week if new_days_per_week is None else new_days_per_week
+    AgentOrchestrator._validate_inputs(updated, new_hours, new_days)
+    return updated, float(new_hours), int(new_days)
+
+
+def _compact_day(day: DailyPlan) -> Dict[str, Any]:
+    return {
+        "day": day.day,
+        "sessions": [
+            [s.subject, getattr(s.session_type, "value", s.session_type), s.duration_hours]
+            for s in day.sessions
+        ],
+    }
+
+
+async def update_plan(
+    previous: Dict[str, Any],
+    subjects: List[str],
+    daily_hours: float,
+    days_per_week: int,
+    delta: Dict[str, Any],
+    include_outlines: bool = False,
+    planner_mode: str = PlannerAgent.MODE_CYCLE,
+) -> Dict[str, Any]:
+    """Apply ``delta`` to a previous workflow result.
+
+    Args:
+        previous: Previous result with ``plan``, ``resources`` and
+            optionally ``outlines``
+        subjects: Subjects the previous plan was built for
+        daily_hours: Daily hours of the previous plan
+        days_per_week: Days per week of the previous plan
+        delta: Keyword arguments for ``apply_delta`` (``add_subjects``,
+            ``remove_subjects``, ``rename_subjects``, ``hours``,
+            ``new_days_per_week``)
+        include_outlines: Generate outlines for subjects that have none
+            (previous outlines are always reused)
+        planner_mode: Planner allocation mode the previous plan was built
+            with; the new plan is built the same way
+
+    Returns:
+        Dictionary with the new ``subjects``, ``daily_hours``,
+        ``days_per_week``, ``planner_mode``, ``plan``, ``resources``,
+        ``outlines`` (or None) and a compact ``diff``
+
+    Raises:
+        ValueError: If the delta is invalid
+    """
+    # Same canonical names as /plan, so trimmed subjects count as kept
+    canonical_subjects, daily_hours, days_per_week = (
+        AgentOrchestrator.canonicalize_inputs(subjects, daily_hours, days_per_week)
+    )
+    subjects = list(canonical_subjects)
+    new_subjects, new_hours, new_days = apply_delta(
+        subjects, daily_hours, days_per_week, **delta
+    )
+    kept = set(subjects)
+
+    with timed("planner"):
+        plan, rebuilt = PlannerAgent.update_study_plan(
+            previous["plan"], new_subjects, new_hours, new_days, planner_mode
+        )
+
+    old_resources: Mapping[str, SubjectResources] = previous.get("resources") or {}
+    reused_resources = [s for s in new_subjects if s in kept and s in old_resources]
+    generated_resources = [s for s in new_subjects if s not in reused_resources]
+    with timed("resources"):
+        fresh = ResourceAgent.generate_resources(generated_resources) if generated_resources else {}
+    resources = {
+        s: old_resources[s] if s in reused_resources else fresh[s]
+        for s in new_subjects
+        if s in reused_resources or s in fresh
+    }
+
+    old_outlines: Mapping[str, Any] = previous.get("outlines") or {}
+    outlines: Optional[Dict[str, Any]] = None
+    outline_diff: Optional[Dict[str, Any]] = None
+    if old_outlines or include_outlines:
+        outlines = {s: old_outlines[s] for s in new_subjects if s in kept and s in old_outlines}
+        missing = [s for s in new_subjects if s not in outlines]
+        generated: Dict[str, Any] = {}
+        if include_outlines and missing:
+            # Imported lazily: the content stage pulls in the LLM client
+            from agents.content_agent import ContentAgent
+
+            with timed("outlines"):
+                generated = await ContentAgent().agenerate_outlines(missing)
+        outlines.update(generated)
+        outlines = {s: outlines[s] for s in new_subjects if s in outlines}
+        outline_diff = {
+            "reused": [s for s in new_subjects if s in kept and s in old_outlines],
+            "generated": list(generated),
+            "missing": [s for s in new_subjects if s not in outlines],
+        }
+
+    diff = _build_diff(
+        (subjects, daily_hours, days_per_week),
+        (new_subjects, new_hours, new_days),
+        previous["plan"],
+        plan,
+        rebuilt,
+        reused_resources,
+        generated_resources,
+        delta.get("rename_subjects") or {},
+    )
+    if outline_diff is not None:
+        diff["outlines"] = outline_diff
+
+    logger.info(
+        f"Plan updated: {len(rebuilt)}/{len(plan)} days rebuilt, "
+        f"{len(generated_resources)} resource sets generated"
+    )
+    return {
+        "subjects": new_subjects,
+        "daily_hours": new_hours,
+        "days_per_week": new_days,
+        "planner_mode": planner_mode,
+        "plan": plan,
+        "resources": resources,
+        "outlines": outlines,
+        "diff": diff,
+    }
+
+
+def _build_diff(
+    old_inputs: Tuple[List[str], float, int],
+    new_inputs: Tuple[List[str], float, int],
+    old_plan: Sequence[DailyPlan],
+    new_plan: Sequence[DailyPlan],
+    rebuilt: List[int],
+    reused_resources: List[str],
+    generated_resources: List[str],
+    renames: Mapping[str, str],
+) -> Dict[str, Any]:
+    """Describe what changed; unchanged parts are only counted."""
+    old_subjects, old_hours, old_days = old_inputs
+    new_subjects, new_hours, new_days = new_inputs
+    renamed = {old.strip(): new.strip() for old, new in renames.items()}
+
+    inputs: Dict[str, Any] = {}
+    added = [s for s in new_subjects if s not in old_subjects and s not in renamed.values()]
+    removed = [s for s in old_subjects if s not in new_subjects and s not in renamed]
+    if added or removed or renamed:
+        inputs["subjects"] = {"added": added, "removed": removed, "renamed": renamed}
+    if float(old_hours) != new_hours:
+        inputs["daily_hours"] = {"from": float(old_hours), "to": new_hours}
+    if int(old_days) != new_days:
+        inputs["days_per_week"] = {"from": int(old_days), "to": new_days}
+
+    return {
+        "inputs": inputs,
+        "days": {
+            "changed": [_compact_day(new_plan[i]) for i in rebuilt],
+            "removed": [day.day for day in old_plan[len(new_plan):]],
+            "unchanged": len(new_plan) - len(rebuilt),
+        },
+        "resources": {
+            "reused": len(reused_resources),
+            "generated": generated_resources,
+            "removed": [s for s in old_subjects if s not in new_subjects],
+        },
+    }
@@ -0,0 +1,251 @@
+"""Workflow Memoization Module.
+
+The planner and resource stages are deterministic for a given
+(subjects, daily_hours, days_per_week) and resource catalog version, so
+their results are memoized on the canonical form of those inputs. The
+same canonical form yields a stable ETag, letting HTTP clients
+revalidate with If-None-Match. The optimized planner mode is keyed
+separately; its search is bounded by iterations, not time, so it is as
+deterministic as the cycle planner.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from services.metrics import REGISTRY, counter_lines, gauge_lines
+from services.resource_catalog import get_catalog
+from agents.planner_agent import PlannerAgent
+from services.single_flight import AsyncSingleFlight, SingleFlight
+from workflows.agent_workflow import AgentOrchestrator
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bump whenever planner/resource output changes for the same inputs so
+# clients holding an old ETag refetch instead of getting a stale 304.
+PLAN_CACHE_VERSION = "3"
+
+DEFAULT_MEMO_SIZE = 1024
+
+
+def workflow_cache_key(
+    subjects: List[str],
+    daily_hours: float,
+    days_per_week: int,
+    planner_mode: str = PlannerAgent.MODE_CYCLE
+) -> str:
+    """Return a stable hex digest for the canonical workflow inputs.
+
+    Args:
+        subjects: List of subjects
+        daily_hours: Daily study hours
+        days_per_week: Days per week
+        planner_mode: Planner allocation mode
+
+    Returns:
+        SHA-256 hex digest of the canonical inputs
+    """
+    canonical = AgentOrchestrator.canonicalize_inputs(subjects, daily_hours, days_per_week)
+    # Resources come from the catalog, so a catalog reload is a new version
+    parts = [PLAN_CACHE_VERSION, *canonical, get_catalog().version]
+    # Cycle-mode keys (and ETags) stay as they were before modes existed
+    if planner_mode != PlannerAgent.MODE_CYCLE:
+        parts.append(planner_mode)
+    payload = json.dumps(parts, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def make_etag(cache_key: str) -> str:
+    """Format a cache key as a strong ETag header value."""
+    return f'"{cache_key[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class WorkflowMemo:
+    """Thread-safe LRU of workflow results keyed on canonical inputs.
+
+    Alongside each result it can hold the serialized response body, so
+    repeat requests skip serialization as well as the workflow.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MEMO_SIZE) -> None:
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._bodies: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._data.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data[key] = result
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                evicted, _ = self._data.popitem(last=False)
+                self._bodies.pop(evicted, None)
+
+    def get_body(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._bodies.get(key)
+
+    def set_body(self, key: str, body: bytes) -> None:
+        with self._lock:
+            # Only keep bodies for results that are still memoized
+            if key in self._data:
+                self._bodies[key] = body
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bodies.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._data)}
+
+
+workflow_memo = WorkflowMemo(int(os.getenv("WORKFLOW_MEMO_SIZE", DEFAULT_MEMO_SIZE)))
+
+
+def _collect_memo_stats() -> List[str]:
+    stats = workflow_memo.stats()
+    entries = {"entries": stats.pop("entries")}
+    return counter_lines(
+        "study_planner_workflow_memo",
+        "Workflow memoization hits and misses",
+        stats,
+        "stat",
+    ) + gauge_lines(
+        "study_planner_workflow_memo",
+        "Workflow memoization size",
+        entries,
+        "stat",
+    )
+
+
+REGISTRY.register_collector(_collect_memo_stats)
+
+# Concurrent identical requests share one in-flight computation
+_workflow_flight = SingleFlight("workflow")
+_workflow_async_flight = AsyncSingleFlight("workflow_async")
+
+
+def run_workflow_memoized(
+    subjects: List[str],
+    daily_hours: float,
+    days_per_week: int,
+    planner_mode: str = PlannerAgent.MODE_CYCLE
+) -> Tuple[str, Dict[str, Any]]:
+    """Execute the workflow, reusing a memoized result when available.
+
+    The workflow runs on the canonical inputs, so equivalent requests
+    (e.g. differing only in surrounding whitespace) share one result.
+    Concurrent identical misses are coalesced into one computation.
+    Memoized results are shared between callers and must not be mutated.
+
+    Args:
+        subjects: List of subjects
+        daily_hours: Daily study hours
+        days_per_week: Days per week
+        planner_mode: Planner allocation mode
+
+    Returns:
+        Tuple of (cache key, dictionary with plan and resources)
+
+    Raises:
+        ValueError: If input validation fails
+        RuntimeError: If workflow execution fails
+    """
+    key = workflow_cache_key(subjects, daily_hours, days_per_week, planner_mode)
+    result = workflow_memo.get(key)
+    if result is not None:
+        logger.debug(f"Workflow memo hit: {key[:12]}")
+        return key, result
+
+    canonical_subjects, canonical_hours, canonical_days = (
+        AgentOrchestrator.canonicalize_inputs(subjects, daily_hours, days_per_week)
+    )
+
+    def compute() -> Dict[str, Any]:
+        computed = AgentOrchestrator.run_workflow(
+            subjects=list(canonical_subjects),
+            daily_hours=canonical_hours,
+            days_per_week=canonical_days,
+            planner_mode=planner_mode
+        )
+        workflow_memo.set(key, computed)
+        return computed
+
+    return key, _workflow_flight.do(key, compute)
+
+
+async def arun_workflow_memoized(
+    subjects: List[str],
+    daily_hours: float,
+    days_per_week: int,
+    planner_mode: str = PlannerAgent.MODE_CYCLE
+) -> Tuple[str, Dict[str, Any]]:
+    """Async counterpart of ``run_workflow_memoized``.
+
+    Runs misses through ``AgentOrchestrator.arun_workflow`` so the caller
+    never occupies a threadpool thread. Concurrent identical misses share
+    one task; a cancelled caller does not cancel it for the others, but
+    the task is cancelled once every caller has been.
+
+    Returns:
+        Tuple of (cache key, dictionary with plan and resources)
+
+    Raises:
+        ValueError: If input validation fails
+        RuntimeError: If workflow execution fails
+    """
+    key = workflow_cache_key(subjects, daily_hours, days_per_week, planner_mode)
+    result = workflow_memo.get(key)
+    if result is not None:
+        logger.debug(f"Workflow memo hit: {key[:12]}")
+        return key, result
+
+    canonical_subjects, canonical_hours, canonical_days = (
+        AgentOrchestrator.canonicalize_inputs(subjects, daily_hours, days_per_week)
+    )
+
+    async def compute() -> Dict[str, Any]:
+        computed = await AgentOrchestrator.arun_workflow(
+            subjects=list(canonical_subjects),
+            daily_hours=canonical_hours,
+            days_per_week=canonical_days,
+            planner_mode=planner_mode
+        )
+        workflow_memo.set(key, computed)
+        return computed
+
+    return key, await _workflow_async_flight.do(key, compute)
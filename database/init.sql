@@ -37,22 +37,12 @@ CREATE TABLE IF NOT EXISTS study_sessions (
 );
 
 -- Create indexes for faster queries
-CREATE INDEX idx_study_plans_created_at ON study_plans(created_at);
 CREATE INDEX idx_workflow_executions_plan_id ON workflow_executions(plan_id);
 CREATE INDEX idx_workflow_executions_status ON workflow_executions(status);
 CREATE INDEX idx_study_sessions_plan_id ON study_sessions(plan_id);
 CREATE INDEX idx_study_sessions_day_name ON study_sessions(day_name);
 
--- Create view for quick plan summary
-CREATE OR REPLACE VIEW plan_summary AS
-SELECT 
-    p.plan_id,
-    p.subjects,
-    p.hours_per_week,
-    p.days_per_week,
-    p.created_at,
-    COUNT(DISTINCT ss.session_id) as total_sessions,
-    COUNT(CASE WHEN ss.completed = TRUE THEN 1 END) as completed_sessions
-FROM study_plans p
-LEFT JOIN study_sessions ss ON p.plan_id = ss.plan_id
-GROUP BY p.plan_id, p.subjects, p.hours_per_week, p.days_per_week, p.created_at;
+-- plan_progress, plan_subjects, their triggers, the GET /plans listing
+-- indexes and the plan_summary view are created (and upgraded on
+-- existing databases) by the backend when it connects: see
+-- POSTGRES_SCHEMA in backend/services/persistence.py